@@ -7,6 +7,8 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 
-from app import app
-
+from app import create_app
 
+# Built once per cold start; SDK clients and models load on first use.
+# The process may be frozen between requests, so jobs run inline.
+app = create_app({"BACKGROUND_JOBS": False})
@@ -1,6 +1,3 @@
-
-
-
 """
 Naya Judicial System – backend (Flask)
 * MongoDB Persistence
@@ -13,28 +10,11 @@ from dotenv import load_dotenv
 load_dotenv() 
 
 import sys
-import json
-import random
-import re
-from datetime import datetime, timedelta
-import pickle
 import threading
-import uuid
-from typing import List, Dict, Any
-from functools import wraps
-
-import requests
+from datetime import datetime, timedelta
 
-import ollama
-from google import genai
-from flask import Flask, request, jsonify, redirect, url_for, send_from_directory, render_template
+from flask import Blueprint, Flask, request, jsonify, send_from_directory, render_template
 from flask_cors import CORS
-from pymongo import MongoClient, ASCENDING
-
-import numpy as np
-from bs4 import BeautifulSoup
-
-import re
 
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
@@ -42,112 +22,154 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 from app.utils.security import jwt_secret
+from app.utils.db import get_db, collection, pool_stats
+from app.utils.indexes import ensure_indexes
+from app.utils.case_search import search_cases, with_search_fields, ensure_search_fields, CASE_PROJECTION
+from app.utils.pagination import keyset_page, cached_count, invalidate_counts
+from app.utils.dashboard import get_dashboard_stats
+from app.utils.counters import incr, ensure_counters, case_status_counter, get_counters, CASES_TOTAL
+from app.utils import rollups
+from app.utils.ai_clients import get_genai_client
+from app.utils.case_import import import_cases, iter_rows, validate_case
+from pymongo.errors import DuplicateKeyError
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 TEMPLATE_ROOT = os.path.join(BASE_DIR, "templates")
 
-app = Flask(
-    __name__,
-    static_folder=STATIC_ROOT,
-    template_folder=TEMPLATE_ROOT
-)
-
-app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
-app.config["JWT_SECRET_KEY"] = jwt_secret
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+# Heavy SDKs (ollama, google-genai, openai, bs4, requests, numpy, sklearn)
+# and the ML model are imported inside the handlers that use them, so
+# creating the app stays cheap. scripts/check_import_time.py enforces it.
 
-
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
+bcrypt = Bcrypt()
+jwt = JWTManager()
 limiter = Limiter(
     get_remote_address,
-    app=app,
     default_limits=["200 per day", "50 per hour"],
     storage_uri="memory://"
 )
 
-talisman = Talisman(app, content_security_policy=None, force_https=False) 
-
-CORS(app)
-
-from .routes.evidence_routes import evidence_bp
-from .routes.chat_routes import chat_bp
-from .routes.notification_routes import notification_bp
-from .routes.citizen_routes import citizen_bp
-from .routes.analytics_routes import analytics_bp
-from .routes.judge_routes import judge_bp
-from .routes.schedule_routes import schedule_bp
-from .routes.auth_routes import auth_bp
-from .routes.prediction_routes import prediction_bp
-
-app.register_blueprint(evidence_bp)
-app.register_blueprint(chat_bp)
-app.register_blueprint(notification_bp)
-app.register_blueprint(citizen_bp)
-app.register_blueprint(analytics_bp)
-app.register_blueprint(judge_bp)
-app.register_blueprint(schedule_bp)
-app.register_blueprint(auth_bp)
-app.register_blueprint(prediction_bp)
-
-from .routes.lawyer_routes import lawyer_bp
-from .routes.live_ai_routes import live_ai_bp
-from .routes.decision_support_routes import decision_bp
-app.register_blueprint(lawyer_bp)
-app.register_blueprint(live_ai_bp)
-app.register_blueprint(decision_bp)
-
+main_bp = Blueprint("main", __name__)
 
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["naya_court_db"]
+cases_col = collection("cases")
+judges_col = collection("judges")
+schedules_col = collection("schedules")
 
 
-genai_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-
-
-cases_col = db["cases"]
-judges_col = db["judges"]
-schedules_col = db["schedules"]
-
-
-MODEL_PATH = os.path.join(BASE_DIR, "hearing_model.pkl")
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434")
-
-
-model = None
-if os.path.exists(MODEL_PATH):
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-    print("✅ ML Model loaded.")
-else:
-    print("⚠️ Model file not found! Predictions will be simulated.")
+def bootstrap_db():
+    """Idempotent index/counter/rollup setup, run off the request path."""
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"⚠️ Index Bootstrap Failed: {e}")
 
+    try:
+        # cases.json is loaded out of band (python -m app.utils.migrate_cases)
+        # so startup never blocks on parsing it.
+        if cases_col.find_one({}, {"_id": 1}) is None and os.path.exists(os.path.join(BASE_DIR, "cases.json")):
+            print("ℹ️ No cases in MongoDB. Load cases.json with: python -m app.utils.migrate_cases")
+    except Exception as e:
+        print(f"⚠️ Startup Check Failed: {e}")
 
+    try:
+        ensure_counters()
+        rollups.ensure_rollups()
+    except Exception as e:
+        print(f"⚠️ Counter Bootstrap Failed: {e}")
 
+    try:
+        ensure_search_fields()
+    except Exception as e:
+        print(f"⚠️ Search Field Backfill Failed: {e}")
 
+    try:
+        from app.utils.resources import ensure_courtrooms
+        ensure_courtrooms()
+    except Exception as e:
+        print(f"⚠️ Courtroom Bootstrap Failed: {e}")
 
-def migrate_json_to_mongo():
-    """One-time migration from cases.json to MongoDB."""
-    json_path = os.path.join(BASE_DIR, "cases.json")
-    if os.path.exists(json_path):
-        if cases_col.count_documents({}) == 0:
-            print("🔄 Migrating cases.json to MongoDB...")
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if data:
-                    cases_col.insert_many(data)
-                print(f"✅ Migrated {len(data)} cases.")
-            except Exception as e:
-                print(f"❌ Migration failed: {e}")
-        else:
-            print("ℹ️ MongoDB already has data. Skipping migration.")
 
-try:
-    migrate_json_to_mongo()
-except Exception as e:
-    print(f"⚠️ Startup Migration Failed: {e}")
+def create_app(config=None):
+    """
+    Build the Flask application. Blueprints are registered here; database
+    bootstrap runs in a background thread (BOOTSTRAP_DB=False skips it,
+    e.g. when indexes are managed at deploy time), as does the first load
+    of the hearing-duration model (WARM_MODELS=False skips it).
+    BACKGROUND_JOBS=False runs reschedule jobs on the request thread, for
+    hosts that freeze the process after each response.
+    """
+    app = Flask(
+        __name__,
+        static_folder=STATIC_ROOT,
+        template_folder=TEMPLATE_ROOT
+    )
+
+    app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
+    app.config["JWT_SECRET_KEY"] = jwt_secret
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+    app.config["BOOTSTRAP_DB"] = os.getenv("BOOTSTRAP_DB", "1") != "0"
+    app.config["WARM_MODELS"] = os.getenv("WARM_MODELS", "1") != "0"
+    app.config["BACKGROUND_JOBS"] = os.getenv("BACKGROUND_JOBS", "1") != "0"
+    if config:
+        app.config.update(config)
+
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    limiter.init_app(app)
+    Talisman(app, content_security_policy=None, force_https=False)
+    CORS(app)
+
+    from .routes.evidence_routes import evidence_bp
+    from .routes.chat_routes import chat_bp
+    from .routes.notification_routes import notification_bp
+    from .routes.citizen_routes import citizen_bp
+    from .routes.analytics_routes import analytics_bp
+    from .routes.judge_routes import judge_bp
+    from .routes.schedule_routes import schedule_bp
+    from .routes.courtroom_routes import courtroom_bp
+    from .routes.auth_routes import auth_bp
+    from .routes.prediction_routes import prediction_bp
+    from .routes.lawyer_routes import lawyer_bp
+    from .routes.live_ai_routes import live_ai_bp
+    from .routes.decision_support_routes import decision_bp
+
+    app.register_blueprint(evidence_bp)
+    app.register_blueprint(chat_bp)
+    app.register_blueprint(notification_bp)
+    app.register_blueprint(citizen_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(judge_bp)
+    app.register_blueprint(schedule_bp)
+    app.register_blueprint(courtroom_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(prediction_bp)
+    app.register_blueprint(lawyer_bp)
+    app.register_blueprint(live_ai_bp)
+    app.register_blueprint(decision_bp)
+    app.register_blueprint(main_bp)
+
+    if app.config["BOOTSTRAP_DB"]:
+        threading.Thread(target=bootstrap_db, name="db-bootstrap", daemon=True).start()
+    if app.config["WARM_MODELS"]:
+        from .utils.model_registry import registry, HEARING_DURATION
+        registry.get(HEARING_DURATION)
+    return app
+
+
+_default_app = None
+_default_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # `from app import app` keeps working, but the app is only built when
+    # asked for, so `python -m app.utils.<tool>` does not start a server app.
+    global _default_app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _default_app is None:
+        with _default_app_lock:
+            if _default_app is None:
+                _default_app = create_app()
+    return _default_app
 
 
 
@@ -162,13 +184,15 @@ SESSIONS = {}
 
 
 
-@app.route("/legal-research")
+@main_bp.route("/legal-research")
 def legal_research_page():
     return render_template("legal-research.html")
 
-@app.route("/api/research", methods=["POST"])
+@main_bp.route("/api/research", methods=["POST"])
 def perform_legal_research():
     """Real Legal Research API using IndianKanoon Scraping."""
+    import requests
+    from bs4 import BeautifulSoup
     query = request.json.get("query", "").strip()
     
     if not query:
@@ -262,7 +286,7 @@ def perform_legal_research():
 
 
 
-@app.route("/virtual-hearing")
+@main_bp.route("/virtual-hearing")
 def virtual_hearing_page():
     return render_template("virtual-hearing.html")
 
@@ -270,11 +294,11 @@ def virtual_hearing_page():
 
 
 
-@app.route("/drafting")
+@main_bp.route("/drafting")
 def drafting_page():
     return render_template("drafting.html")
 
-@app.route("/api/draft", methods=["POST"])
+@main_bp.route("/api/draft", methods=["POST"])
 def generate_draft():
     """Generate Judgment Draft using AI."""
     facts = request.json.get("facts", "")
@@ -354,64 +378,75 @@ def generate_draft():
 
 
 
-@app.route("/")
+@main_bp.route("/")
 def index_page():
     return render_template("index.html")
 
-@app.route("/dashboard")
+@main_bp.route("/dashboard")
 def dashboard_page():
     return render_template("dashboard.html")
 
-@app.route("/case-registration")
+@main_bp.route("/case-registration")
 def case_registration_page():
     return render_template("case-registration.html")
 
-@app.route("/cause-list")
+@main_bp.route("/cause-list")
 def cause_list_page():
     return render_template("cause-list.html")
 
-@app.route("/judges")
+@main_bp.route("/judges")
 def judges_page():
     return render_template("judges.html")
 
-@app.route("/schedule")
+@main_bp.route("/schedule")
 def schedule_page():
     return render_template("schedule.html")
 
-@app.route("/smart-vault")
+@main_bp.route("/smart-vault")
 def smart_vault_page():
     return render_template("smart-vault.html")
 
-@app.route("/predictor")
+@main_bp.route("/predictor")
 def predictor_page():
     return render_template("predictor.html")
 
-@app.route("/chat")
+@main_bp.route("/chat")
 def chat_page():
     return render_template("chat.html")
 
-@app.route("/api/cases", methods=["GET"])
+CASE_SORT = [("filingDate", -1), ("caseNumber", -1)]
+
+@main_bp.route("/api/cases", methods=["GET"])
 def get_cases_api():
+    """
+    List cases. Pass `cursor` (empty for the first page) for keyset
+    pagination; `page`/`limit` offset pagination is kept for old clients.
+    """
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 20))
     search = request.args.get("search", "").strip()
     
-    query = {}
     if search:
-        regex = {"$regex": search, "$options": "i"}
-        query = {
-            "$or": [
-                {"caseNumber": regex},
-                {"title": regex},
-                {"caseType": regex},
-                {"court": regex},
-                {"judge": regex}
-            ]
-        }
-        
-    total = cases_col.count_documents(query)
-    cases = list(cases_col.find(query, {"_id": 0})
-                 .sort("filingDate", -1) 
+        return jsonify(search_cases(search, page, limit, cases_col))
+
+    query = {}
+    total = cached_count(cases_col, query)
+
+    if "cursor" in request.args:
+        try:
+            cases, next_cursor = keyset_page(cases_col, query, CASE_SORT, limit,
+                                             request.args.get("cursor"), CASE_PROJECTION)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "cases": cases,
+            "total": total,
+            "limit": limit,
+            "next_cursor": next_cursor
+        })
+
+    cases = list(cases_col.find(query, CASE_PROJECTION)
+                 .sort(CASE_SORT) 
                  .skip((page - 1) * limit)
                  .limit(limit))
                  
@@ -422,27 +457,58 @@ def get_cases_api():
         "pages": (total + limit - 1) // limit
     })
 
-@app.route("/api/cases/<path:case_number>", methods=["DELETE"])
+@main_bp.route("/api/cases/<path:case_number>", methods=["DELETE"])
 def delete_case_api(case_number):
     try:
         
-        result = cases_col.delete_one({"caseNumber": case_number})
-        if result.deleted_count > 0:
+        deleted = cases_col.find_one_and_delete({"caseNumber": case_number}, rollups.CASE_ROLLUP_FIELDS)
+        if deleted:
+            incr({CASES_TOTAL: -1, case_status_counter(deleted.get("status")): -1})
+            rollups.apply_case(deleted, -1)
+            invalidate_counts("cases")
             return jsonify({"success": True, "message": "Case deleted"})
         else:
             return jsonify({"error": "Case not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/register-case", methods=["POST"])
+@main_bp.route("/api/register-case", methods=["POST"])
 def register_case_api():
-    data = request.json
+    # Same validation as bulk registration
+    try:
+        data = validate_case(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     data["status"] = "Pending"
-    cases_col.insert_one(data)
+    with_search_fields(data)
+    try:
+        cases_col.insert_one(data)
+    except DuplicateKeyError:
+        return jsonify({"error": "Case number already registered"}), 409
+    incr({CASES_TOTAL: 1, case_status_counter("Pending"): 1})
+    rollups.apply_case(data)
+    invalidate_counts("cases")
     data.pop("_id", None)
     return jsonify({"message": "Registered", "caseNumber": data.get("caseNumber")}), 201
 
-@app.route("/api/ai/summarize", methods=["POST"])
+@main_bp.route("/api/register-case/bulk", methods=["POST"])
+def register_cases_bulk_api():
+    """
+    Bulk registration. The body is streamed as NDJSON (one case per line)
+    or CSV with a header row (Content-Type text/csv or ?format=csv).
+    Rows are validated and upserted on caseNumber; the response lists
+    per-row errors.
+    """
+    fmt = request.args.get("format")
+    if not fmt:
+        fmt = "csv" if (request.mimetype or "").endswith("csv") else "ndjson"
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    report = import_cases(iter_rows(request.stream, fmt))
+    return jsonify(report.as_dict()), 200 if not report.failed else 207
+
+@main_bp.route("/api/ai/summarize", methods=["POST"])
 
 def ai_summarize():
     try:
@@ -455,7 +521,7 @@ def ai_summarize():
 
         
         text_hash = hashlib.md5(case_text.encode("utf-8")).hexdigest()
-        cached = db["summaries"].find_one({"hash": text_hash})
+        cached = get_db()["summaries"].find_one({"hash": text_hash})
         
         if cached:
             return jsonify({"summary": cached["summary"], "cached": True})
@@ -464,7 +530,7 @@ def ai_summarize():
         
         
         try:
-            response = genai_client.models.generate_content(
+            response = get_genai_client().models.generate_content(
                 model='gemini-2.0-flash', 
                 contents=[f"Summarize this legal case in 3 bullet points:\n{case_text}"]
             )
@@ -478,6 +544,7 @@ def ai_summarize():
 
         
         if not summary:
+            import ollama
             resp = ollama.chat(
                 model="mistral",
                 messages=[
@@ -488,7 +555,7 @@ def ai_summarize():
             summary = resp["message"]["content"]
         
         
-        db["summaries"].insert_one({
+        get_db()["summaries"].insert_one({
             "hash": text_hash,
             "summary": summary,
             "created_at": datetime.now()
@@ -498,68 +565,61 @@ def ai_summarize():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/dashboard/stats", methods=["GET"])
+@main_bp.route("/api/dashboard/stats", methods=["GET"])
 def dashboard_stats():
-    total = cases_col.count_documents({})
-    pending = cases_col.count_documents({"status": "Pending"})
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    scheduled_today = schedules_col.count_documents({"date": today_str})
-    
-    return jsonify({
-        "total_cases": total,
-        "pending_hearings": pending,
-        "todays_cases": scheduled_today,
-        "avg_hearing_time": 45,
-        "urgent_cases": list(cases_col.find({"priority": "High", "status": {"$ne": "Closed"}}, {"_id": 0, "caseNumber": 1, "caseType": 1}).limit(5)),
-        "upcoming_hearings": list(schedules_col.find({"date": {"$gte": today_str}}, {"_id": 0}).sort("date", 1).limit(5)),
-        "active_judges": list(judges_col.find({"status": "Available"}, {"_id": 0, "name": 1, "status": 1}).limit(3))
-    })
+    return jsonify(get_dashboard_stats())
+
+
+@main_bp.route("/api/counters", methods=["GET"])
+def counters_api():
+    """Materialized case and notification counters (O(1) read)."""
+    return jsonify(get_counters())
+
 
+@main_bp.route("/api/system/db-pool", methods=["GET"])
+def db_pool_stats():
+    """Connection pool settings and checkout latency for this worker."""
+    return jsonify(pool_stats())
 
-@app.route("/api/dashboard/chart-data", methods=["GET"])
+
+@main_bp.route("/api/dashboard/chart-data", methods=["GET"])
 def dashboard_chart_data():
-    """
-    Returns mock monthly data for the 'Cases Filed vs. Disposed' chart.
-    """
-    data = {
-        "labels": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"],
-        "filed": [45, 52, 38, 65, 48, 59, 62],
-        "disposed": [40, 48, 45, 60, 55, 68, 70]
-    }
-    return jsonify(data)
+    """'Cases Filed vs. Disposed' chart, served from the analytics rollups."""
+    from .routes import dashboard_routes
+    return dashboard_routes.dashboard_chart_data()
 
 
 
 
-@app.route("/dashboard.html")
+@main_bp.route("/dashboard.html")
 def dashboard_legacy():
     return render_template("dashboard.html")
 
-@app.route("/case-registration.html")
+@main_bp.route("/case-registration.html")
 def case_registration_legacy():
     return render_template("case-registration.html")
 
-@app.route("/cause-list.html")
+@main_bp.route("/cause-list.html")
 def cause_list_legacy():
     return render_template("cause-list.html")
 
-@app.route("/settings")
+@main_bp.route("/settings")
 def settings_page():
      return render_template("settings.html")
 
-@app.route("/settings.html")
+@main_bp.route("/settings.html")
 def settings_legacy():
     try:
         return render_template("settings.html")
     except:
         return "Settings page not found", 404
 
-@app.route("/index.html")
+@main_bp.route("/index.html")
 def index_legacy():
     return render_template("index.html")
 
 
-@app.route("/<path:path>")
+@main_bp.route("/<path:path>")
 def static_proxy(path):
     
     possible_roots = [
@@ -572,4 +632,4 @@ def static_proxy(path):
     return "", 404
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
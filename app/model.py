@@ -1,7 +1,10 @@
 import pandas as pd
 import os
+import sys
 from sklearn.linear_model import LinearRegression
-import pickle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.model_registry import publish, HEARING_DURATION
 
 
 data = {
@@ -20,8 +23,6 @@ model = LinearRegression()
 model.fit(X, y)
 
 
-model_path = os.path.join(os.path.dirname(__file__), "hearing_model.pkl")
-with open(model_path, "wb") as f:
-    pickle.dump(model, f)
+version = publish(HEARING_DURATION, model, ["witnesses", "advocates", "previous_hearings"])
 
-print("✅ Model trained & saved")
+print("✅ Model trained & saved as", version)
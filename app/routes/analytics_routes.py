@@ -1,13 +1,12 @@
 from flask import Blueprint, jsonify, render_template
 import os
-from pymongo import MongoClient
+from app.utils.db import get_db
+from app.utils.counters import status_counts
+from app.utils.rollups import monthly_filings, top_judge_load, period_label
 from datetime import datetime
 
 analytics_bp = Blueprint('analytics_bp', __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
 
 @analytics_bp.route("/analytics")
 def analytics_page():
@@ -18,44 +17,22 @@ def get_analytics_data():
     db = get_db()
     
     
-    pipeline_status = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    status_data = list(db["cases"].aggregate(pipeline_status))
+    status_data = status_counts(db)
     
     status_chart = {
-        "labels": [d["_id"] or "Unknown" for d in status_data],
-        "values": [d["count"] for d in status_data]
+        "labels": list(status_data.keys()),
+        "values": list(status_data.values())
     }
     
     
     
     
     
-    try:
-        pipeline_month = [
-             {
-                "$project": {
-                    "month": {"$substr": ["$filingDate", 5, 2]} 
-                }
-            },
-            {"$group": {"_id": "$month", "count": {"$sum": 1}}},
-            {"$sort": {"_id": 1}}
-        ]
-        month_data = list(db["cases"].aggregate(pipeline_month))
-    except:
-        month_data = []
+    month_data = monthly_filings(db)
 
     
-    import calendar
-    month_labels = []
-    month_values = []
-    for d in month_data:
-        m_num = d["_id"]
-        if m_num and m_num.isdigit():
-            m_name = calendar.month_name[int(m_num)]
-            month_labels.append(m_name)
-            month_values.append(d["count"])
+    month_labels = [period_label(d["period"], "month") for d in month_data]
+    month_values = [d["filed"] for d in month_data]
             
     
     if not month_labels:
@@ -68,16 +45,10 @@ def get_analytics_data():
     }
 
     
-    
-    
-    pipeline_judge = [
-        {"$group": {"_id": "$judge_name", "count": {"$sum": 1}}},
-        {"$limit": 5}
-    ]
-    judge_data = list(db["schedules"].aggregate(pipeline_judge))
+    judge_data = top_judge_load(db)
     judge_chart = {
-        "labels": [d["_id"] for d in judge_data],
-        "values": [d["count"] for d in judge_data]
+        "labels": [d.get("judge_name") or d["judge_id"] for d in judge_data],
+        "values": [d["hearings"] for d in judge_data]
     }
 
     return jsonify({
@@ -1,8 +1,7 @@
 from flask import Blueprint, request, jsonify
 import os
-from pymongo import MongoClient
-import ollama
-from google import genai
+from app.utils.db import get_db
+from app.utils.ai_clients import get_genai_client
 import re
 
 def mask_pii(text):
@@ -17,24 +16,9 @@ def mask_pii(text):
 chat_bp = Blueprint('chat_bp', __name__)
 
 
-def get_gemini_client():
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        return None
-    try:
-        return genai.Client(api_key=api_key)
-    except Exception:
-        return None
-
-client = get_gemini_client()
-
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
-
 def ask_gemini(system_prompt, user_question):
     try:
-        response = client.models.generate_content(
+        response = get_genai_client().models.generate_content(
             model='gemini-2.0-flash', 
             contents=[system_prompt, user_question]
         )
@@ -44,6 +28,7 @@ def ask_gemini(system_prompt, user_question):
 
 def ask_ollama(system_prompt, user_question):
     try:
+        import ollama
         response = ollama.chat(
             model='mistral', 
             messages=[
@@ -55,9 +40,9 @@ def ask_ollama(system_prompt, user_question):
     except Exception as e:
         return f"Ollama Error: {str(e)}"
 
-from openai import OpenAI
 def ask_openai(system_prompt, user_question):
     try:
+        from openai import OpenAI
         client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         response = client.chat.completions.create(
             model="gpt-4o",
@@ -1,12 +1,9 @@
 from flask import Blueprint, request, jsonify, render_template
 import os
-from pymongo import MongoClient
+from app.utils.db import get_db
 
 citizen_bp = Blueprint('citizen_bp', __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
 
 @citizen_bp.route("/citizen")
 def citizen_portal():
@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify
+from app.utils.db import get_db
+from app.utils import resources, scheduling
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+
+courtroom_bp = Blueprint('courtroom_bp', __name__)
+
+MAX_AUDIT_DAYS = 366
+
+
+@courtroom_bp.route("/api/courtrooms", methods=["GET"])
+def get_courtrooms():
+    return jsonify(list(get_db()["courtrooms"].find({}, {"_id": 0}).sort("id", 1)))
+
+
+@courtroom_bp.route("/api/courtrooms", methods=["POST"])
+def add_courtroom():
+    data = request.json or {}
+    court_name = (data.get("court_name") or "").strip()
+    room = (data.get("room") or "").strip()
+    if not court_name or not room:
+        return jsonify({"error": "court_name and room are required"}), 400
+
+    col = get_db()["courtrooms"]
+    if col.find_one({"court_name": court_name, "room": room}, {"_id": 1}):
+        return jsonify({"error": "Courtroom already exists"}), 409
+    existing = [r["id"] for r in col.find({}, {"_id": 0, "id": 1})]
+    numbers = [int(i[1:]) for i in existing if i[:1] == "R" and i[1:].isdigit()]
+    courtroom = {
+        "id": data.get("id") or f"R{max(numbers, default=0) + 1:02d}",
+        "court_name": court_name,
+        "room": room,
+        "status": data.get("status", "Available")
+    }
+    try:
+        col.insert_one(courtroom)
+    except DuplicateKeyError:
+        return jsonify({"error": "Courtroom id already exists"}), 409
+    courtroom.pop("_id", None)
+    return jsonify(courtroom), 201
+
+
+@courtroom_bp.route("/api/courtrooms/<room_id>/calendar", methods=["GET"])
+def courtroom_calendar(room_id):
+    """Hearings booked in one courtroom on a date (default today), in time order."""
+    db = get_db()
+    room = db["courtrooms"].find_one({"id": room_id}, {"_id": 0})
+    if not room:
+        return jsonify({"error": "Courtroom not found"}), 404
+    date_str = request.args.get("date", datetime.now().strftime("%Y-%m-%d"))
+
+    query = {"date": date_str, "$or": [
+        {"court_room_id": room_id},
+        {"court_room_id": None, "court_name": room["court_name"], "court_room": room["room"]}
+    ]}
+    entries = []
+    for entry in db["schedules"].find(query, resources.SLOT_FIELDS):
+        try:
+            entry["_slot"] = scheduling.slot_interval(entry)
+        except (KeyError, ValueError, AttributeError):
+            continue
+        entries.append(entry)
+    entries.sort(key=lambda e: e.pop("_slot"))
+    return jsonify({"courtroom": room, "date": date_str, "hearings": entries})
+
+
+@courtroom_bp.route("/api/schedule/conflicts", methods=["GET"])
+def schedule_conflicts():
+    """
+    Room and judge double bookings in stored schedules between `from` and
+    `to` (YYYY-MM-DD, inclusive; both default to today).
+    """
+    date_from = request.args.get("from", datetime.now().strftime("%Y-%m-%d"))
+    date_to = request.args.get("to", date_from)
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d")
+        end = datetime.strptime(date_to, "%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    if end < start or end - start > timedelta(days=MAX_AUDIT_DAYS):
+        return jsonify({"error": f"Range must run forward and span at most {MAX_AUDIT_DAYS} days"}), 400
+
+    conflicts = resources.audit_range(date_from, date_to)
+    return jsonify({
+        "from": date_from,
+        "to": date_to,
+        "room_conflicts": sum(1 for c in conflicts if c["type"] == "room"),
+        "judge_conflicts": sum(1 for c in conflicts if c["type"] == "judge"),
+        "conflicts": conflicts
+    })
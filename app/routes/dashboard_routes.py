@@ -1,35 +1,45 @@
 from flask import Blueprint, jsonify, request
 import os
-from pymongo import MongoClient
+from app.utils.db import get_db
+from app.utils.dashboard import get_dashboard_stats, invalidate_dashboard
+from app.utils.counters import reconcile
+from app.utils import rollups
+from app.utils.case_search import with_search_fields
+from datetime import datetime
 import random
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
 
 @dashboard_bp.route("/api/dashboard/stats")
 def dashboard_stats():
-    db = get_db()
-    total_cases = db.cases.count_documents({})
-    pending = db.cases.count_documents({"status": "Pending"})
+    stats = get_dashboard_stats()
     
     return jsonify({
-        "total_cases": total_cases,
-        "pending_hearings": pending
+        "total_cases": stats["total_cases"],
+        "pending_hearings": stats["pending_hearings"]
     })
 
 @dashboard_bp.route("/api/dashboard/chart-data")
 def dashboard_chart_data():
     """
-    Returns mock monthly data for the 'Cases Filed vs. Disposed' chart.
+    'Cases Filed vs. Disposed' series from the precomputed rollups.
+    Query args: granularity (day|week|month), periods, court, caseType,
+    to (YYYY-MM-DD, last period shown; defaults to today).
     """
-    data = {
-        "labels": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"],
-        "filed": [45, 52, 38, 65, 48, 59, 62],
-        "disposed": [40, 48, 45, 60, 55, 68, 70]
-    }
+    try:
+        periods = min(max(int(request.args.get("periods", 7)), 1), 366)
+        end = request.args.get("to")
+        end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+        data = rollups.filed_vs_disposed(
+            granularity=request.args.get("granularity", "month"),
+            periods=periods,
+            court=request.args.get("court"),
+            case_type=request.args.get("caseType"),
+            end=end
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(data)
 
 @dashboard_bp.route("/api/seed-data", methods=["POST"])
@@ -72,9 +82,12 @@ def seed_data():
                 "priority": random.choice(["Normal", "High"]),
                 "filingDate": "2024-01-01"
             }
-            demo_cases.append(case_doc)
+            demo_cases.append(with_search_fields(case_doc))
             
         db.cases.insert_many(demo_cases)
+        reconcile(db)
+        rollups.backfill(db)
+        invalidate_dashboard()
         
         return jsonify({"success": True, "message": "MongoDB populated with Demo Data!"})
         
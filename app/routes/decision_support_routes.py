@@ -1,5 +1,11 @@
 from flask import Blueprint, render_template, request, jsonify
-from app.utils.prediction_engine import predictor_engine
+
+
+def get_predictor():
+    # Deferred: the engine pulls in numpy and the outcome cube regexes,
+    # which the app should not pay for until these endpoints are hit.
+    from app.utils.prediction_engine import get_predictor as _get_predictor
+    return _get_predictor()
 
 decision_bp = Blueprint('decision_bp', __name__)
 
@@ -18,6 +24,36 @@ def simulate_outcome():
     bench = data.get("bench", "Gujarat High Court")
     
     # Use the engine to get stats from High Court Metadata
-    stats = predictor_engine.get_outcome_stats(query)
+    stats = get_predictor().get_outcome_stats(
+        query, bench=bench, year=data.get("year"), case_type=data.get("caseType")
+    )
     
     return jsonify(stats)
+
+@decision_bp.route("/api/ai/historical-stats", methods=["GET"])
+def historical_stats():
+    """Slice the historical corpus by bench/year/statute/disposal, optionally grouped."""
+    predictor_engine = get_predictor()
+    if predictor_engine.columns is None:
+        return jsonify({"error": "Columnar store not built. Run: python -m app.utils.columnar_store --build"}), 503
+
+    filters = {
+        "bench": request.args.get("bench"),
+        "case_type": request.args.get("caseType"),
+        "disposal": request.args.get("disposal"),
+        "statute": request.args.get("statute"),
+    }
+    try:
+        for key in ("year", "year_from", "year_to"):
+            if request.args.get(key):
+                filters[key] = int(request.args[key])
+        result = {
+            "durations": predictor_engine.duration_percentiles(**filters),
+            "outcomes": predictor_engine.outcome_distribution(**filters)
+        }
+        group_by = request.args.get("group_by")
+        if group_by:
+            result["groups"] = predictor_engine.group_by(group_by, **filters)[:request.args.get("limit", 50, type=int)]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
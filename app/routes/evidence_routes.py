@@ -2,21 +2,20 @@ from flask import Blueprint, request, jsonify
 import os
 import uuid
 from datetime import datetime
-from pymongo import MongoClient
-from pymongo import MongoClient
-import ollama
+from app.utils.db import get_db
+from app.utils.pagination import keyset_page
+from app.utils.ai_clients import get_genai_client
 from cryptography.fernet import InvalidToken
 from app.utils.security import encrypt_data, decrypt_data, calculate_sha256
 import io
 
 evidence_bp = Blueprint('evidence_bp', __name__)
 
+EVIDENCE_SORT = [("upload_date", -1), ("id", -1)]
+
 
 from flask import current_app
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
 
 @evidence_bp.route("/api/evidence/upload", methods=["POST"])
 def upload_evidence():
@@ -79,20 +78,34 @@ def upload_evidence():
     
     return jsonify({"success": True, "evidence": evidence_doc})
 
+def list_evidence(case_number):
+    """
+    Evidence for a case. Without a `cursor` argument the full list is
+    returned as before; with one, a keyset page plus `next_cursor`.
+    """
+    db = get_db()
+    query = {"case_number": case_number}
+    if "cursor" not in request.args:
+        return jsonify(list(db["evidence"].find(query, {"_id": 0})))
+
+    limit = int(request.args.get("limit", 20))
+    try:
+        evidence_list, next_cursor = keyset_page(db["evidence"], query, EVIDENCE_SORT, limit,
+                                                 request.args.get("cursor"), {"_id": 0})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"evidence": evidence_list, "next_cursor": next_cursor})
+
 @evidence_bp.route("/api/evidence/<path:case_number>", methods=["GET"])
 def get_evidence(case_number):
-    db = get_db()
-    evidence_list = list(db["evidence"].find({"case_number": case_number}, {"_id": 0}))
-    return jsonify(evidence_list)
+    return list_evidence(case_number)
 
 @evidence_bp.route("/api/evidence/list", methods=["GET"])
 def get_evidence_list():
     case_number = request.args.get("case_number")
     if not case_number:
          return jsonify([])
-    db = get_db()
-    evidence_list = list(db["evidence"].find({"case_number": case_number}, {"_id": 0}))
-    return jsonify(evidence_list)
+    return list_evidence(case_number)
 
 @evidence_bp.route("/api/evidence/analyze", methods=["POST"])
 def analyze_evidence():
@@ -130,7 +143,6 @@ def analyze_evidence():
                         content += page_text + "\n"
         elif any(lower_path.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp']):
             # VISION PROCESSING START
-            from google import genai
             from google.genai import types
             import base64
             
@@ -138,7 +150,7 @@ def analyze_evidence():
                 encrypted_data = f.read()
             decrypted_data = decrypt_data(encrypted_data)
             
-            client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+            client = get_genai_client()
             
             # Convert decrypted bytes to PIL image or direct bytes for Vision
             prompt = "Analyze this judicial evidence image. Extract text, identify parties mentioned, and describe objects or scenes. Summarize legally."
@@ -176,6 +188,7 @@ def analyze_evidence():
         """
         
         try:
+            import ollama
             response = ollama.chat(model='mistral', messages=[{'role': 'user', 'content': prompt}])
             analysis_result = response['message']['content']
         except Exception as ai_error:
@@ -1,19 +1,47 @@
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from app.utils.db import get_db
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 judge_bp = Blueprint('judge_bp', __name__)
 
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
+
+def schedule_load(schedules_col, today_str, date_from=None, date_to=None):
+    """
+    Per-judge, per-day booked cases and minutes for today and, optionally,
+    a date range (inclusive), from one $group over schedules.
+    Returns {judge_id: {date: (cases, minutes)}}.
+    """
+    match = {"date": today_str}
+    if date_from:
+        match = {"$or": [match, {"date": {"$gte": date_from, "$lte": date_to}}]}
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"judge_id": "$judge_id", "date": "$date"},
+            "cases": {"$sum": 1},
+            "minutes": {"$sum": {"$ifNull": ["$duration_minutes", 0]}}
+        }}
+    ]
+    load = {}
+    for row in schedules_col.aggregate(pipeline):
+        key = row["_id"]
+        load.setdefault(key["judge_id"], {})[key["date"]] = (row["cases"], row["minutes"])
+    return load
+
+
+def _utilization(minutes, capacity):
+    return round((minutes / capacity) * 100, 1) if capacity > 0 else 0
+
 
 @judge_bp.route("/api/judges", methods=["GET"])
 def get_judges():
-    """Return list of judges with analytics."""
+    """
+    Return list of judges with today's analytics. With `from` and `to`
+    (YYYY-MM-DD) each judge also gets a daily `utilization_series`.
+    """
     db = get_db()
     judges_col = db["judges"]
     schedules_col = db["schedules"]
@@ -22,19 +50,41 @@ def get_judges():
     
     
     today_str = datetime.now().strftime("%Y-%m-%d")
+    date_from = request.args.get("from")
+    date_to = request.args.get("to", date_from)
+    if date_from:
+        try:
+            start = datetime.strptime(date_from, "%Y-%m-%d")
+            end = datetime.strptime(date_to, "%Y-%m-%d")
+        except ValueError:
+            return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+        if end < start or (end - start).days > 366:
+            return jsonify({"error": "Date range must be 0-366 days"}), 400
+        days = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+    else:
+        days = []
+    load = schedule_load(schedules_col, today_str, date_from, date_to)
     
     for j in judges:
-        
-        sched = list(schedules_col.find({"judge_id": j["id"], "date": today_str}))
-        cases_assigned = len(sched)
-        total_minutes = sum([s.get("duration_minutes", 0) for s in sched])
+        judge_load = load.get(j.get("id"), {})
+        cases_assigned, total_minutes = judge_load.get(today_str, (0, 0))
         capacity = j.get("daily_capacity_minutes", 300)
         
         j["analytics"] = {
             "cases_today": cases_assigned,
             "minutes_booked": total_minutes,
-            "utilization": round((total_minutes / capacity) * 100, 1) if capacity > 0 else 0
+            "utilization": _utilization(total_minutes, capacity)
         }
+        if days:
+            j["utilization_series"] = [
+                {
+                    "date": day,
+                    "cases": judge_load.get(day, (0, 0))[0],
+                    "minutes_booked": judge_load.get(day, (0, 0))[1],
+                    "utilization": _utilization(judge_load.get(day, (0, 0))[1], capacity)
+                }
+                for day in days
+            ]
         
     return jsonify(judges)
 
@@ -1,17 +1,11 @@
 from flask import Blueprint, request, jsonify
 import os
-import ollama
-from google import genai
-from pymongo import MongoClient
+from app.utils.db import get_db
+from app.utils.ai_clients import get_genai_client
 from datetime import datetime
 
 live_ai_bp = Blueprint('live_ai_bp', __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
-
-genai_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 
 @live_ai_bp.route("/api/live/process-segment", methods=["POST"])
 def process_transcript_segment():
@@ -43,7 +37,7 @@ def process_transcript_segment():
     
     try:
         # Try Gemini first for high quality
-        response = genai_client.models.generate_content(
+        response = get_genai_client().models.generate_content(
             model='gemini-2.0-flash', 
             contents=[prompt]
         )
@@ -58,6 +52,7 @@ def process_transcript_segment():
         print(f"Gemini failed, trying Ollama: {e}")
         try:
             # Fallback to Ollama
+            import ollama
             resp = ollama.chat(
                 model="mistral",
                 messages=[{"role": "user", "content": prompt}]
@@ -101,7 +96,7 @@ def generate_order_draft():
     """
     
     try:
-        response = genai_client.models.generate_content(
+        response = get_genai_client().models.generate_content(
             model='gemini-2.0-flash', 
             contents=[prompt]
         )
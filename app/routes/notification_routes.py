@@ -2,27 +2,33 @@ from flask import Blueprint, request, jsonify
 import os
 import uuid
 from datetime import datetime
-from pymongo import MongoClient
+from app.utils.db import get_db
+from app.utils.pagination import keyset_page
+from app.utils.counters import incr, get_counter, NOTIFICATIONS_TOTAL, NOTIFICATIONS_UNREAD
 
 notification_bp = Blueprint('notification_bp', __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
+NOTIFICATION_SORT = [("date", -1), ("id", -1)]
+
 
 @notification_bp.route("/api/notifications", methods=["GET"])
 def get_notifications():
-    """Get recent alerts."""
+    """Get recent alerts. Pass `next_cursor` back as `cursor` for older ones."""
     db = get_db()
+    limit = int(request.args.get("limit", 15))
     
-    notifs = list(db["notifications"].find().sort("date", -1).limit(15))
+    try:
+        notifs, next_cursor = keyset_page(db["notifications"], {}, NOTIFICATION_SORT,
+                                          limit, request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     for n in notifs:
         n["_id"] = str(n["_id"])
     
     
-    unread_count = db["notifications"].count_documents({"read": False})
+    unread_count = get_counter(NOTIFICATIONS_UNREAD)
     
-    return jsonify({"notifications": notifs, "unread_count": unread_count})
+    return jsonify({"notifications": notifs, "unread_count": unread_count, "next_cursor": next_cursor})
 
 @notification_bp.route("/api/notifications/send", methods=["POST"])
 def send_notification():
@@ -46,6 +52,7 @@ def send_notification():
         "read": False
     }
     db["notifications"].insert_one(notif)
+    incr({NOTIFICATIONS_TOTAL: 1, NOTIFICATIONS_UNREAD: 1})
     
     return jsonify({"success": True, "details": f"Simulated {channel} sent to user."})
 
@@ -53,5 +60,6 @@ def send_notification():
 def mark_read():
     """Mark all as read."""
     db = get_db()
-    db["notifications"].update_many({}, {"$set": {"read": True}})
+    result = db["notifications"].update_many({"read": False}, {"$set": {"read": True}})
+    incr({NOTIFICATIONS_UNREAD: -result.modified_count})
     return jsonify({"success": True})
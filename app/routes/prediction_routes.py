@@ -1,20 +1,70 @@
+import os
+import time
 from flask import Blueprint, request, jsonify
 from ..utils.model_loader import get_model
+from ..utils.model_registry import registry
 
 prediction_bp = Blueprint("prediction", __name__)
 
+MAX_BATCH_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "10000"))
+
 @prediction_bp.route("/api/predict-duration", methods=["POST"])
 def predict_duration():
-    data = request.json
+    """
+    Predicted duration for one case. The body must carry every feature of
+    the current model (GET /api/models lists them); a missing or
+    unencodable feature is a 400 naming it.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
 
+    # Inputs are picked out of the request by the model's own feature list
     model = get_model()
-    features = [[
-        data["complexity"],
-        data["judge_experience"]
-    ]]
+    try:
+        model.check_inputs([data])
+        prediction = model.predict([data])[0]
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid input: {e}", "features": model.features}), 400
+
+    return jsonify({
+        "predicted_days": int(prediction),
+        "model_version": model.version
+    })
 
-    prediction = model.predict(features)[0]
+@prediction_bp.route("/api/predict-duration/batch", methods=["POST"])
+def predict_duration_batch():
+    """
+    Score many rows with one model.predict call.
+    Body: {"rows": [{...}, ...]} (or a bare list), one object per case in
+    the same shape as /api/predict-duration.
+    """
+    data = request.get_json(silent=True)
+    rows = data.get("rows") if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        return jsonify({"error": "Expected {\"rows\": [{...}, ...]}"}), 400
+    if len(rows) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"At most {MAX_BATCH_ROWS} rows per batch"}), 413
+
+    # One model reference for the whole batch, even if a reload lands mid-request
+    model = get_model()
+    started = time.perf_counter()
+    try:
+        model.check_inputs(rows)
+        predictions = model.predict(rows) if rows else []
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid input: {e}", "features": model.features}), 400
+    elapsed = max(time.perf_counter() - started, 1e-9)
 
     return jsonify({
-        "predicted_days": int(prediction)
+        "model_version": model.version,
+        "count": len(rows),
+        "predicted_days": [int(p) for p in predictions],
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "rows_per_sec": round(len(rows) / elapsed)
     })
+
+@prediction_bp.route("/api/models", methods=["GET"])
+def model_status():
+    """Loaded version, available versions and last load error per model."""
+    return jsonify(registry.status())
@@ -1,40 +1,62 @@
-from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.db import get_db
+from app.utils.counters import incr, case_status_counter
+from app.utils import rollups, model_registry, scheduling, schedule_solver, schedule_simulator, jobs, resources
+from app.utils.case_import import PRIORITIES
+from pymongo import InsertOne, UpdateOne
 import os
-import pickle
+import math
+import time
 from datetime import datetime, timedelta
-import random
+import uuid
 
 schedule_bp = Blueprint('schedule_bp', __name__)
 
-def get_db():
-    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
-    return client["naya_court_db"]
 
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "hearing_model.pkl")
-model = None
-try:
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-except:
-    pass
+def heuristic_duration(case_data):
+    """Rule-of-thumb duration used when the model cannot score a case."""
+    base = 15
+    try:
+        base += int(case_data.get("witnesses", 0) or 0) * 10
+    except (TypeError, ValueError):
+        pass
+    return min(base, 120)
 
-def predict_hearing_duration(case_data):
-    """Predict duration using ML model or fallback."""
-    if model:
+def predict_hearing_durations(cases):
+    """
+    Durations for a list of cases from one batched model call, memoized per
+    feature tuple across runs (see LoadedModel.predict_cached). Returns
+    (durations, stats); stats counts cache hits and the cases that fell
+    back to heuristic_duration because no model was loaded, a feature value
+    could not be encoded, or the model failed or returned a non-finite value.
+    """
+    import numpy as np
+    durations = [None] * len(cases)
+    stats = {"model_version": None, "predicted": 0, "cache_hits": 0, "fallback": 0}
+    model = model_registry.get_model(model_registry.HEARING_DURATION)
+    if model and cases:
+        stats["model_version"] = model.version
         try:
-            witnesses = int(case_data.get("witnesses", 0))
-            advocates = int(case_data.get("advocates", 0))
-            previous = int(case_data.get("previous_hearings", 0))
-            pred = model.predict([[witnesses, advocates, previous]])
-            return round(float(pred[0]), 2)
-        except:
-            pass
-    
-    base = 15
-    base += int(case_data.get("witnesses", 0)) * 10
-    return min(base, 120)  
+            matrix = model.feature_matrix(cases, strict=False)
+            scorable = np.flatnonzero(np.isfinite(matrix).all(axis=1))
+            preds, stats["cache_hits"] = model.predict_cached(matrix[scorable])
+            for i, pred in zip(scorable.tolist(), preds):
+                if math.isfinite(pred):
+                    durations[i] = round(pred, 2)
+        except Exception as e:
+            print(f"⚠️ Duration model {model.version} failed, using heuristic: {e}")
+
+    for i, case in enumerate(cases):
+        if durations[i] is None:
+            durations[i] = heuristic_duration(case)
+            stats["fallback"] += 1
+    stats["predicted"] = len(cases) - stats["fallback"]
+    return durations, stats
+
+def predict_hearing_duration(case_data):
+    """Predict duration using the registry's current model, or fall back."""
+    return predict_hearing_durations([case_data])[0][0]
 
 @schedule_bp.route("/api/daily-schedule", methods=["GET"])
 def get_daily_schedule():
@@ -44,112 +66,380 @@ def get_daily_schedule():
     schedule = list(db["schedules"].find({"date": date_str}, {"_id": 0}))
     return jsonify(schedule)
 
+BULK_BATCH_SIZE = 1000
+
+def schedule_entry(case, judge, date_str, start, end, duration, room=None):
+    """Schedule document for one planned hearing (times in minutes)."""
+    return {
+        "case_number": case.get("caseNumber"),
+        "case_type": case.get("caseType"),
+        "judge_id": judge["id"],
+        "judge_name": judge["name"],
+        "date": date_str,
+        "start_time": scheduling.hhmm(start),
+        "end_time": scheduling.hhmm(end),
+        "duration_minutes": duration,
+        "risk_level": scheduling.risk_level(duration),
+        "status": "Upcoming",
+        "court_name": room["court_name"] if room else None,
+        "court_room": room["room"] if room else None,
+        "court_room_id": room["id"] if room else None
+    }
+
+def bulk_flush(col, ops, batch_size=BULK_BATCH_SIZE, on_batch=None):
+    """Run write ops in unordered bulk_write batches."""
+    for i in range(0, len(ops), batch_size):
+        col.bulk_write(ops[i:i + batch_size], ordered=False)
+        if on_batch:
+            on_batch(min(i + batch_size, len(ops)))
+
+def persist_schedule(db, entries, cases, progress=None):
+    """Insert schedule entries and mark their cases Scheduled, in bulk."""
+    total = 2 * len(entries)
+    report = (lambda done, offset=0: progress("writing", offset + done, total)) if progress else None
+    bulk_flush(db["schedules"], [InsertOne(e) for e in entries], on_batch=report)
+    bulk_flush(db["cases"], [
+        UpdateOne({"caseNumber": c.get("caseNumber")},
+                  {"$set": {"status": "Scheduled", "hearingDate": e["date"]}})
+        for c, e in zip(cases, entries)
+    ], on_batch=(lambda done: report(done, len(entries))) if report else None)
+    incr({case_status_counter("Pending"): -len(entries), case_status_counter("Scheduled"): len(entries)})
+    rollups.apply_schedules(entries)
+    rollups.apply_status_change(cases, "Pending", "Scheduled")
+
+def clear_upcoming(db, dates):
+    """Drop the Upcoming entries of the given dates before they are re-planned."""
+    query = {"date": {"$in": list(dates)}, "status": "Upcoming"}
+    removed = list(db["schedules"].find(query, rollups.SCHEDULE_ROLLUP_FIELDS))
+    db["schedules"].delete_many(query)
+    rollups.apply_schedules(removed, -1)
+
+def schedule_locks(dates):
+    return [f"schedule:{d}" for d in dates]
+
+def run_reschedule(params, progress):
+    """
+    One reschedule pass (the body of a reschedule job). params:
+    {"mode", "date", "dates", "time_budget", "dry_run"}; see reschedule_ai.
+    """
+    db = get_db()
+    mode, dates = params["mode"], params["dates"]
+
+    progress("loading")
+    pending_cases = list(db["cases"].find({"status": "Pending"}, scheduling.PENDING_PROJECTION))
+    available_judges = list(db["judges"].find({"status": "Available"}, {"_id": 0}))
+    if not available_judges:
+        raise ValueError("No judges available")
+
+    progress("scoring", 0, len(pending_cases))
+    durations, scoring = predict_hearing_durations(pending_cases)
+    if scoring["fallback"]:
+        print(f"ℹ️ {scoring['fallback']}/{len(pending_cases)} cases used the heuristic duration")
+
+    progress("assigning", 0, len(pending_cases))
+    report = None
+    if mode == "solver":
+        rows, unplaced, report = schedule_solver.solve(pending_cases, durations, available_judges,
+                                                       dates, time_budget=params["time_budget"])
+    else:
+        placed, unplaced = scheduling.assign_day(pending_cases, durations, available_judges)
+        rows = [(case, judge, dates[0], start, end, duration) for case, judge, start, end, duration in placed]
+
+    # Rooms: hearings that stay on these dates keep theirs; new ones get a
+    # free one. A row whose judge is already in a kept hearing at that time,
+    # or for which no room is free, is not booked and its case stays Pending.
+    allocator = resources.RoomAllocator(resources.load_rooms(db))
+    allocator.preload(db["schedules"].find({"date": {"$in": dates}, "status": {"$ne": "Upcoming"}},
+                                           resources.SLOT_FIELDS))
+    booked, new_schedule, unroomed = [], [], 0
+    for row in rows:
+        room = allocator.allocate(row[2], row[1]["id"], row[3], row[4], row[0].get("caseNumber"))
+        if room is None:
+            unplaced.append(row[0])
+            unroomed += 1
+            continue
+        booked.append(row)
+        new_schedule.append(schedule_entry(*row, room=room))
+    if unroomed:
+        print(f"ℹ️ {unroomed} hearings left unscheduled: judge or every courtroom already booked")
+    if not params["dry_run"]:
+        progress("writing", 0, 2 * len(new_schedule))
+        clear_upcoming(db, dates)
+        persist_schedule(db, new_schedule, [row[0] for row in booked], progress)
+
+    result = {
+        "success": True,
+        "mode": mode,
+        "scheduled_count": len(new_schedule),
+        "unscheduled_count": len(unplaced),
+        "unroomed_count": unroomed,
+        "scoring": scoring
+    }
+    if report:
+        result["solver"] = report
+        result["dry_run"] = params["dry_run"]
+    return result
+
 @schedule_bp.route("/api/reschedule", methods=["POST"])
 def reschedule_ai():
-    """AI Auto-Scheduling Logic (Optimized)."""
+    """
+    AI Auto-Scheduling Logic (Optimized), run as a background job.
+    Body: {"date": "YYYY-MM-DD"} for the one-day greedy pass, or
+    {"date": ..., "mode": "solver", "days": N, "time_budget": seconds,
+    "dry_run": bool} to plan N working days under each judge's
+    daily_capacity_minutes (see app/utils/schedule_solver.py). Solver runs
+    report their utilization and backlog clearance next to the greedy pass.
+
+    Returns 202 with a job_id to poll at GET /api/reschedule/<job_id>. The
+    job (dry runs included, so they never read a half-written day) locks
+    its dates: an identical request made while it is active gets the same
+    job back, a conflicting one gets 409. "wait": true runs the job inline
+    and returns 200 with its result, or 500 if it failed; it is always
+    inline when BACKGROUND_JOBS is off (serverless, no long-lived worker).
+    """
+    data = request.json or {}
+    date_str = data.get("date", datetime.now().strftime("%Y-%m-%d"))
+    mode = data.get("mode", "greedy")
+    if mode not in ("greedy", "solver"):
+        return jsonify({"error": "mode must be greedy or solver"}), 400
+    try:
+        days = min(max(int(data.get("days", 5)), 1), 30) if mode == "solver" else 1
+        dates = schedule_solver.working_days(date_str, days) if mode == "solver" else [
+            datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")]
+        time_budget = min(max(float(data.get("time_budget", schedule_solver.DEFAULT_TIME_BUDGET)), 0.1), 30.0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "date must be YYYY-MM-DD; days and time_budget must be numbers"}), 400
+    params = {
+        "mode": mode,
+        "date": date_str,
+        "dates": dates,
+        "time_budget": time_budget,
+        "dry_run": mode == "solver" and bool(data.get("dry_run"))
+    }
+    key = f"{mode}:{','.join(dates)}:{time_budget}:{params['dry_run']}"
+
+    wait = bool(data.get("wait")) or not current_app.config.get("BACKGROUND_JOBS", True)
+    try:
+        job, created = jobs.submit("reschedule", key, schedule_locks(dates),
+                                   run_reschedule, params, wait=wait)
+    except jobs.LockBusy as busy:
+        return jsonify({"error": f"Another reschedule is running for {busy.name.split(':', 1)[1]}",
+                        "job_id": busy.holder}), 409
+
+    view = jobs.job_view(job)
+    view["deduplicated"] = not created
+    view["status_url"] = f"/api/reschedule/{job['_id']}"
+    if wait and created:
+        return jsonify(view), 200 if job["status"] == "done" else 500
+    return jsonify(view), 202
+
+@schedule_bp.route("/api/reschedule/simulate", methods=["POST"])
+def simulate_reschedule():
+    """
+    Compare what-if scenarios without writing anything.
+    Body: {"date", "mode", "days", "time_budget", "refresh",
+           "scenarios": [{"name", "judges_on_leave", "extra_benches", "extra_bench",
+                          "extra_courtrooms", "buffer_minutes", ...}]}
+    Each scenario is planned in memory against one snapshot of pending
+    cases, available judges and courtrooms (see
+    app/utils/schedule_simulator.py).
+    """
+    data = request.json or {}
+    date_str = data.get("date", datetime.now().strftime("%Y-%m-%d"))
+    scenarios = data.get("scenarios") or [{"name": "baseline"}]
+    if not isinstance(scenarios, list) or not all(isinstance(sc, dict) for sc in scenarios):
+        return jsonify({"error": "scenarios must be a list of objects"}), 400
+    if len(scenarios) > schedule_simulator.MAX_SCENARIOS:
+        return jsonify({"error": f"At most {schedule_simulator.MAX_SCENARIOS} scenarios per request"}), 400
+
+    snapshot = schedule_simulator.load_snapshot(predict_hearing_durations, refresh=bool(data.get("refresh")))
+    started = time.perf_counter()
+    results = []
+    try:
+        for i, scenario in enumerate(scenarios):
+            result = schedule_simulator.run_scenario(
+                snapshot, scenario, date_str,
+                mode=data.get("mode", "greedy"),
+                days=data.get("days", 1),
+                time_budget=data.get("time_budget", 0.5)
+            )
+            result["name"] = result["name"] or f"scenario {i + 1}"
+            results.append(result)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Scenario {len(results) + 1}: {e}"}), 400
+    elapsed = time.perf_counter() - started
+
+    return jsonify({
+        "snapshot": {
+            "pending_cases": len(snapshot["cases"]),
+            "available_judges": len(snapshot["judges"]),
+            "courtrooms": len(snapshot["rooms"]),
+            "age_s": round(time.time() - snapshot["taken_at"], 1),
+            "scoring": snapshot["scoring"]
+        },
+        "scenarios": results,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "scenarios_per_sec": round(len(results) / elapsed, 1) if elapsed else None
+    })
+
+@schedule_bp.route("/api/reschedule/<job_id>", methods=["GET"])
+def reschedule_status(job_id):
+    """Status, progress ({stage, done, total}) and result of a reschedule job."""
+    job = jobs.get_job(job_id)
+    if not job or job.get("kind") != "reschedule":
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(jobs.job_view(job))
+
+def repack_judge(db, date_str, judge_id, order_key=None):
+    """
+    Re-lay one judge's Upcoming hearings on a date from the start of the
+    day, around hearings in any other status, in their current order (or
+    sorted by order_key). Each keeps its courtroom if still free at the
+    new time. Only entries whose times or room change are written.
+    Returns the changed entries, or None (nothing written) if they no
+    longer fit the day or one would be left without a free courtroom.
+    """
+    mine = list(db["schedules"].find({"date": date_str, "judge_id": judge_id}))
+    movable = sorted((e for e in mine if e.get("status") == "Upcoming"), key=scheduling.slot_interval)
+    fixed = [scheduling.slot_interval(e) for e in mine if e.get("status") != "Upcoming"]
+    if order_key:
+        movable.sort(key=order_key)
+    slots = scheduling.pack([float(e.get("duration_minutes") or 0) for e in movable], fixed)
+    if slots is None:
+        return None
+
+    # Room occupancy: the judge's fixed hearings plus other judges' booked rooms
+    allocator = resources.RoomAllocator(resources.load_rooms(db))
+    allocator.preload(e for e in mine if e.get("status") != "Upcoming")
+    allocator.preload(db["schedules"].find({"date": date_str, "judge_id": {"$ne": judge_id},
+                                            "court_room": {"$ne": None}}, resources.SLOT_FIELDS))
+    changed = []
+    for entry, (start, end) in zip(movable, slots):
+        current = allocator.room_of(entry)
+        room = allocator.allocate(date_str, judge_id, start, end, entry.get("case_number"),
+                                  prefer=current["id"] if current else None)
+        if room is None:
+            return None
+        update = {
+            "start_time": scheduling.hhmm(start),
+            "end_time": scheduling.hhmm(end),
+            "court_name": room["court_name"],
+            "court_room": room["room"],
+            "court_room_id": room["id"]
+        }
+        if any(entry.get(k) != v for k, v in update.items()):
+            changed.append((entry, update))
+    for entry, update in changed:
+        entry.update(update)
+    bulk_flush(db["schedules"], [UpdateOne({"_id": e["_id"]}, {"$set": update}) for e, update in changed])
+    return [e for e, _ in changed]
+
+def _slot_view(entry):
+    return {k: entry.get(k) for k in ("case_number", "judge_id", "start_time", "end_time", "duration_minutes",
+                                      "court_name", "court_room")}
+
+@schedule_bp.route("/api/reschedule/patch", methods=["POST"])
+def patch_schedule():
+    """
+    Change one case in an existing day plan without rebuilding it.
+    Body: {"date": "YYYY-MM-DD", "case_number": ..., "op": ...} where op is
+      insert        book a Pending case into the earliest fitting gap
+      remove        drop its Upcoming hearing (case back to Pending); with
+                    "compact" (default true) the judge's later hearings move up
+      reprioritize  set its "priority" and reorder that judge's Upcoming hearings
+    Only the affected judge's timeline is rewritten; the rest of the day is
+    read (slot fields only) to find gaps and free courtrooms. POST
+    /api/reschedule remains the full rebuild.
+    """
     db = get_db()
-    cases_col = db["cases"]
-    judges_col = db["judges"]
-    schedules_col = db["schedules"]
-    
-    date_str = request.json.get("date", datetime.now().strftime("%Y-%m-%d"))
-    
-    
-    schedules_col.delete_many({"date": date_str, "status": "Upcoming"})
-    
-    
-    pending_cases = list(cases_col.find({"status": "Pending"}))
-    available_judges = list(judges_col.find({"status": "Available"}, {"_id": 0}))
-    
-    if not available_judges:
-        return jsonify({"error": "No judges available"}), 400
-
-    new_schedule = []
-    
-    
-    
-    
-    pending_cases.sort(key=lambda c: (
-        1 if c.get("caseType") == "Criminal" else 2, 
-        0 if c.get("priority") == "High" else 1      
-    ))
-
-    
-    
-    judge_timetrack = {j["id"]: datetime.strptime(f"{date_str} 10:00", "%Y-%m-%d %H:%M") for j in available_judges}
-
-    for case in pending_cases:
+    data = request.json or {}
+    date_str = data.get("date", datetime.now().strftime("%Y-%m-%d"))
+    try:
+        datetime.strptime(str(date_str), "%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "date must be YYYY-MM-DD"}), 400
+    case_number = data.get("case_number")
+    op = data.get("op")
+    if not case_number or op not in ("insert", "remove", "reprioritize"):
+        return jsonify({"error": "case_number and op (insert, remove or reprioritize) are required"}), 400
+
+    # Same per-date lock as reschedule jobs, so a patch never interleaves with a rebuild
+    owner = f"patch-{uuid.uuid4().hex[:12]}"
+    try:
+        jobs.acquire(schedule_locks([date_str]), owner, db)
+    except jobs.LockBusy as busy:
+        return jsonify({"error": "A reschedule is running for this date", "job_id": busy.holder}), 409
+    try:
+        return _apply_patch(db, data, date_str, case_number, op)
+    finally:
+        jobs.release(schedule_locks([date_str]), owner, db)
+
+def _apply_patch(db, data, date_str, case_number, op):
+    case = db["cases"].find_one({"caseNumber": case_number}, scheduling.PENDING_PROJECTION)
+    if not case:
+        return jsonify({"error": "Case not found"}), 404
+    booked = db["schedules"].find_one({"date": date_str, "case_number": case_number, "status": "Upcoming"})
+
+    if op == "insert":
+        if booked:
+            return jsonify({"error": "Case is already on this day's schedule"}), 409
+        if case.get("status") != "Pending":
+            return jsonify({"error": f"Case is {case.get('status')}, not Pending"}), 409
+        judges = list(db["judges"].find({"status": "Available"}, {"_id": 0}))
+        day = list(db["schedules"].find({"date": date_str}, resources.SLOT_FIELDS))
+        busy = {}
+        for entry in day:
+            busy.setdefault(entry["judge_id"], []).append(scheduling.slot_interval(entry))
+        for intervals in busy.values():
+            intervals.sort()
         duration = predict_hearing_duration(case)
-        buffer_time = 15 
-        
-        best_judge = None
-        min_load = float('inf')
-        
-        
-        for judge in available_judges:
-            specializations = [s.lower() for s in judge.get("specializations", [])]
-            case_type = case.get("caseType", "").lower()
-            
-            
-            is_expert = any(s in case_type for s in specializations)
-            
-            current_time = judge_timetrack[judge["id"]]
-            day_end = datetime.strptime(f"{date_str} 17:00", "%Y-%m-%d %H:%M")
-            
-            if current_time + timedelta(minutes=duration) <= day_end:
-                
-                finish_timestamp = current_time.timestamp()
-                score = finish_timestamp
-                if is_expert:
-                    score -= 3600 
-                    
-                if score < min_load:
-                    min_load = score
-                    best_judge = judge
-        
-        
-        if not best_judge:
-             for judge in available_judges:
-                current_time = judge_timetrack[judge["id"]]
-                day_end = datetime.strptime(f"{date_str} 17:00", "%Y-%m-%d %H:%M")
-                if current_time + timedelta(minutes=duration) <= day_end:
-                    best_judge = judge
-                    break
-        
-        if best_judge:
-            start_time = judge_timetrack[best_judge["id"]]
-            end_time = start_time + timedelta(minutes=duration)
-            
-            risk = "Low"
-            if duration > 60: risk = "Medium"
-            if duration > 90: risk = "High"
-
-            
-            demo_courts = ["District Court Complex", "High Court Annex", "City Civil Court"]
-            demo_rooms = ["Room 101", "Hall 3", "Room 4B", "Chamber 2", "Court Hall 7"]
-            
-            sched_entry = {
-                "case_number": case.get("caseNumber"),
-                "case_type": case.get("caseType"),
-                "judge_id": best_judge["id"],
-                "judge_name": best_judge["name"],
-                "date": date_str,
-                "start_time": start_time.strftime("%H:%M"),
-                "end_time": end_time.strftime("%H:%M"),
-                "duration_minutes": duration,
-                "risk_level": risk,
-                "status": "Upcoming",
-                "court_name": random.choice(demo_courts),
-                "court_room": random.choice(demo_rooms)
-            }
-            new_schedule.append(sched_entry)
-            schedules_col.insert_one(sched_entry)
-            
-            cases_col.update_one(
-                {"caseNumber": case.get("caseNumber")},
-                {"$set": {"status": "Scheduled", "hearingDate": date_str}}
-            )
-            
-            judge_timetrack[best_judge["id"]] = end_time + timedelta(minutes=buffer_time)
+        slot = scheduling.best_slot(judges, busy, case, duration)
+        if slot is None:
+            return jsonify({"error": "No judge has a gap long enough on this day"}), 409
+        judge, start = slot
+        allocator = resources.RoomAllocator(resources.load_rooms(db))
+        allocator.preload(day)
+        room = allocator.allocate(date_str, judge["id"], start, start + duration, case_number)
+        if room is None:
+            clash = allocator.conflicts(date_str, judge["id"], start, start + duration)
+            return jsonify({"error": "No courtroom is free for the best slot",
+                            "judge_id": judge["id"], "start_time": scheduling.hhmm(start),
+                            "judge_conflict": clash["judge"], "room_conflicts": clash["rooms"]}), 409
+        entry = schedule_entry(case, judge, date_str, start, start + duration, duration, room)
+        persist_schedule(db, [entry], [case])
+        return jsonify({"success": True, "op": op, "judge_id": judge["id"], "changed": [_slot_view(entry)]})
+
+    if op == "remove":
+        if not booked:
+            return jsonify({"error": "Case has no Upcoming hearing on this day"}), 404
+        db["schedules"].delete_one({"_id": booked["_id"]})
+        db["cases"].update_one({"caseNumber": case_number},
+                               {"$set": {"status": "Pending"}, "$unset": {"hearingDate": ""}})
+        if case.get("status") != "Pending":
+            incr({case_status_counter(case.get("status")): -1, case_status_counter("Pending"): 1})
+            rollups.apply_status_change([case], case.get("status"), "Pending")
+        rollups.apply_schedules([booked], -1)
+        changed = repack_judge(db, date_str, booked["judge_id"]) if data.get("compact", True) else []
+        result = {"success": True, "op": op, "judge_id": booked["judge_id"],
+                  "changed": [_slot_view(e) for e in changed or []]}
+        if changed is None:
+            result["warning"] = "Hearing removed; later hearings kept their times (no free courtroom to move them into)"
+        return jsonify(result)
+
+    priority = data.get("priority")
+    if priority not in PRIORITIES:
+        return jsonify({"error": f"priority must be one of {', '.join(PRIORITIES)}"}), 400
+    db["cases"].update_one({"caseNumber": case_number}, {"$set": {"priority": priority}})
+    if not booked:
+        return jsonify({"success": True, "op": op, "judge_id": None, "changed": []})
 
-    return jsonify({"success": True, "scheduled_count": len(new_schedule)})
+    judge_id = booked["judge_id"]
+    numbers = db["schedules"].distinct("case_number", {"date": date_str, "judge_id": judge_id, "status": "Upcoming"})
+    cases = {c["caseNumber"]: c for c in db["cases"].find({"caseNumber": {"$in": numbers}},
+                                                           {"_id": 0, "caseNumber": 1, "caseType": 1, "priority": 1})}
+    changed = repack_judge(db, date_str, judge_id,
+                           order_key=lambda e: scheduling.priority_key(cases.get(e["case_number"], {})))
+    if changed is None:
+        return jsonify({"success": True, "op": op, "judge_id": judge_id, "changed": [],
+                        "warning": "Priority saved; reordered hearings would overrun the day or lack a free courtroom, so times were kept"})
+    return jsonify({"success": True, "op": op, "judge_id": judge_id, "changed": [_slot_view(e) for e in changed]})
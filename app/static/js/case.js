@@ -3,25 +3,32 @@ function registerCase() {
   const caseType = document.getElementById("caseType").value;
   const complexity = document.getElementById("complexity").value;
   const judgeExp = document.getElementById("judgeExperience").value;
+  // Features of the hearing-duration model (GET /api/models)
+  const features = {
+    caseType: caseType,
+    complexity: complexity,
+    witnesses: parseInt(document.getElementById("witnesses").value),
+    advocates: parseInt(document.getElementById("advocates").value),
+    previous_hearings: parseInt(document.getElementById("previous_hearings").value)
+  };
 
   fetch(`${API_BASE}/register-case`, {
     method: "POST",
-    headers: { 
+    headers: {
       "Content-Type": "application/json",
-      
+
       "X-Token": localStorage.getItem("token") || "",
     },
     body: JSON.stringify({
       caseNumber: caseNumber,
-      caseType: caseType,
-      complexity: parseInt(complexity),
+      ...features,
       judge_experience: parseInt(judgeExp)
     })
   })
   .then(res => res.json())
   .then(data => {
     alert("Case Registered Successfully!");
-    predictDuration(complexity, judgeExp);
+    predictDuration(features);
   })
   .catch(err => {
     alert("Error registering case");
@@ -29,21 +36,19 @@ function registerCase() {
   });
 }
 
-function predictDuration(complexity, judgeExp) {
+function predictDuration(features) {
   fetch(`${API_BASE}/predict-duration`, {
     method: "POST",
-    headers: { 
+    headers: {
       "Content-Type": "application/json",
       "X-Token": localStorage.getItem("token") || ""
     },
-    body: JSON.stringify({
-      complexity: parseInt(complexity),
-      judge_experience: parseInt(judgeExp)
-    })
+    body: JSON.stringify(features)
   })
-  .then(res => res.json())
-  .then(data => {
-    document.getElementById("prediction").innerText =
-      `Predicted Hearing Duration: ${data.predicted_days} days`;
+  .then(res => res.json().then(data => ({ ok: res.ok, data })))
+  .then(({ ok, data }) => {
+    document.getElementById("prediction").innerText = ok
+      ? `Predicted Hearing Duration: ${data.predicted_days} days`
+      : `Prediction unavailable: ${data.error}`;
   });
 }
@@ -1,8 +1,11 @@
-import pickle
 import os
+import sys
 from sklearn.linear_model import LinearRegression
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.model_registry import publish, HEARING_DURATION
+
 
 X = np.array([
     [1, 1, 0],
@@ -18,8 +21,6 @@ model = LinearRegression()
 model.fit(X, y)
 
 
-model_path = os.path.join(os.path.dirname(__file__), "hearing_model.pkl")
-with open(model_path, "wb") as f:
-    pickle.dump(model, f)
+version = publish(HEARING_DURATION, model, ["witnesses", "advocates", "previous_hearings"])
 
-print("✅ AI Hearing Duration Model Trained & Saved")
+print("✅ AI Hearing Duration Model Trained & Saved as", version)
@@ -0,0 +1,28 @@
+"""
+Lazily constructed AI SDK clients.
+
+The google-genai SDK is slow to import and its client is built once per
+process on first use, not when the app starts. Callers run inside their
+own try/except fallbacks (Ollama, mock answers), so a missing key or SDK
+surfaces as a RuntimeError there.
+"""
+
+import os
+import threading
+
+_lock = threading.Lock()
+_genai_client = None
+
+
+def get_genai_client():
+    """The shared Gemini client; raises RuntimeError if it cannot be built."""
+    global _genai_client
+    if _genai_client is None:
+        with _lock:
+            if _genai_client is None:
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("GOOGLE_API_KEY is not set")
+                from google import genai
+                _genai_client = genai.Client(api_key=api_key)
+    return _genai_client
@@ -0,0 +1,62 @@
+"""
+Small in-process TTL cache with stampede protection.
+
+Only one thread per key recomputes an expired entry. While it runs, other
+callers get the stale value if there is one, or wait for the fresh one if
+there is not, so N concurrent dashboard refreshes cost one database query.
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # key -> (value, expires_at)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def set(self, key, value, ttl=None):
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def get_or_compute(self, key, compute, ttl=None):
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        lock = self._key_lock(key)
+        if entry is not None and not lock.acquire(blocking=False):
+            # Someone else is refreshing; serve the stale value meanwhile.
+            return entry[0]
+        if entry is None:
+            lock.acquire()
+        try:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            value = compute()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            lock.release()
+
+    def invalidate(self, match=None):
+        """Drop every entry, or those whose key satisfies match(key)."""
+        with self._lock:
+            for key in list(self._entries):
+                if match is None or match(key):
+                    del self._entries[key]
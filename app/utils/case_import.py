@@ -0,0 +1,236 @@
+"""
+Validated, batched case upserts for bulk registration.
+
+Rows are read lazily (NDJSON or CSV), validated one at a time and upserted
+on caseNumber with unordered bulk_write batches, so memory stays flat
+whatever the upload size. Counters and rollups are adjusted per batch for
+the rows that actually landed.
+"""
+
+import csv
+import json
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.utils.db import get_db
+from app.utils.case_search import with_search_fields, SEARCH_FIELDS, DERIVED_FIELDS
+from app.utils.counters import incr, case_status_counter, CASES_TOTAL
+from app.utils.pagination import invalidate_counts
+from app.utils import rollups
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+STRING_FIELDS = ["title", "caseType", "court", "judge", "description", "petitioner",
+                 "respondent", "complexity", "status"]
+INT_FIELDS = ["witnesses", "advocates", "previous_hearings"]
+DATE_FIELDS = ["filingDate", "hearingDate", "closedDate"]
+# Shared with single registration (register_case_api) and the case-registration form
+PRIORITIES = ["Normal", "High", "Critical"]
+
+
+class _Lines:
+    """
+    UTF-8 lines of a byte stream. A line that does not decode raises
+    UnicodeDecodeError from next() without ending the iteration.
+    """
+
+    def __init__(self, stream):
+        self.stream = iter(stream)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.stream).decode("utf-8")
+
+
+def iter_rows(stream, fmt="ndjson"):
+    """
+    Yield (row number, parsed row or exception) from a byte stream. Rows
+    that do not decode or parse are yielded as their exception, so one bad
+    row never aborts an import part-way through.
+    """
+    lines = _Lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        i = 0
+        while True:
+            i += 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except (csv.Error, UnicodeDecodeError) as e:
+                yield i, e
+                continue
+            yield i, {k: v for k, v in row.items() if k and v not in (None, "")}
+    i = 0
+    while True:
+        i += 1
+        try:
+            line = next(lines).strip()
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            yield i, e
+            continue
+        if not line:
+            continue
+        try:
+            yield i, json.loads(line)
+        except ValueError as e:
+            yield i, e
+
+
+def validate_case(row):
+    """
+    Return a clean case document, or raise ValueError naming the problem.
+    Used by both single and bulk registration, so they accept the same cases.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object")
+    case_number = str(row.get("caseNumber") or "").strip()
+    if not case_number:
+        raise ValueError("caseNumber is required")
+
+    doc = {"caseNumber": case_number}
+    for field in STRING_FIELDS:
+        if row.get(field) not in (None, ""):
+            doc[field] = str(row[field]).strip()
+    for field in INT_FIELDS:
+        if row.get(field) not in (None, ""):
+            try:
+                value = int(row[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be an integer")
+            if value < 0:
+                raise ValueError(f"{field} must not be negative")
+            doc[field] = value
+    for field in DATE_FIELDS:
+        if row.get(field) not in (None, ""):
+            try:
+                datetime.strptime(str(row[field]), "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"{field} must be YYYY-MM-DD")
+            doc[field] = str(row[field])
+    if row.get("priority") not in (None, ""):
+        if row["priority"] not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        doc["priority"] = row["priority"]
+    return doc
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row_no, case_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_no, "caseNumber": case_number, "error": message})
+
+    def as_dict(self):
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+def _flush(db, batch, report):
+    """Upsert one batch of (row number, doc) and fix counters and rollups."""
+    if not batch:
+        return
+    cases_col = db["cases"]
+    numbers = [doc["caseNumber"] for _, doc in batch]
+    fields = dict(rollups.CASE_ROLLUP_FIELDS, caseNumber=1, _id=0)
+    fields.update({f: 1 for f in SEARCH_FIELDS})
+    existing = {c["caseNumber"]: c for c in cases_col.find({"caseNumber": {"$in": numbers}}, fields)}
+    ops = []
+    for _, doc in batch:
+        # Search fields are derived from the merged document so a partial
+        # update keeps matching on fields it did not resend.
+        merged = with_search_fields(dict(existing.get(doc["caseNumber"], {}), **doc))
+        doc.update({f: merged[f] for f in DERIVED_FIELDS})
+        update = {"$set": doc}
+        if "status" not in doc:
+            # New cases start Pending; updates keep their current status
+            update["$setOnInsert"] = {"status": "Pending"}
+        ops.append(UpdateOne({"caseNumber": doc["caseNumber"]}, update, upsert=True))
+    try:
+        result = cases_col.bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as bwe:
+        result = bwe.details
+
+    failed = set()
+    for err in result.get("writeErrors", []):
+        row_no, doc = batch[err["index"]]
+        failed.add(err["index"])
+        report.error(row_no, doc["caseNumber"], err.get("errmsg", "Write failed"))
+
+    deltas = {}
+    removed, added = [], []
+    for index, (_, doc) in enumerate(batch):
+        if index in failed:
+            continue
+        old = existing.get(doc["caseNumber"])
+        new = dict(old or {"status": "Pending"}, **doc)
+        if old is None:
+            report.inserted += 1
+            deltas[CASES_TOTAL] = deltas.get(CASES_TOTAL, 0) + 1
+        else:
+            report.updated += 1
+            removed.append(old)
+            old_key = case_status_counter(old.get("status"))
+            deltas[old_key] = deltas.get(old_key, 0) - 1
+        new_key = case_status_counter(new.get("status"))
+        deltas[new_key] = deltas.get(new_key, 0) + 1
+        added.append(new)
+
+    incr(deltas, db)
+    if removed:
+        rollups.apply_case(removed, -1, db)
+    if added:
+        rollups.apply_case(added, 1, db)
+
+
+def import_cases(rows, db=None, batch_size=BATCH_SIZE, on_flush=None):
+    """
+    Validate and upsert (row number, row) pairs; returns an ImportReport.
+    A caseNumber repeated inside one batch flushes the batch first so the
+    counter bookkeeping sees the earlier write. on_flush(last_row_no, report)
+    runs after each batch is written (used for checkpointing).
+    """
+    db = db if db is not None else get_db()
+    report = ImportReport()
+    batch, in_batch = [], set()
+    for row_no, row in rows:
+        report.received += 1
+        if isinstance(row, Exception):
+            report.error(row_no, None, f"Unparseable row: {row}")
+            continue
+        try:
+            doc = validate_case(row)
+        except ValueError as e:
+            report.error(row_no, row.get("caseNumber") if isinstance(row, dict) else None, str(e))
+            continue
+        if doc["caseNumber"] in in_batch or len(batch) >= batch_size:
+            _flush(db, batch, report)
+            if on_flush:
+                on_flush(batch[-1][0], report)
+            batch, in_batch = [], set()
+        batch.append((row_no, doc))
+        in_batch.add(doc["caseNumber"])
+    _flush(db, batch, report)
+    if on_flush and batch:
+        on_flush(batch[-1][0], report)
+    invalidate_counts("cases")
+    return report
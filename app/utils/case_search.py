@@ -0,0 +1,205 @@
+"""
+Indexed search for /api/cases.
+
+Each case carries two derived fields maintained on write:
+  * caseNumberNorm - upper-cased case number, searched with an anchored
+    prefix regex so the caseNumber index gives a tight range scan.
+  * search_grams   - trigrams (plus 1-2 char word prefixes) of the case
+    number, title, caseType, court and judge, in a multikey index.
+
+A search fetches up to MAX_CANDIDATES candidates through those two
+indexes (case-number hits first, then gram hits newest first), verifies
+the real substring match, ranks and highlights in Python, then pages the
+result.
+
+Startup runs the backfill once per SEARCH_VERSION (ensure_search_fields).
+
+CLI:
+    python -m app.utils.case_search --backfill   # add fields to existing cases
+"""
+
+import html
+import re
+import sys
+from pymongo import UpdateOne, ASCENDING, DESCENDING
+from app.utils.db import get_db
+
+SEARCH_FIELDS = ["title", "caseType", "court", "judge"]
+DERIVED_FIELDS = ["search_grams", "caseNumberNorm"]
+# Projection for returning cases to clients without the derived fields
+CASE_PROJECTION = {"_id": 0, "search_grams": 0, "caseNumberNorm": 0}
+
+MAX_CANDIDATES = 1000
+# Bump when the derived fields change; ensure_search_fields backfills on mismatch.
+SEARCH_VERSION = 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text):
+    return str(text or "").lower()
+
+
+def _word_grams(word):
+    grams = {"^" + word[:n] for n in (1, 2) if len(word) >= n}
+    grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def build_search_grams(doc):
+    grams = set()
+    for field in ["caseNumber"] + SEARCH_FIELDS:
+        for word in _WORD_RE.findall(_normalize(doc.get(field))):
+            grams |= _word_grams(word)
+    return sorted(grams)
+
+
+def with_search_fields(doc):
+    """Add the derived search fields to a case document (in place)."""
+    doc["caseNumberNorm"] = str(doc.get("caseNumber") or "").upper()
+    doc["search_grams"] = build_search_grams(doc)
+    return doc
+
+
+def _query_grams(term):
+    words = _WORD_RE.findall(_normalize(term))
+    grams = []
+    for word in words:
+        if len(word) < 3:
+            grams.append("^" + word)
+        else:
+            grams.extend(word[i:i + 3] for i in range(len(word) - 2))
+    # Longer, rarer-looking grams first: the planner drives the scan from
+    # the first $all element.
+    return sorted(set(grams), key=lambda g: (g.startswith("^"), -len(g), g))
+
+
+def _score(case, term_lc, term_uc):
+    number = str(case.get("caseNumber") or "").upper()
+    score = 0
+    if number == term_uc:
+        score += 100
+    elif number.startswith(term_uc):
+        score += 50
+    elif term_uc in number:
+        score += 20
+
+    for weight, field in ((10, "title"), (4, "judge"), (3, "court"), (2, "caseType")):
+        value = _normalize(case.get(field))
+        pos = value.find(term_lc)
+        if pos < 0:
+            continue
+        score += weight
+        # Word-start matches rank above mid-word ones
+        if pos == 0 or not value[pos - 1].isalnum():
+            score += weight
+    return score
+
+
+def highlight(value, term):
+    """HTML-escape value and wrap case-insensitive matches of term in <mark>."""
+    value = str(value or "")
+    if not term:
+        return html.escape(value)
+    parts = re.split(f"({re.escape(term)})", value, flags=re.IGNORECASE)
+    return "".join(
+        f"<mark>{html.escape(p)}</mark>" if i % 2 else html.escape(p)
+        for i, p in enumerate(parts)
+    )
+
+
+def search_cases(term, page=1, limit=20, cases_col=None):
+    """
+    Ranked search returning the /api/cases response shape. Each case gets a
+    "highlight" dict with marked-up fields that matched.
+    """
+    cases_col = cases_col if cases_col is not None else get_db()["cases"]
+    term = term.strip()
+    term_lc, term_uc = term.lower(), term.upper()
+
+    prefix = {"caseNumberNorm": {"$regex": "^" + re.escape(term_uc)}}
+    clauses = [prefix]
+    grams = _query_grams(term)
+    if grams:
+        clauses.append({"search_grams": {"$all": grams}})
+
+    # Candidates in relevance order before truncating: case-number hits
+    # (exact, then prefix), then gram hits newest first
+    candidates = list(cases_col.find(prefix, CASE_PROJECTION)
+                      .sort("caseNumberNorm", ASCENDING).limit(MAX_CANDIDATES))
+    exact = [c for c in candidates if str(c.get("caseNumber") or "").upper() == term_uc]
+    candidates = exact + [c for c in candidates if c not in exact]
+    if grams and len(candidates) < MAX_CANDIDATES:
+        candidates += cases_col.find(
+            {"search_grams": {"$all": grams}, "caseNumberNorm": {"$not": prefix["caseNumberNorm"]}},
+            CASE_PROJECTION
+        ).sort("filingDate", DESCENDING).limit(MAX_CANDIDATES - len(candidates))
+    truncated = len(candidates) >= MAX_CANDIDATES
+
+    ranked = []
+    for case in candidates:
+        score = _score(case, term_lc, term_uc)
+        if score:
+            ranked.append((score, case.get("filingDate") or "", case))
+    ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+
+    # Past MAX_CANDIDATES only the first candidates are ranked; the total
+    # then counts every index match, verified or not
+    total = cases_col.count_documents({"$or": clauses}) if truncated else len(ranked)
+    start = (page - 1) * limit
+    results = []
+    for _, _, case in ranked[start:start + limit]:
+        case["highlight"] = {
+            field: highlight(case.get(field), term)
+            for field in ["caseNumber"] + SEARCH_FIELDS
+            if term_lc in _normalize(case.get(field))
+        }
+        results.append(case)
+
+    return {
+        "cases": results,
+        "total": total,
+        "page": page,
+        "pages": (total + limit - 1) // limit,
+        "total_estimated": truncated
+    }
+
+
+def backfill_search_fields(db=None, batch_size=1000):
+    """Populate derived search fields on cases that predate them."""
+    db = db if db is not None else get_db()
+    cases_col = db["cases"]
+    ops = []
+    updated = 0
+    cursor = cases_col.find(
+        {"search_grams": {"$exists": False}},
+        {f: 1 for f in ["caseNumber"] + SEARCH_FIELDS}
+    )
+    for case in cursor:
+        fields = with_search_fields({k: v for k, v in case.items() if k != "_id"})
+        ops.append(UpdateOne({"_id": case["_id"]}, {"$set": {f: fields[f] for f in DERIVED_FIELDS}}))
+        if len(ops) >= batch_size:
+            updated += cases_col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += cases_col.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def ensure_search_fields(db=None):
+    """Backfill search fields once for databases that predate them."""
+    db = db if db is not None else get_db()
+    marker = db["migrations"].find_one({"_id": "case_search"}) or {}
+    if marker.get("version") == SEARCH_VERSION:
+        return 0
+    updated = backfill_search_fields(db)
+    db["migrations"].replace_one({"_id": "case_search"}, {"version": SEARCH_VERSION}, upsert=True)
+    if updated:
+        print(f"✅ Search fields added to {updated} cases.")
+    return updated
+
+
+if __name__ == "__main__":
+    if "--backfill" in sys.argv[1:]:
+        print(f"✅ Search fields added to {backfill_search_fields()} cases.")
+    else:
+        print(__doc__)
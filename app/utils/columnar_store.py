@@ -0,0 +1,158 @@
+"""
+Memory-mapped columnar store of historical High Court records.
+
+One row per corpus record, one .npy file per column:
+
+    reg_day, decision_day   int32 days since 1970-01-01 (MISSING if unknown)
+    duration                int32 days from registration to decision (-1 if unknown)
+    year                    int16 (0 if unknown)
+    bench, case_type,
+    disposal                dictionary codes (smallest unsigned dtype that fits)
+    statute_offsets,
+    statute_codes           statutes per row in CSR layout: the codes of row i
+                            are statute_codes[statute_offsets[i]:statute_offsets[i + 1]]
+
+meta.json holds the row count and the code -> label dictionaries. Arrays
+are opened with mmap_mode="r", so a multi-million row store costs page
+cache rather than Python objects and filters run as NumPy vector ops.
+
+CLI:
+    python -m app.utils.columnar_store --build [--path DIR] [--out DIR] [--workers N]
+"""
+
+import json
+import os
+import sys
+import time
+from array import array
+from datetime import date
+from multiprocessing import Pool
+import numpy as np
+from app.utils.outcome_cube import parse_record, iter_corpus, DEFAULT_DATASET_PATH, CHUNK_SIZE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_STORE_PATH = os.path.join(BASE_DIR, "dataset", "hc_columns")
+STORE_VERSION = 1
+MISSING = np.iinfo(np.int32).min
+EPOCH = date(1970, 1, 1)
+DICTIONARIES = ("bench", "case_type", "disposal", "statute")
+
+
+def _code_dtype(size):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+class _Encoder:
+    """Assigns dense integer codes to labels in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+
+    def __call__(self, label):
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.codes)
+        return code
+
+    def labels(self):
+        return list(self.codes)
+
+
+def build(dataset_path=DEFAULT_DATASET_PATH, out_dir=DEFAULT_STORE_PATH, workers=None, log=print):
+    """Parse the corpus into a fresh store under out_dir. Returns the row count."""
+    started = time.monotonic()
+    encoders = {name: _Encoder() for name in DICTIONARIES}
+    cols = {
+        "reg_day": array("i"), "decision_day": array("i"), "duration": array("i"),
+        "year": array("h"), "bench": array("I"), "case_type": array("I"),
+        "disposal": array("I"), "statute_offsets": array("q", [0]), "statute_codes": array("I"),
+    }
+    with Pool(workers or os.cpu_count() or 1) as pool:
+        for record in pool.imap_unordered(parse_record, iter_corpus(dataset_path), CHUNK_SIZE):
+            if not record:
+                continue
+            reg, dec = record["reg_date"], record["decision_date"]
+            cols["reg_day"].append((reg - EPOCH).days if reg else MISSING)
+            cols["decision_day"].append((dec - EPOCH).days if dec else MISSING)
+            duration = record["duration_days"]
+            cols["duration"].append(duration if duration is not None else -1)
+            cols["year"].append(int(record["year"]) if str(record["year"]).isdigit() else 0)
+            for name in ("bench", "case_type", "disposal"):
+                cols[name].append(encoders[name](record[name]))
+            cols["statute_codes"].extend(encoders["statute"](s) for s in record["statutes"])
+            cols["statute_offsets"].append(len(cols["statute_codes"]))
+            rows = len(cols["year"])
+            if rows % 100000 == 0:
+                log(f"   {rows} rows ({rows / (time.monotonic() - started):,.0f} rows/s)")
+
+    os.makedirs(out_dir, exist_ok=True)
+    dictionaries = {name: enc.labels() for name, enc in encoders.items()}
+    for name, values in cols.items():
+        arr = np.frombuffer(values, dtype=values.typecode) if len(values) else np.array([], dtype=values.typecode)
+        if name in ("bench", "case_type", "disposal"):
+            arr = arr.astype(_code_dtype(len(dictionaries[name])))
+        elif name == "statute_codes":
+            arr = arr.astype(_code_dtype(len(dictionaries["statute"])))
+        # Write then rename so open memory maps keep the old file intact
+        tmp = os.path.join(out_dir, f".{name}.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(out_dir, f"{name}.npy"))
+
+    rows = len(cols["year"])
+    meta_tmp = os.path.join(out_dir, ".meta.json")
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": STORE_VERSION, "rows": rows, "dictionaries": dictionaries}, f)
+    os.replace(meta_tmp, os.path.join(out_dir, "meta.json"))
+    log(f"✅ Columnar store with {rows} rows written to {out_dir} in {time.monotonic() - started:.1f}s.")
+    return rows
+
+
+class ColumnarStore:
+    """Read-only view of a built store; columns are np.memmap arrays."""
+
+    COLUMNS = ("reg_day", "decision_day", "duration", "year", "bench", "case_type",
+               "disposal", "statute_offsets", "statute_codes")
+
+    def __init__(self, directory=DEFAULT_STORE_PATH):
+        self.directory = directory
+        meta_path = os.path.join(directory, "meta.json")
+        self.mtime = os.path.getmtime(meta_path)
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported columnar store version {meta.get('version')}")
+        self.rows = meta["rows"]
+        self.dictionaries = meta["dictionaries"]
+        self._index = {name: {label: code for code, label in enumerate(labels)}
+                       for name, labels in self.dictionaries.items()}
+        for name in self.COLUMNS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return self.rows
+
+    def code(self, column, label):
+        """Dictionary code of `label`, or -1 if it never occurs."""
+        return self._index[column].get(label, -1)
+
+    def label(self, column, code):
+        return self.dictionaries[column][code]
+
+    def statute_rows(self):
+        """Row id of every entry in statute_codes."""
+        return np.repeat(np.arange(self.rows), np.diff(self.statute_offsets))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--build" in args:
+        build(
+            args[args.index("--path") + 1] if "--path" in args else DEFAULT_DATASET_PATH,
+            args[args.index("--out") + 1] if "--out" in args else DEFAULT_STORE_PATH,
+            int(args[args.index("--workers") + 1]) if "--workers" in args else None,
+        )
+    else:
+        print(__doc__)
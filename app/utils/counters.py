@@ -0,0 +1,120 @@
+"""
+Materialized counters maintained on write.
+
+Each counter is one document in `counters`: {"_id": name, "value": n}.
+Write paths bump them with $inc so dashboards and badges read O(1)
+documents instead of recounting collections. `reconcile` recomputes every
+counter from source and repairs drift (run it from cron or on demand).
+
+Counter names:
+    cases.total, cases.status.<status>
+    notifications.total, notifications.unread
+
+CLI:
+    python -m app.utils.counters --reconcile
+"""
+
+import sys
+from pymongo import UpdateOne
+from app.utils.db import get_db
+
+CASES_TOTAL = "cases.total"
+NOTIFICATIONS_TOTAL = "notifications.total"
+NOTIFICATIONS_UNREAD = "notifications.unread"
+STATUS_PREFIX = "cases.status."
+
+
+def case_status_counter(status):
+    return f"{STATUS_PREFIX}{status or 'Unknown'}"
+
+
+def incr(deltas, db=None):
+    """Apply {counter name: delta} atomically per counter with $inc."""
+    ops = [
+        UpdateOne({"_id": name}, {"$inc": {"value": delta}}, upsert=True)
+        for name, delta in deltas.items() if delta
+    ]
+    if ops:
+        db = db if db is not None else get_db()
+        db["counters"].bulk_write(ops, ordered=False)
+
+
+def get_counters(names=None, db=None):
+    """Return {name: value}; missing counters read as 0."""
+    db = db if db is not None else get_db()
+    query = {"_id": {"$in": list(names)}} if names is not None else {}
+    values = {doc["_id"]: doc.get("value", 0) for doc in db["counters"].find(query)}
+    if names is not None:
+        for name in names:
+            values.setdefault(name, 0)
+    return values
+
+
+def get_counter(name, db=None):
+    return get_counters([name], db)[name]
+
+
+def status_counts(db=None):
+    """{status: count} for cases, from the cases.status.* counters."""
+    db = db if db is not None else get_db()
+    return {
+        doc["_id"][len(STATUS_PREFIX):]: doc.get("value", 0)
+        for doc in db["counters"].find({"_id": {"$regex": "^cases\\.status\\."}})
+        if doc.get("value", 0)
+    }
+
+
+def compute_counters(db=None):
+    """Recount every counter from the source collections."""
+    db = db if db is not None else get_db()
+    values = {
+        CASES_TOTAL: db["cases"].count_documents({}),
+        NOTIFICATIONS_TOTAL: db["notifications"].count_documents({}),
+        NOTIFICATIONS_UNREAD: db["notifications"].count_documents({"read": False}),
+    }
+    for row in db["cases"].aggregate([{"$group": {"_id": "$status", "n": {"$sum": 1}}}]):
+        values[case_status_counter(row["_id"])] = row["n"]
+    return values
+
+
+def reconcile(db=None):
+    """
+    Overwrite counters with freshly computed values. Returns
+    {name: (stored, actual)} for every counter that had drifted.
+    """
+    db = db if db is not None else get_db()
+    actual = compute_counters(db)
+    stored = get_counters(db=db)
+    # Status counters that no longer have any cases must drop to zero
+    for name in stored:
+        if name.startswith(STATUS_PREFIX) and name not in actual:
+            actual[name] = 0
+
+    drift = {
+        name: (stored.get(name, 0), value)
+        for name, value in actual.items() if stored.get(name, 0) != value
+    }
+    ops = [
+        UpdateOne({"_id": name}, {"$set": {"value": value}}, upsert=True)
+        for name, value in actual.items()
+    ]
+    if ops:
+        db["counters"].bulk_write(ops, ordered=False)
+    return drift
+
+
+def ensure_counters(db=None):
+    """Seed counters on first start; later drift is handled by reconcile."""
+    db = db if db is not None else get_db()
+    if db["counters"].find_one({"_id": CASES_TOTAL}) is None:
+        reconcile(db)
+
+
+if __name__ == "__main__":
+    if "--reconcile" in sys.argv[1:]:
+        drift = reconcile()
+        for name, (stored, actual) in sorted(drift.items()):
+            print(f"🔧 {name}: {stored} -> {actual}")
+        print(f"✅ Counters reconciled ({len(drift)} drifted).")
+    else:
+        print(__doc__)
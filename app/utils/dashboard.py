@@ -0,0 +1,52 @@
+"""
+Dashboard tiles.
+
+Case totals come from the materialized counters; the urgent list, today's
+hearing count, upcoming hearings and active judges are small indexed
+reads (urgent cases on the priority_status index, schedules on date). The
+result sits behind a short TTL cache so simultaneous refreshes share it.
+"""
+
+import os
+from datetime import datetime
+from pymongo import ASCENDING
+from app.utils.cache import TTLCache
+from app.utils.db import get_db
+from app.utils.counters import get_counters, case_status_counter, CASES_TOTAL
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "5"))
+URGENT_PRIORITIES = ["Critical", "High"]
+
+_cache = TTLCache(DASHBOARD_CACHE_TTL)
+
+
+def compute_dashboard_stats(db=None):
+    db = db if db is not None else get_db()
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    pending_counter = case_status_counter("Pending")
+    counters = get_counters([CASES_TOTAL, pending_counter], db)
+    # Sorted along the priority_status index, so Critical cases come first
+    urgent = db["cases"].find(
+        {"priority": {"$in": URGENT_PRIORITIES}, "status": {"$ne": "Closed"}},
+        {"_id": 0, "caseNumber": 1, "caseType": 1}
+    ).sort([("priority", ASCENDING), ("status", ASCENDING)]).limit(5)
+    return {
+        "total_cases": counters[CASES_TOTAL],
+        "pending_hearings": counters[pending_counter],
+        "todays_cases": db["schedules"].count_documents({"date": today_str}),
+        "avg_hearing_time": 45,
+        "urgent_cases": list(urgent),
+        "upcoming_hearings": list(db["schedules"].find({"date": {"$gte": today_str}}, {"_id": 0})
+                                  .sort("date", ASCENDING).limit(5)),
+        "active_judges": list(db["judges"].find({"status": "Available"}, {"_id": 0, "name": 1, "status": 1}).limit(3))
+    }
+
+
+def get_dashboard_stats():
+    """Cached dashboard tiles (see DASHBOARD_CACHE_TTL)."""
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    return _cache.get_or_compute(("stats", today_str), compute_dashboard_stats)
+
+
+def invalidate_dashboard():
+    _cache.invalidate()
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from pymongo import MongoClient, monitoring
+
+DB_NAME = "naya_court_db"
+
+# Pool settings (override via environment)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+
+
+class CheckoutStats(monitoring.ConnectionPoolListener):
+    """Collects connection checkout latency from the driver's pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._started = {}
+            self.checkouts = 0
+            self.failures = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+            self.connections_created = 0
+            self.connections_closed = 0
+
+    def _key(self, event):
+        return (event.address, threading.get_ident())
+
+    def connection_check_out_started(self, event):
+        self._started[self._key(event)] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = self._started.pop(self._key(event), None)
+        if started is None:
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.total_ms += elapsed
+            if elapsed > self.max_ms:
+                self.max_ms = elapsed
+
+    def connection_check_out_failed(self, event):
+        self._started.pop(self._key(event), None)
+        with self._lock:
+            self.failures += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # Remaining pool events are not needed for latency stats.
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_checked_in(self, event): pass
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.failures,
+                "avg_checkout_ms": round(self.total_ms / self.checkouts, 3) if self.checkouts else 0,
+                "max_checkout_ms": round(self.max_ms, 3),
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed
+            }
+
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_stats = CheckoutStats()
+
+
+def get_client():
+    """
+    Return the process-wide MongoClient.
+
+    The client is created lazily on first use and re-created when the current
+    PID differs from the one that built it, so every gunicorn worker gets its
+    own pool after fork instead of inheriting the master's sockets.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            if _client_pid != pid:
+                _stats.reset()
+            _client = MongoClient(
+                os.getenv("MONGO_URI", "mongodb://localhost:27017/"),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                event_listeners=[_stats],
+                connect=False
+            )
+            _client_pid = pid
+    return _client
+
+
+def get_db():
+    """Return the application database from the shared pool."""
+    return get_client()[DB_NAME]
+
+
+class LazyCollection:
+    """
+    Module-level collection handle that resolves against the current
+    process's client on every use, so `cases_col = collection("cases")`
+    stays valid across forks.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self._name], attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
+
+
+def collection(name):
+    return LazyCollection(name)
+
+
+def pool_stats():
+    """Pool configuration and checkout-latency stats for this worker."""
+    return {
+        "pid": os.getpid(),
+        "initialized": _client is not None and _client_pid == os.getpid(),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        **_stats.snapshot()
+    }
+
+
+def close_client():
+    """Close the pool (tests, shutdown hooks)."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
@@ -0,0 +1,181 @@
+"""
+Declarative index spec for every collection, plus a coverage checker that
+runs explain() on the hot query shapes and fails on COLLSCAN.
+
+CLI:
+    python -m app.utils.indexes            # create / verify indexes
+    python -m app.utils.indexes --check    # also run the explain() checks
+    python -m app.utils.indexes --dedupe   # drop duplicate caseNumbers first
+"""
+
+import sys
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.utils.db import get_db
+
+# collection -> list of (keys, options)
+INDEX_SPEC = {
+    "cases": [
+        ([("caseNumber", ASCENDING)], {"name": "caseNumber_unique", "unique": True}),
+        ([("filingDate", DESCENDING), ("caseNumber", DESCENDING)], {"name": "filingDate_caseNumber"}),
+        ([("status", ASCENDING), ("filingDate", DESCENDING)], {"name": "status_filingDate"}),
+        ([("priority", ASCENDING), ("status", ASCENDING)], {"name": "priority_status"}),
+        ([("caseNumberNorm", ASCENDING)], {"name": "caseNumberNorm"}),
+        ([("search_grams", ASCENDING)], {"name": "search_grams"}),
+    ],
+    "judges": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        ([("status", ASCENDING)], {"name": "status"}),
+    ],
+    "schedules": [
+        ([("date", ASCENDING), ("judge_id", ASCENDING)], {"name": "date_judge"}),
+        ([("case_number", ASCENDING)], {"name": "case_number"}),
+        ([("court_room_id", ASCENDING), ("date", ASCENDING)], {"name": "court_room_date"}),
+    ],
+    "courtrooms": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+    ],
+    "evidence": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        ([("case_number", ASCENDING), ("upload_date", DESCENDING), ("id", DESCENDING)], {"name": "case_number_upload_id"}),
+    ],
+    "ledger": [
+        ([("evidence_id", ASCENDING)], {"name": "evidence_id"}),
+    ],
+    "summaries": [
+        ([("hash", ASCENDING)], {"name": "hash_unique", "unique": True}),
+    ],
+    "notifications": [
+        ([("read", ASCENDING), ("date", DESCENDING)], {"name": "read_date"}),
+        ([("date", DESCENDING), ("id", DESCENDING)], {"name": "date_id"}),
+    ],
+    "audit_logs": [
+        ([("timestamp", DESCENDING)], {"name": "timestamp_desc"}),
+    ],
+    "case_rollups": [
+        ([("g", ASCENDING), ("court", ASCENDING), ("caseType", ASCENDING), ("period", DESCENDING)],
+         {"name": "g_court_type_period"}),
+    ],
+    "judge_rollups": [
+        ([("g", ASCENDING), ("hearings", DESCENDING)], {"name": "g_hearings"}),
+        ([("g", ASCENDING), ("period", ASCENDING)], {"name": "g_period"}),
+    ],
+    "jobs": [
+        ([("created_at", ASCENDING)], {"name": "created_at_ttl", "expireAfterSeconds": 7 * 24 * 3600}),
+    ],
+    "users": [
+        ([("username", ASCENDING)], {"name": "username_unique", "unique": True}),
+    ],
+}
+
+# Query shapes issued by the API, as (label, collection, filter, sort)
+QUERY_SHAPES = [
+    ("get_cases_api: list", "cases", {}, [("filingDate", DESCENDING), ("caseNumber", DESCENDING)]),
+    ("get_cases_api: cursor", "cases",
+     {"$or": [{"filingDate": {"$lt": "2024-01-01"}}, {"filingDate": "2024-01-01", "caseNumber": {"$lt": "X/1/2000"}}]},
+     [("filingDate", DESCENDING), ("caseNumber", DESCENDING)]),
+    ("get_cases_api: by caseNumber", "cases", {"caseNumber": "X/1/2000"}, None),
+    ("search_cases: prefix", "cases", {"caseNumberNorm": {"$regex": "^WP/47"}}, [("caseNumberNorm", ASCENDING)]),
+    ("search_cases: grams", "cases", {"search_grams": {"$all": ["dut", "utt", "tta"]}}, [("filingDate", DESCENDING)]),
+    ("dashboard_stats: pending", "cases", {"status": "Pending"}, None),
+    ("dashboard_stats: urgent", "cases", {"priority": {"$in": ["Critical", "High"]}, "status": {"$ne": "Closed"}},
+     [("priority", ASCENDING), ("status", ASCENDING)]),
+    ("dashboard_stats: upcoming", "schedules", {"date": {"$gte": "2024-01-01"}}, [("date", ASCENDING)]),
+    ("get_judges: schedule per judge", "schedules", {"judge_id": "J01", "date": "2024-01-01"}, None),
+    ("get_daily_schedule", "schedules", {"date": "2024-01-01"}, None),
+    ("get_evidence", "evidence", {"case_number": "X/1/2000"}, None),
+    ("verify_integrity: evidence", "evidence", {"id": "00000000"}, None),
+    ("verify_integrity: ledger", "ledger", {"evidence_id": "00000000"}, None),
+    ("ai_summarize: cache", "summaries", {"hash": "0" * 32}, None),
+    ("get_notifications: unread", "notifications", {"read": False}, None),
+    ("get_notifications: recent", "notifications", {}, [("date", DESCENDING), ("id", DESCENDING)]),
+    ("audit_logs: recent", "audit_logs", {}, [("timestamp", DESCENDING)]),
+    ("analytics: monthly trend", "case_rollups", {"g": "month", "court": "*", "caseType": "*"}, [("period", DESCENDING)]),
+    ("analytics: judge load", "judge_rollups", {"g": "all"}, [("hearings", DESCENDING)]),
+]
+
+
+def ensure_indexes(db=None, verbose=False):
+    """
+    Create every index in INDEX_SPEC. create_index is a no-op when an
+    identical index already exists, so this is safe to run on every start.
+    Returns a list of (collection, index name, error) for failures.
+    """
+    db = db if db is not None else get_db()
+    failures = []
+    for col_name, indexes in INDEX_SPEC.items():
+        for keys, options in indexes:
+            try:
+                db[col_name].create_index(keys, **options)
+                if verbose:
+                    print(f"✅ {col_name}.{options['name']}")
+            except OperationFailure as e:
+                failures.append((col_name, options["name"], str(e)))
+                print(f"⚠️ Index {col_name}.{options['name']} not created: {e}")
+    return failures
+
+
+def dedupe_cases(db=None):
+    """
+    Remove repeated caseNumber documents (keeping the oldest _id) so the
+    unique caseNumber index can be built on legacy data.
+    """
+    db = db if db is not None else get_db()
+    pipeline = [
+        {"$group": {"_id": "$caseNumber", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}}
+    ]
+    removed = 0
+    for group in db["cases"].aggregate(pipeline, allowDiskUse=True):
+        extra = sorted(group["ids"])[1:]
+        removed += db["cases"].delete_many({"_id": {"$in": extra}}).deleted_count
+    return removed
+
+
+def _find_stages(plan, stages):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            _find_stages(value, stages)
+    elif isinstance(plan, list):
+        for item in plan:
+            _find_stages(item, stages)
+    return stages
+
+
+def check_index_coverage(db=None, shapes=None):
+    """
+    Run explain() for each query shape and return the ones whose winning
+    plan contains a COLLSCAN, as a list of (label, stages).
+    """
+    db = db if db is not None else get_db()
+    offenders = []
+    for label, col_name, query, sort in shapes or QUERY_SHAPES:
+        cursor = db[col_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _find_stages(plan, [])
+        if "COLLSCAN" in stages:
+            offenders.append((label, stages))
+    return offenders
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if "--dedupe" in argv:
+        print(f"🧹 Removed {dedupe_cases()} duplicate cases.")
+    failures = ensure_indexes(verbose=True)
+    if "--check" in argv:
+        offenders = check_index_coverage()
+        for label, stages in offenders:
+            print(f"❌ COLLSCAN: {label} -> {' > '.join(stages)}")
+        if not offenders:
+            print(f"✅ All {len(QUERY_SHAPES)} query shapes are index-backed.")
+        failures = failures + offenders
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Background jobs with progress, plus named locks, both kept in MongoDB so
+any worker process can report on a job and two processes cannot run
+conflicting work at once.
+
+jobs:  {_id, kind, key, params, status (queued|running|done|failed),
+        progress {stage, done, total}, result, error, created_at, started_at,
+        heartbeat_at, finished_at}
+locks: {_id: lock name, owner, expires_at}
+
+submit() takes every lock the job needs before queueing it. If a lock is
+held by an active job with the same key (same work), that job is
+returned instead, so concurrent identical requests coalesce into one run;
+if the holder is doing different work, LockBusy is raised.
+
+Locks are leases: they expire after LOCK_TTL unless the running job's
+heartbeat (every HEARTBEAT_INTERVAL, plus each progress report) renews
+them, so a crashed or frozen worker releases its dates within LOCK_TTL,
+and get_job marks its job failed once the heartbeat is that old. Jobs run
+on a daemon thread, which needs a long-lived process; where the process
+may be frozen after the response (serverless), callers should pass
+wait=True to run the job on the request thread.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from app.utils.db import get_db
+
+LOCK_TTL = timedelta(minutes=2)
+HEARTBEAT_INTERVAL = 20
+PROGRESS_INTERVAL = 0.5
+ACTIVE = ("queued", "running")
+
+
+class LockBusy(RuntimeError):
+    def __init__(self, name, holder):
+        super().__init__(f"{name} is locked by {holder}")
+        self.name = name
+        self.holder = holder
+
+
+def acquire(names, owner, db=None, ttl=LOCK_TTL):
+    """Take every lock in `names` (in sorted order) or none; raises LockBusy."""
+    db = db if db is not None else get_db()
+    locks = db["locks"]
+    taken = []
+    for name in sorted(set(names)):
+        now = datetime.now()
+        try:
+            locks.insert_one({"_id": name, "owner": owner, "expires_at": now + ttl})
+        except DuplicateKeyError:
+            stolen = locks.update_one({"_id": name, "expires_at": {"$lt": now}},
+                                      {"$set": {"owner": owner, "expires_at": now + ttl}})
+            if not stolen.modified_count:
+                holder = (locks.find_one({"_id": name}) or {}).get("owner")
+                release(taken, owner, db)
+                raise LockBusy(name, holder)
+        taken.append(name)
+    return taken
+
+
+def release(names, owner, db=None):
+    db = db if db is not None else get_db()
+    db["locks"].delete_many({"_id": {"$in": list(names)}, "owner": owner})
+
+
+def refresh(names, owner, db=None, ttl=LOCK_TTL):
+    db = db if db is not None else get_db()
+    db["locks"].update_many({"_id": {"$in": list(names)}, "owner": owner},
+                            {"$set": {"expires_at": datetime.now() + ttl}})
+
+
+class Progress:
+    """Callable handed to a job: progress(stage, done=None, total=None)."""
+
+    def __init__(self, job_id, locks, db):
+        self.job_id = job_id
+        self.locks = locks
+        self.db = db
+        self._last = 0
+
+    def __call__(self, stage, done=None, total=None):
+        now = time.monotonic()
+        if done is not None and total and done < total and now - self._last < PROGRESS_INTERVAL:
+            return
+        self._last = now
+        self.db["jobs"].update_one({"_id": self.job_id},
+                                   {"$set": {"progress": {"stage": stage, "done": done, "total": total},
+                                             "heartbeat_at": datetime.now()}})
+        refresh(self.locks, self.job_id, self.db)
+
+
+def _heartbeat(job_id, locks, db, stop):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        db["jobs"].update_one({"_id": job_id}, {"$set": {"heartbeat_at": datetime.now()}})
+        refresh(locks, job_id, db)
+
+
+def _run(job_id, locks, target, params, db):
+    jobs = db["jobs"]
+    now = datetime.now()
+    jobs.update_one({"_id": job_id}, {"$set": {"status": "running", "started_at": now, "heartbeat_at": now}})
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, locks, db, stop),
+                     name=f"job-heartbeat-{job_id}", daemon=True).start()
+    try:
+        result = target(params, Progress(job_id, locks, db))
+        jobs.update_one({"_id": job_id}, {"$set": {"status": "done", "result": result,
+                                                   "finished_at": datetime.now()}})
+    except Exception as e:
+        print(f"⚠️ Job {job_id} failed: {e}")
+        jobs.update_one({"_id": job_id}, {"$set": {"status": "failed", "error": str(e),
+                                                   "finished_at": datetime.now()}})
+    finally:
+        stop.set()
+        release(locks, job_id, db)
+
+
+def _expire_if_lost(job, db):
+    """Mark an active job failed once its heartbeat is older than LOCK_TTL."""
+    if not job or job.get("status") not in ACTIVE:
+        return job
+    last = job.get("heartbeat_at") or job.get("created_at")
+    if last and datetime.now() - last > LOCK_TTL:
+        update = {"status": "failed", "error": "Worker stopped responding", "finished_at": datetime.now()}
+        if db["jobs"].update_one({"_id": job["_id"], "status": job["status"],
+                                  "heartbeat_at": job.get("heartbeat_at")}, {"$set": update}).modified_count:
+            job.update(update)
+    return job
+
+
+def submit(kind, key, lock_names, target, params, db=None, wait=False):
+    """
+    Queue target(params, progress) as a background job holding
+    lock_names. Returns (job document, created); created is False when an
+    active job with the same key was returned instead. With wait=True the
+    job runs on the calling thread and the document includes its result.
+    """
+    db = db if db is not None else get_db()
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        "_id": job_id,
+        "kind": kind,
+        "key": key,
+        "params": params,
+        "status": "queued",
+        "progress": {"stage": "queued", "done": None, "total": None},
+        "result": None,
+        "error": None,
+        "created_at": datetime.now()
+    }
+    # Recorded before locking, so a request that finds the lock taken can
+    # always look up the job holding it
+    db["jobs"].insert_one(job)
+    try:
+        acquire(lock_names, job_id, db)
+    except LockBusy as busy:
+        db["jobs"].delete_one({"_id": job_id})
+        holder = _expire_if_lost(db["jobs"].find_one({"_id": busy.holder}), db)
+        if holder and holder.get("status") in ACTIVE and holder.get("key") == key:
+            return holder, False
+        raise
+    if wait:
+        _run(job_id, lock_names, target, params, db)
+        return db["jobs"].find_one({"_id": job_id}), True
+    threading.Thread(target=_run, args=(job_id, lock_names, target, params, db),
+                     name=f"job-{kind}-{job_id}", daemon=True).start()
+    return job, True
+
+
+def get_job(job_id, db=None):
+    db = db if db is not None else get_db()
+    return _expire_if_lost(db["jobs"].find_one({"_id": job_id}), db)
+
+
+def job_view(job):
+    """JSON-safe job document for API responses."""
+    view = {k: job.get(k) for k in ("kind", "status", "progress", "result", "error")}
+    view["job_id"] = job["_id"]
+    for field in ("created_at", "started_at", "heartbeat_at", "finished_at"):
+        if job.get(field):
+            view[field] = job[field].isoformat()
+    return view
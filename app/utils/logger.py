@@ -1,13 +1,7 @@
 from datetime import datetime
-from pymongo import MongoClient
-import os
+from app.utils.db import get_db
 
 
-def get_db():
-    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-    client = MongoClient(MONGO_URI)
-    return client["naya_court_db"]
-
 def log_audit(user_id: str, action: str, target_id: str = None, details: dict = None, ip_address: str = None):
     """
     Log sensitive actions to the audit_logs collection.
@@ -0,0 +1,169 @@
+"""
+Streaming, resumable import of app/cases.json into MongoDB.
+
+The JSON array is parsed incrementally, so memory is bounded by one read
+chunk plus one batch. Rows go through case_import.import_cases: they are
+validated and upserted on caseNumber, so re-running a batch is harmless.
+After every batch the byte offset of the last written row is saved in the
+`migrations` collection. An interrupted run resumes from there, unless the
+source file changed (size or mtime), in which case it starts over.
+
+CLI:
+    python -m app.utils.migrate_cases [--path FILE] [--restart] [--batch-size N]
+"""
+
+import codecs
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from app.utils.db import get_db
+from app.utils.case_import import import_cases, BATCH_SIZE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(BASE_DIR, "cases.json")
+CHECKPOINT_ID = "cases_json"
+CHUNK_SIZE = 1 << 16
+
+
+class JsonArrayReader:
+    """
+    Iterate the elements of a top-level JSON array in a binary file,
+    yielding (element, byte offset just past it). Starting at a non-zero
+    offset resumes after an element previously yielded.
+    """
+
+    def __init__(self, f, start=0, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.start = start
+        self.chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+
+    def __iter__(self):
+        start = self.start
+        if start == 0 and self.f.read(3) == codecs.BOM_UTF8:
+            start = 3
+        self.f.seek(start)
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buf, pos, offset, eof = "", 0, start, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = self.f.read(self.chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+        def skip(chars):
+            nonlocal pos, offset
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                    offset += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        if self.start == 0:
+            skip(" \t\r\n")
+            if pos >= len(buf) or buf[pos] != "[":
+                raise ValueError("Expected a JSON array")
+            pos += 1
+            offset += 1
+
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buf):
+                raise ValueError("Unterminated JSON array")
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            offset += len(buf[pos:end].encode("utf-8"))
+            pos = end
+            yield obj, offset
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime": st.st_mtime}
+
+
+def migrate(path=DEFAULT_PATH, restart=False, batch_size=BATCH_SIZE, db=None, log=print):
+    """Import `path`, resuming from the saved checkpoint. Returns the report."""
+    db = db if db is not None else get_db()
+    checkpoints = db["migrations"]
+    stamp = _source_stamp(path)
+
+    state = checkpoints.find_one({"_id": CHECKPOINT_ID}) or {}
+    same_source = all(state.get(k) == v for k, v in stamp.items())
+    if same_source and state.get("completed") and not restart:
+        log(f"ℹ️ {path} already imported ({state.get('rows', 0)} rows).")
+        return None
+    start = state.get("offset", 0) if same_source and not restart else 0
+    rows_before = state.get("rows", 0) if start else 0
+    if start:
+        log(f"🔄 Resuming {path} at byte {start} ({rows_before} rows done)...")
+    else:
+        log(f"🔄 Importing {path}...")
+
+    offsets = {}
+    started = time.monotonic()
+
+    def rows():
+        with open(path, "rb") as f:
+            for i, (obj, end) in enumerate(JsonArrayReader(f, start), 1):
+                offsets[i] = end
+                yield i, obj
+
+    def checkpoint(last_row, report):
+        offset = offsets[last_row]
+        for i in [k for k in offsets if k <= last_row]:
+            del offsets[i]
+        elapsed = max(time.monotonic() - started, 1e-6)
+        checkpoints.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": dict(stamp, offset=offset, rows=rows_before + last_row,
+                          completed=False, updated_at=datetime.now())},
+            upsert=True
+        )
+        log(f"   {rows_before + last_row} rows | {report.received / elapsed:,.0f} rows/s")
+
+    report = import_cases(rows(), db=db, batch_size=batch_size, on_flush=checkpoint)
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    checkpoints.update_one(
+        {"_id": CHECKPOINT_ID},
+        {"$set": dict(stamp, rows=rows_before + report.received, completed=True,
+                      updated_at=datetime.now())},
+        upsert=True
+    )
+    log(f"✅ Imported {report.received} rows in {elapsed:.1f}s "
+        f"({report.received / elapsed:,.0f} rows/s): {report.inserted} inserted, "
+        f"{report.updated} updated, {report.failed} failed.")
+    return report
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    path = DEFAULT_PATH
+    batch_size = BATCH_SIZE
+    if "--path" in argv:
+        path = argv[argv.index("--path") + 1]
+    if "--batch-size" in argv:
+        batch_size = int(argv[argv.index("--batch-size") + 1])
+    if not os.path.exists(path):
+        print(f"❌ {path} not found.")
+        return 1
+    report = migrate(path, restart="--restart" in argv, batch_size=batch_size)
+    return 1 if report and report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
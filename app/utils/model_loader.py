@@ -1,32 +1,23 @@
-import os
-try:
-    import pickle
-except ImportError:
-    pickle = None
+from app.utils.model_registry import registry, HEARING_DURATION
 
-from ..config import MODEL_PATH
-
-_model = None
 
 class MockModel:
+    version = "mock"
+    features = []
+
+    def check_inputs(self, rows):
+        pass
+
     def predict(self, features):
-        
-        
-        return [15]
+        return [15] * len(features)
 
-def get_model():
-    global _model
-    
-    
-    
-    if _model is None:
-        try:
-            
-            import sklearn
-            with open(MODEL_PATH, "rb") as f:
-                _model = pickle.load(f)
-        except (ImportError, FileNotFoundError, Exception) as e:
-            print(f"⚠️ ML Model/Deps not found ({e}). Using Mock Model.")
-            _model = MockModel()
 
-    return _model
+def get_model(name=HEARING_DURATION):
+    """
+    The registry's current LoadedModel for `name`, or MockModel while none
+    is loaded (no artifact yet, or the first load still in progress).
+    """
+    model = registry.get(name)
+    if model is None:
+        return MockModel()
+    return model
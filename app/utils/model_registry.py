@@ -0,0 +1,333 @@
+"""
+Versioned ML model registry.
+
+Artifacts live under MODEL_DIR (default app/models):
+
+    <name>/<version>/model.pkl
+    <name>/<version>/meta.json   {version, sha256, features, encoders, metrics, created_at}
+    <name>/current.json          {"version": ...}, switched atomically by publish()
+
+Each model is unpickled once per process and shared by every caller.
+get() re-stats the artifact at most every MODEL_RELOAD_INTERVAL seconds;
+if current.json points elsewhere, or the file's mtime/size moved and its
+hash changed, the new version loads on a background thread and replaces
+the old one in a single reference swap. Callers never wait on a load:
+until the first version is ready, get() returns None and they use their
+heuristic fallback.
+
+A pre-registry pickle (app/hearing_model.pkl) is still served when a
+model has no published versions.
+
+CLI:
+    python -m app.utils.model_registry [--publish NAME PICKLE --features f1,f2,...]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(APP_DIR, "models"))
+RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+PREDICTION_CACHE_SIZE = int(os.getenv("MODEL_PREDICTION_CACHE_SIZE", "100000"))
+
+HEARING_DURATION = "hearing_duration"
+
+# Unversioned artifacts from before the registry, with the features they
+# were trained on (see app/model.py).
+LEGACY_ARTIFACTS = {
+    HEARING_DURATION: (os.path.join(APP_DIR, "hearing_model.pkl"),
+                       {"features": ["witnesses", "advocates", "previous_hearings"]}),
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class LoadedModel:
+    """A model object plus the metadata needed to build its inputs."""
+
+    def __init__(self, name, model, meta, source, signature):
+        self.name = name
+        self.model = model
+        self.meta = meta
+        self.source = source
+        self.signature = signature
+        self.loaded_at = datetime.now()
+        self._cache = {}  # feature tuple -> prediction; dies with this version
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    @property
+    def features(self):
+        return self.meta.get("features", [])
+
+    def feature_matrix(self, cases, strict=True):
+        """
+        (len(cases), len(features)) float matrix in the model's feature
+        order. A missing numeric value counts as 0. A value that is not
+        numeric, or a label its encoder does not know, raises ValueError,
+        or becomes NaN with strict=False so the caller can set that row
+        aside. Request input should go through check_inputs first.
+        """
+        import numpy as np
+        encoders = self.meta.get("encoders", {})
+        columns = []
+        for feature in self.features:
+            values = [case.get(feature) for case in cases]
+            if feature in encoders:
+                codes = encoders[feature]
+                unknown = [v for v in values if v not in codes]
+                if unknown and strict:
+                    raise ValueError(f"{feature}: no encoding for {unknown[0]!r}")
+                columns.append(np.fromiter((codes.get(v, np.nan) for v in values), dtype=np.float64, count=len(values)))
+                continue
+            values = [v or 0 for v in values]
+            try:
+                columns.append(np.array(values, dtype=np.float64))
+            except (TypeError, ValueError):
+                if strict:
+                    raise
+                columns.append(np.array([_float_or_nan(v) for v in values], dtype=np.float64))
+        if not columns:
+            return np.zeros((len(cases), 0))
+        return np.column_stack(columns)
+
+    def check_inputs(self, rows):
+        """
+        Raise ValueError naming the features missing from request rows and
+        the labels an encoder cannot encode, instead of scoring defaults.
+        """
+        encoders = self.meta.get("encoders", {})
+        missing = [f for f in self.features if any(row.get(f) in (None, "") for row in rows)]
+        unknown = sorted({
+            f"{f}={row[f]!r}" for f in self.features if f in encoders
+            for row in rows if row.get(f) not in (None, "") and row[f] not in encoders[f]
+        })
+        problems = []
+        if missing:
+            problems.append("missing features: " + ", ".join(missing))
+        if unknown:
+            problems.append("unknown values: " + ", ".join(unknown[:10]))
+        if problems:
+            raise ValueError("; ".join(problems))
+
+    def predict(self, cases):
+        """Predictions for a list of case dicts, from one model.predict call."""
+        return self.model.predict(self.feature_matrix(cases))
+
+    def predict_cached(self, matrix):
+        """
+        model.predict over a feature matrix, memoized per row tuple. Only
+        rows not seen before are scored, in one call. Returns
+        (list of predictions, cache hits).
+        """
+        import numpy as np
+        keys = [tuple(row) for row in matrix.tolist()]
+        cache = self._cache
+        missing = list(dict.fromkeys(k for k in keys if k not in cache))
+        scored = {}
+        if missing:
+            scored = dict(zip(missing, (float(p) for p in self.model.predict(np.array(missing)))))
+            if len(cache) + len(scored) > PREDICTION_CACHE_SIZE:
+                cache.clear()
+            cache.update(scored)
+        hits = sum(1 for k in keys if k not in scored)
+        return [scored[k] if k in scored else cache[k] for k in keys], hits
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "sha256": self.meta.get("sha256"),
+            "features": self.features,
+            "metrics": self.meta.get("metrics"),
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat(),
+            "cached_predictions": len(self._cache)
+        }
+
+
+class ModelRegistry:
+    def __init__(self, root=MODEL_DIR, reload_interval=RELOAD_INTERVAL):
+        self.root = root
+        self.reload_interval = reload_interval
+        self._models = {}
+        self._checked = {}
+        self._loading = set()
+        self._errors = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name):
+        """(pickle path, meta, stat signature) of the artifact to serve, or None."""
+        pointer = os.path.join(self.root, name, "current.json")
+        try:
+            with open(pointer, encoding="utf-8") as f:
+                version = json.load(f)["version"]
+            version_dir = os.path.join(self.root, name, version)
+            with open(os.path.join(version_dir, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            path = os.path.join(version_dir, "model.pkl")
+        except (OSError, ValueError, KeyError):
+            if name not in LEGACY_ARTIFACTS:
+                return None
+            path, meta = LEGACY_ARTIFACTS[name]
+            meta = dict(meta)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return path, meta, (path, st.st_mtime_ns, st.st_size)
+
+    def _load(self, name, path, meta, signature):
+        try:
+            sha = file_sha256(path)
+            current = self._models.get(name)
+            if current and current.meta.get("sha256") == sha:
+                # Touched or re-published with identical bytes: keep it
+                current.signature = signature
+                return
+            if meta.get("sha256") and meta["sha256"] != sha:
+                raise ValueError(f"{path} does not match its recorded sha256")
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+            meta = dict(meta, sha256=sha)
+            meta.setdefault("version", f"legacy-{sha[:12]}")
+            self._models[name] = LoadedModel(name, model, meta, path, signature)
+            self._errors.pop(name, None)
+            print(f"✅ Model {name} {meta['version']} loaded.")
+        except Exception as e:
+            self._errors[name] = str(e)
+            self._failed[name] = signature
+            print(f"⚠️ Model {name} failed to load from {path}: {e}")
+        finally:
+            with self._lock:
+                self._loading.discard(name)
+
+    def _check(self, name, wait):
+        now = time.monotonic()
+        current = self._models.get(name)
+        if current and now - self._checked.get(name, 0) < self.reload_interval:
+            return
+        self._checked[name] = now
+        resolved = self._resolve(name)
+        if resolved is None:
+            return
+        path, meta, signature = resolved
+        if signature == self._failed.get(name) or (current and current.signature == signature):
+            return
+        with self._lock:
+            if name in self._loading:
+                return
+            self._loading.add(name)
+        if wait:
+            self._load(name, path, meta, signature)
+        else:
+            threading.Thread(target=self._load, args=(name, path, meta, signature),
+                             name=f"model-load-{name}", daemon=True).start()
+
+    def get(self, name, wait=False):
+        """
+        The current LoadedModel for `name`, or None if none is ready yet.
+        With wait=True (CLIs, warm-up) a missing model is loaded inline.
+        """
+        self._check(name, wait)
+        return self._models.get(name)
+
+    def warm(self, *names):
+        for name in names or LEGACY_ARTIFACTS:
+            self.get(name, wait=True)
+
+    def status(self):
+        names = set(self._models) | set(self._errors) | set(LEGACY_ARTIFACTS)
+        if os.path.isdir(self.root):
+            names |= {n for n in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, n))}
+        result = {}
+        for name in sorted(names):
+            loaded = self._models.get(name)
+            result[name] = {
+                "loaded": loaded.describe() if loaded else None,
+                "versions": self.versions(name),
+                "error": self._errors.get(name)
+            }
+        return result
+
+    def versions(self, name):
+        base = os.path.join(self.root, name)
+        if not os.path.isdir(base):
+            return []
+        return sorted(v for v in os.listdir(base) if os.path.isfile(os.path.join(base, v, "meta.json")))
+
+
+def publish(name, model, features, encoders=None, metrics=None, root=MODEL_DIR):
+    """
+    Store `model` as a new version of `name` and make it current. The
+    version directory is written completely before current.json is
+    switched, so a running registry never sees a partial artifact.
+    """
+    blob = pickle.dumps(model)
+    sha = hashlib.sha256(blob).hexdigest()
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{sha[:8]}"
+    base = os.path.join(root, name)
+    staging = os.path.join(base, f".{version}")
+    os.makedirs(staging, exist_ok=True)
+    with open(os.path.join(staging, "model.pkl"), "wb") as f:
+        f.write(blob)
+    meta = {
+        "name": name,
+        "version": version,
+        "sha256": sha,
+        "features": list(features),
+        "encoders": encoders or {},
+        "metrics": metrics or {},
+        "created_at": datetime.now().isoformat()
+    }
+    with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(staging, os.path.join(base, version))
+
+    pointer_tmp = os.path.join(base, ".current.json")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": version}, f)
+    os.replace(pointer_tmp, os.path.join(base, "current.json"))
+    return version
+
+
+registry = ModelRegistry()
+
+
+def get_model(name, wait=False):
+    return registry.get(name, wait)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--publish" in args:
+        i = args.index("--publish")
+        name, pickle_path = args[i + 1], args[i + 2]
+        features = args[args.index("--features") + 1].split(",") if "--features" in args else []
+        with open(pickle_path, "rb") as f:
+            version = publish(name, pickle.load(f), features)
+        print(f"✅ Published {name} {version}.")
+    else:
+        print(json.dumps(registry.status(), indent=2, default=str))
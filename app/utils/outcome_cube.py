@@ -0,0 +1,315 @@
+"""
+Historical outcome cube for the decision-support endpoints.
+
+An offline ETL parses the High Court metadata corpus once and aggregates
+it into `historical_analysis`: one document per (statute, bench, year,
+caseType) cell holding the disposal distribution and a histogram of
+registration-to-decision durations. Every record also counts towards the
+"*" marginals of each dimension, so any combination of filters is a
+single _id lookup. Statutes are extracted from the record text and
+stored both per act ("IPC") and per section ("IPC 302").
+
+The cube is built in a staging collection and swapped in with a rename,
+so readers never see a half-built cube.
+
+CLI:
+    python -m app.utils.outcome_cube --build [--path DIR] [--workers N]
+"""
+
+import html
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from multiprocessing import Pool
+from pymongo import ReplaceOne
+from app.utils.db import get_db
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DATASET_PATH = os.path.join(BASE_DIR, "datasets", "high_court_metadata", "json")
+CUBE_COLLECTION = "historical_analysis"
+CUBE_VERSION = 1
+ALL = "*"
+CHUNK_SIZE = 256
+WRITE_BATCH_SIZE = 1000
+
+# Upper bounds (days) of the duration histogram buckets; the last is open
+DURATION_BUCKETS = [30, 90, 180, 365, 730, 1825, 3650]
+
+REG_DATE_RE = re.compile(r"Date of registration :</span><font color='green'>\s*([^<]+)")
+DECISION_DATE_RE = re.compile(r"Decision Date :</span><font color='green'>\s*([^<]+)")
+DISPOSAL_RE = re.compile(r"Disposal Nature :</span><font color='green'>\s*([^<]+)")
+BUTTON_RE = re.compile(r"<button\b[^>]*>(.*?)</button>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+SPACE_RE = re.compile(r"\s+")
+PATH_PART_RE = re.compile(r"^(year|court|bench)=(.+)$")
+CASE_TYPE_RE = re.compile(r"[A-Za-z][A-Za-z.()\-\s]*[A-Za-z.)]")
+
+# Canonical act name -> pattern matching the ways it is written
+ACTS = {
+    "IPC": r"I\.?\s?P\.?\s?C\.?",
+    "CRPC": r"Cr\.?\s?P\.?\s?C\.?",
+    "CPC": r"C\.?\s?P\.?\s?C\.?",
+    "NDPS": r"N\.?\s?D\.?\s?P\.?\s?S\.?(?:\s?Act)?",
+    "NI": r"N\.?\s?I\.?\s?Act",
+    "ARMS": r"Arms\s?Act",
+    "POCSO": r"POCSO(?:\s?Act)?",
+}
+_ACT_ALT = "|".join(f"(?P<{name}>{pattern})" for name, pattern in ACTS.items())
+# Sections run to three digits; this also keeps act years ("NDPS Act 1985") out
+_SECTION = r"\d{1,3}[A-Z]?(?:\(\d+\))?"
+# "302 IPC", "section 302 of IPC", "u/s 302, 34 IPC"
+SECTION_FIRST_RE = re.compile(
+    rf"\b(?:u/s\.?|sec(?:tion)?s?\.?|s\.)?\s*(?P<secs>{_SECTION}(?:\s*(?:,|/|&|and)\s*{_SECTION})*)"
+    rf"\s*(?:of\s*(?:the\s*)?)?(?:{_ACT_ALT})(?![A-Za-z])",
+    re.IGNORECASE
+)
+# "IPC 302", "IPC section 302"
+ACT_FIRST_RE = re.compile(
+    rf"(?<![A-Za-z])(?:{_ACT_ALT})\s*(?:u/s\.?|sec(?:tion)?\.?|s\.)?\s*(?P<secs>{_SECTION})\b",
+    re.IGNORECASE
+)
+ACT_ONLY_RE = re.compile(rf"(?<![A-Za-z])(?:{_ACT_ALT})(?![A-Za-z])", re.IGNORECASE)
+SECTION_SPLIT_RE = re.compile(r"\s*(?:,|/|&|and)\s*", re.IGNORECASE)
+
+
+def _act_of(match):
+    return next(name for name in ACTS if match.group(name))
+
+
+def extract_statutes(text):
+    """Normalized statute keys in `text`, e.g. {"IPC", "IPC 302"}."""
+    found = set()
+    for regex in (SECTION_FIRST_RE, ACT_FIRST_RE):
+        for m in regex.finditer(text):
+            act = _act_of(m)
+            found.add(act)
+            for section in SECTION_SPLIT_RE.split(m.group("secs")):
+                if section:
+                    found.add(f"{act} {section.upper()}")
+    for m in ACT_ONLY_RE.finditer(text):
+        found.add(_act_of(m))
+    return found
+
+
+def normalize_bench(name):
+    """'Gujarat High Court' and 'gujarathc' both become 'gujarathc'."""
+    key = re.sub(r"[^a-z0-9]", "", str(name or "").lower())
+    return key.replace("highcourt", "hc")
+
+
+def case_type_of(case_number):
+    """'R/SCR.A/1234/2000' -> 'SCR.A', 'W.P.(C) 12/2020' -> 'W.P.(C)'."""
+    for part in str(case_number or "").split("/"):
+        m = CASE_TYPE_RE.match(part.strip())
+        if m and sum(c.isalpha() for c in m.group(0)) >= 2:
+            return m.group(0).strip().upper()
+    return "Unknown"
+
+
+def duration_bucket(days):
+    lower = 0
+    for upper in DURATION_BUCKETS:
+        if days < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value.strip(), "%d-%m-%Y")
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_record(path):
+    """
+    One corpus file -> {bench, year, case_type, statutes, disposal,
+    duration_days, reg_date, decision_date}, or None if it cannot be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            meta = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    raw_html = meta.get("raw_html", "") or ""
+
+    parts = {}
+    for segment in path.split(os.sep):
+        m = PATH_PART_RE.match(segment)
+        if m:
+            parts[m.group(1)] = m.group(2)
+
+    reg_match = REG_DATE_RE.search(raw_html)
+    decision_match = DECISION_DATE_RE.search(raw_html)
+    disposal_match = DISPOSAL_RE.search(raw_html)
+    button = BUTTON_RE.search(raw_html)
+    reg_date = _parse_date(reg_match.group(1)) if reg_match else None
+    decision_date = _parse_date(decision_match.group(1)) if decision_match else None
+
+    duration = None
+    if reg_date and decision_date and decision_date >= reg_date:
+        duration = (decision_date - reg_date).days
+    year = parts.get("year") or (str(reg_date.year) if reg_date else "Unknown")
+    case_number = ""
+    if button:
+        case_number = html.unescape(TAG_RE.sub(" ", button.group(1))).split(" of ", 1)[0]
+    text = SPACE_RE.sub(" ", html.unescape(TAG_RE.sub(" ", raw_html)))
+
+    return {
+        "bench": normalize_bench(parts.get("bench") or meta.get("court_name")) or "unknown",
+        "year": year,
+        "case_type": case_type_of(case_number),
+        "statutes": sorted(extract_statutes(text)),
+        "disposal": disposal_match.group(1).strip() if disposal_match else "Unknown",
+        "duration_days": duration,
+        "reg_date": reg_date.date() if reg_date else None,
+        "decision_date": decision_date.date() if decision_date else None,
+    }
+
+
+def cell_id(statute, bench, year, case_type):
+    return f"{statute}|{bench}|{year}|{case_type}"
+
+
+def _cells(record):
+    statutes = record["statutes"] + [ALL]
+    return itertools.product(statutes, (record["bench"], ALL), (record["year"], ALL), (record["case_type"], ALL))
+
+
+class CubeBuilder:
+    """In-memory aggregation of parsed records into cube cells."""
+
+    def __init__(self):
+        self.cells = defaultdict(lambda: {
+            "total": 0, "disposal": defaultdict(int), "duration_hist": defaultdict(int),
+            "duration_sum": 0, "duration_n": 0
+        })
+
+    def add(self, record):
+        bucket = None
+        if record["duration_days"] is not None:
+            bucket = duration_bucket(record["duration_days"])
+        disposal = record["disposal"].replace(".", "．").replace("$", "＄")
+        for statute, bench, year, case_type in _cells(record):
+            cell = self.cells[(statute, bench, year, case_type)]
+            cell["total"] += 1
+            cell["disposal"][disposal] += 1
+            if bucket:
+                cell["duration_hist"][bucket] += 1
+                cell["duration_sum"] += record["duration_days"]
+                cell["duration_n"] += 1
+
+    def documents(self):
+        for (statute, bench, year, case_type), cell in self.cells.items():
+            yield {
+                "_id": cell_id(statute, bench, year, case_type),
+                "statute": statute, "bench": bench, "year": year, "caseType": case_type,
+                "total": cell["total"],
+                "disposal": dict(cell["disposal"]),
+                "duration_hist": dict(cell["duration_hist"]),
+                "duration_sum": cell["duration_sum"],
+                "duration_n": cell["duration_n"],
+            }
+
+
+def iter_corpus(root):
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    yield entry.path
+
+
+def build(dataset_path=DEFAULT_DATASET_PATH, workers=None, db=None, log=print):
+    """Parse the corpus and replace the cube. Returns (files, records)."""
+    db = db if db is not None else get_db()
+    started = time.monotonic()
+    builder = CubeBuilder()
+    files = records = 0
+    with Pool(workers or os.cpu_count() or 1) as pool:
+        for record in pool.imap_unordered(parse_record, iter_corpus(dataset_path), CHUNK_SIZE):
+            files += 1
+            if record:
+                records += 1
+                builder.add(record)
+            if files % 100000 == 0:
+                log(f"   {files} files ({files / (time.monotonic() - started):,.0f} files/s)")
+
+    staging = db[f"{CUBE_COLLECTION}_build"]
+    staging.drop()
+    batch = []
+    for doc in builder.documents():
+        batch.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        if len(batch) >= WRITE_BATCH_SIZE:
+            staging.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        staging.bulk_write(batch, ordered=False)
+    staging.insert_one({
+        "_id": "meta", "version": CUBE_VERSION, "files": files, "records": records,
+        "cells": len(builder.cells), "built_at": datetime.now()
+    })
+    staging.rename(CUBE_COLLECTION, dropTarget=True)
+    log(f"✅ Outcome cube built from {records} records ({len(builder.cells)} cells) "
+        f"in {time.monotonic() - started:.1f}s.")
+    return files, records
+
+
+def resolve_statute(query):
+    """Most specific statute key in a free-text query, or ALL."""
+    keys = extract_statutes(query or "")
+    sections = sorted(k for k in keys if " " in k)
+    if sections:
+        return sections[0]
+    return sorted(keys)[0] if keys else ALL
+
+
+def lookup(statute=ALL, bench=ALL, year=ALL, case_type=ALL, db=None):
+    """
+    Cube cell for the given filters. A filter with no matching cell is
+    relaxed to "*" (section -> act -> any for statutes) and reported in
+    `relaxed`.
+    """
+    db = db if db is not None else get_db()
+    col = db[CUBE_COLLECTION]
+    wanted = {"statute": statute, "bench": bench, "year": year, "caseType": case_type}
+    statute_chain = [statute]
+    if " " in statute:
+        statute_chain.append(statute.split(" ", 1)[0])
+    if statute != ALL:
+        statute_chain.append(ALL)
+
+    candidates = []
+    for s in statute_chain:
+        for b, y, t in itertools.product(*[(v, ALL) if v != ALL else (ALL,) for v in (bench, year, case_type)]):
+            candidates.append(cell_id(s, b, y, t))
+    docs = {d["_id"]: d for d in col.find({"_id": {"$in": candidates}})}
+    for key in candidates:
+        if key in docs:
+            doc = docs[key]
+            doc["relaxed"] = [f for f, v in wanted.items() if doc[f] != v]
+            return doc
+    return None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--build" in args:
+        path = args[args.index("--path") + 1] if "--path" in args else DEFAULT_DATASET_PATH
+        workers = int(args[args.index("--workers") + 1]) if "--workers" in args else None
+        build(path, workers)
+    else:
+        print(__doc__)
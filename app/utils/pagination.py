@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination and cached totals for list endpoints.
+
+A cursor is an opaque urlsafe-base64 token holding the sort-key values of
+the last row on the previous page. The next page is fetched with a range
+predicate on those keys, so page N costs the same as page 1 instead of
+skipping N * limit documents.
+"""
+
+import base64
+import json
+from app.utils.cache import TTLCache
+
+COUNT_CACHE_TTL = 30  # seconds
+
+_count_cache = TTLCache(COUNT_CACHE_TTL)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a cursor token; raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _after(sort, values):
+    """Filter selecting rows strictly after `values` in `sort` order."""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def keyset_page(col, query, sort, limit, cursor=None, projection=None):
+    """
+    Return (docs, next_cursor) for one page of `query` ordered by `sort`,
+    a list of (field, direction) whose last field must be unique.
+    next_cursor is None on the last page.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort):
+            raise ValueError("Invalid cursor")
+        after = _after(sort, values)
+        query = {"$and": [query, after]} if query else after
+
+    docs = list(col.find(query, projection).sort(sort).limit(limit + 1))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get(field) for field, _ in sort])
+    return docs, next_cursor
+
+
+def cached_count(col, query=None, ttl=COUNT_CACHE_TTL):
+    """
+    Document count for `query`, cached in-process for `ttl` seconds. An
+    empty query uses the collection metadata estimate instead of a scan.
+    """
+    query = query or {}
+    key = (col.name, json.dumps(query, sort_keys=True, default=str))
+    if query:
+        compute = lambda: col.count_documents(query)
+    else:
+        compute = col.estimated_document_count
+    return _count_cache.get_or_compute(key, compute, ttl)
+
+
+def invalidate_counts(col_name=None):
+    """Drop cached totals (all, or just one collection's) after writes."""
+    _count_cache.invalidate(lambda key: col_name is None or key[0] == col_name)
@@ -1,15 +1,162 @@
 import os
-import json
 import re
-from pymongo import MongoClient
+import threading
+import numpy as np
+from app.utils.db import get_db
+from app.utils import outcome_cube
+from app.utils.columnar_store import ColumnarStore, DEFAULT_STORE_PATH
+
+GROUP_COLUMNS = ("bench", "year", "case_type", "disposal", "statute")
+
+
+def _grouped_percentiles(keys, values, percentiles):
+    """
+    Percentiles (linear interpolation, as np.percentile) of `values` per
+    distinct key, computed for all groups at once from one lexsort.
+    Returns (unique keys, counts, means, array of shape (groups, len(percentiles))).
+    """
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    means = np.add.reduceat(values.astype(np.float64), starts) / counts
+    pos = starts[:, None] + (counts[:, None] - 1) * (np.asarray(percentiles, dtype=np.float64)[None, :] / 100)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    low_values = values[lo].astype(np.float64)
+    table = low_values + (values[hi] - low_values) * (pos - lo)
+    return keys[starts], counts, means, table
+
 
 class JudicialPredictor:
-    def __init__(self, dataset_path="datasets/high_court_metadata/json"):
+    def __init__(self, dataset_path="datasets/high_court_metadata/json", columns_path=DEFAULT_STORE_PATH):
         self.dataset_path = dataset_path
-        self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-        self.client = MongoClient(self.mongo_uri)
-        self.db = self.client["naya_court_db"]
-        self.analysis_col = self.db["historical_analysis"]
+        self.columns_path = columns_path
+        self._store = None
+
+    @property
+    def db(self):
+        return get_db()
+
+    @property
+    def analysis_col(self):
+        return self.db["historical_analysis"]
+
+    @property
+    def columns(self):
+        """The memory-mapped ColumnarStore, reopened after a rebuild; None if not built."""
+        meta_path = os.path.join(self.columns_path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        if self._store is None or self._store.mtime != os.path.getmtime(meta_path):
+            self._store = ColumnarStore(self.columns_path)
+        return self._store
+
+    def filter_rows(self, bench=None, year=None, year_from=None, year_to=None,
+                    case_type=None, disposal=None, statute=None):
+        """Boolean row mask over the columnar store for the given filters."""
+        store = self.columns
+        mask = np.ones(len(store), dtype=bool)
+        if year is not None:
+            mask &= store.year == int(year)
+        if year_from is not None:
+            mask &= store.year >= int(year_from)
+        if year_to is not None:
+            mask &= store.year <= int(year_to)
+        for column, label in (("bench", outcome_cube.normalize_bench(bench) if bench else None),
+                              ("case_type", case_type.upper() if case_type else None),
+                              ("disposal", disposal)):
+            if label is not None:
+                mask &= getattr(store, column) == store.code(column, label)
+        if statute:
+            code = store.code("statute", outcome_cube.resolve_statute(statute))
+            hit = np.zeros(len(store), dtype=bool)
+            entries = np.flatnonzero(store.statute_codes == code)
+            hit[np.searchsorted(store.statute_offsets, entries, side="right") - 1] = True
+            mask &= hit
+        return mask
+
+    def _group_keys(self, column, mask):
+        """(keys, row ids) for the selected rows, one entry per (row, key)."""
+        store = self.columns
+        if column == "statute":
+            rows = store.statute_rows()
+            keep = mask[rows]
+            return np.asarray(store.statute_codes)[keep].astype(np.int64), rows[keep]
+        rows = np.flatnonzero(mask)
+        return np.asarray(getattr(store, column))[rows].astype(np.int64), rows
+
+    def _key_label(self, column, key):
+        if column == "year":
+            return str(key) if key else "Unknown"
+        return self.columns.label(column, key)
+
+    def outcome_distribution(self, **filters):
+        """{disposal nature: count} for the filtered rows."""
+        store = self.columns
+        if store is None:
+            return {}
+        codes = np.asarray(store.disposal)[self.filter_rows(**filters)]
+        counts = np.bincount(codes, minlength=len(store.dictionaries["disposal"]))
+        return {store.label("disposal", c): int(n) for c, n in enumerate(counts) if n}
+
+    def duration_percentiles(self, percentiles=(25, 50, 75, 90), **filters):
+        """Registration-to-decision duration percentiles (days) for the filtered rows."""
+        store = self.columns
+        if store is None:
+            return {}
+        durations = np.asarray(store.duration)[self.filter_rows(**filters)]
+        durations = durations[durations >= 0]
+        if not len(durations):
+            return {"count": 0}
+        values = np.percentile(durations, percentiles)
+        stats = {"count": int(len(durations)), "mean": round(float(durations.mean()), 1)}
+        stats.update({f"p{p}": round(float(v), 1) for p, v in zip(percentiles, values)})
+        return stats
+
+    def group_by(self, column, percentiles=(50, 90), **filters):
+        """
+        Per-group record counts, top disposal and duration statistics for
+        the filtered rows, grouped by one of GROUP_COLUMNS. Rows with
+        several statutes count towards each of them.
+        """
+        if column not in GROUP_COLUMNS:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_COLUMNS)}")
+        store = self.columns
+        if store is None:
+            return []
+        keys, rows = self._group_keys(column, self.filter_rows(**filters))
+        if not len(keys):
+            return []
+
+        groups, totals = np.unique(keys, return_counts=True)
+        # Most frequent disposal per group from a (group, disposal) count table
+        group_index = np.searchsorted(groups, keys)
+        disposals = np.asarray(store.disposal)[rows].astype(np.int64)
+        n_disposals = len(store.dictionaries["disposal"])
+        table = np.bincount(group_index * n_disposals + disposals,
+                            minlength=len(groups) * n_disposals).reshape(len(groups), n_disposals)
+        top = table.argmax(axis=1)
+
+        durations = np.asarray(store.duration)[rows]
+        timed = durations >= 0
+        result = {
+            int(g): {
+                "key": self._key_label(column, int(g)),
+                "count": int(n),
+                "likely_outcome": store.label("disposal", int(top[i])),
+                "duration_count": 0
+            }
+            for i, (g, n) in enumerate(zip(groups, totals))
+        }
+        if timed.any():
+            tkeys, tcounts, means, pct = _grouped_percentiles(keys[timed], durations[timed], percentiles)
+            for g, n, mean, row in zip(tkeys, tcounts, means, pct):
+                entry = result[int(g)]
+                entry["duration_count"] = int(n)
+                entry["mean_days"] = round(float(mean), 1)
+                entry.update({f"p{p}_days": round(float(v), 1) for p, v in zip(percentiles, row)})
+        return sorted(result.values(), key=lambda e: e["count"], reverse=True)
 
     def _extract_data_from_html(self, html_content):
         """Extract key metrics from the raw_html field in the dataset."""
@@ -27,52 +174,42 @@ class JudicialPredictor:
         
         return data
 
-    def get_outcome_stats(self, query_string):
-        """Find historical patterns matching the query."""
-        # In a real app, we'd use a massive index. 
-        # Here we simulate by sampling recent records from the dataset.
-        results = []
-        sample_limit = 50
-        count = 0
-        
-        # Walk through a specific year (e.g. 2000) for demo speed
-        demo_path = os.path.join(self.dataset_path, "year=2000", "court=24_17", "bench=gujarathc")
-        
-        if os.path.exists(demo_path):
-            for filename in os.listdir(demo_path):
-                if filename.endswith(".json"):
-                    with open(os.path.join(demo_path, filename), "r", encoding="utf-8") as f:
-                        meta = json.load(f)
-                        parsed = self._extract_data_from_html(meta.get("raw_html", ""))
-                        if parsed:
-                            results.append(parsed)
-                            count += 1
-                if count >= sample_limit: break
-
-        # Aggregation
+    def get_outcome_stats(self, query_string, bench=None, year=None, case_type=None):
+        """
+        Historical disposal and duration patterns for a statute query,
+        answered from the precomputed outcome cube (one indexed lookup).
+        Build the cube with: python -m app.utils.outcome_cube --build
+        """
+        statute = outcome_cube.resolve_statute(query_string)
+        cell = outcome_cube.lookup(
+            statute=statute,
+            bench=outcome_cube.normalize_bench(bench) or outcome_cube.ALL,
+            year=str(year) if year else outcome_cube.ALL,
+            case_type=case_type.upper() if case_type else outcome_cube.ALL,
+            db=self.db
+        )
+
         stats = {
-            "total_analyzed": len(results),
+            "total_analyzed": 0,
             "disposal_distribution": {},
             "avg_duration_days": 0,
-            "likely_outcome": "Pending Analysis"
+            "duration_histogram": {},
+            "likely_outcome": "Pending Analysis",
+            "matched": None,
+            "relaxed": []
         }
-        
-        durations = []
-        for r in results:
-            dn = r.get("disposal_nature", "Unknown")
-            stats["disposal_distribution"][dn] = stats["disposal_distribution"].get(dn, 0) + 1
-            
-            # Duration calculation
-            try:
-                from datetime import datetime
-                d1 = datetime.strptime(r['reg_date'], "%d-%m-%Y")
-                d2 = datetime.strptime(r['decision_date'], "%d-%m-%Y")
-                durations.append((d2 - d1).days)
-            except:
-                pass
-
-        if durations:
-            stats["avg_duration_days"] = int(sum(durations) / len(durations))
+        if not cell:
+            return stats
+
+        stats["total_analyzed"] = cell["total"]
+        stats["disposal_distribution"] = {
+            k.replace("．", ".").replace("＄", "$"): v for k, v in cell["disposal"].items()
+        }
+        stats["duration_histogram"] = cell["duration_hist"]
+        if cell["duration_n"]:
+            stats["avg_duration_days"] = int(cell["duration_sum"] / cell["duration_n"])
+        stats["matched"] = {f: cell[f] for f in ("statute", "bench", "year", "caseType")}
+        stats["relaxed"] = cell["relaxed"]
 
         # Determine "Likely Outcome"
         if stats["disposal_distribution"]:
@@ -81,4 +218,14 @@ class JudicialPredictor:
 
         return stats
 
-predictor_engine = JudicialPredictor()
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_predictor():
+    """Process-wide JudicialPredictor, created on first use."""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = JudicialPredictor()
+    return _predictor
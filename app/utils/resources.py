@@ -0,0 +1,227 @@
+"""
+Courtrooms as schedulable resources, and the slot indexes that keep rooms
+and judges free of double bookings.
+
+courtrooms: {id, court_name, room, status}; ensure_courtrooms() seeds
+DEFAULT_COURTROOMS into an empty collection. Schedule entries carry the
+room's id (court_room_id) next to its display names.
+
+SlotIndex holds one resource's bookings for one day as disjoint
+[start, end) intervals sorted by start. Checking a new interval for an
+overlap is one bisect plus a look at the two neighbours, O(log n).
+RoomAllocator keeps a SlotIndex per (date, room) and per (date, judge)
+and gives each hearing the judge's room from earlier that day if it is
+free, otherwise the first free room.
+
+audit_conflicts() checks stored schedules, which may already overlap, by
+sorting each (date, room) and (date, judge) group and sweeping it.
+
+CLI:
+    python -m app.utils.resources --audit FROM [TO]
+"""
+
+import sys
+from bisect import bisect_right
+from app.utils.db import get_db
+from app.utils import scheduling
+
+DEFAULT_COURTROOMS = [
+    (court, room)
+    for court in ("District Court Complex", "High Court Annex", "City Civil Court")
+    for room in ("Room 101", "Hall 3", "Room 4B", "Chamber 2", "Court Hall 7")
+]
+
+# Schedule fields needed to place an entry on a room or judge calendar
+SLOT_FIELDS = {"_id": 0, "date": 1, "judge_id": 1, "case_number": 1, "start_time": 1,
+               "end_time": 1, "duration_minutes": 1, "court_name": 1, "court_room": 1,
+               "court_room_id": 1, "status": 1}
+
+
+def ensure_courtrooms(db=None):
+    db = db if db is not None else get_db()
+    col = db["courtrooms"]
+    if col.find_one({}, {"_id": 1}) is None:
+        col.insert_many([
+            {"id": f"R{i + 1:02d}", "court_name": court, "room": room, "status": "Available"}
+            for i, (court, room) in enumerate(DEFAULT_COURTROOMS)
+        ])
+
+
+def load_rooms(db=None):
+    """Available courtrooms by id; seeds the defaults first if none exist."""
+    db = db if db is not None else get_db()
+    ensure_courtrooms(db)
+    return list(db["courtrooms"].find({"status": "Available"}, {"_id": 0}).sort("id", 1))
+
+
+class SlotIndex:
+    """Disjoint [start, end) bookings of one resource, sorted by start."""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.items = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def conflict(self, start, end):
+        """(start, end, item) of a booking overlapping [start, end), or None."""
+        i = bisect_right(self.starts, start)
+        if i and self.ends[i - 1] > start:
+            i -= 1
+        elif not (i < len(self.starts) and self.starts[i] < end):
+            return None
+        return self.starts[i], self.ends[i], self.items[i]
+
+    def add(self, start, end, item):
+        clash = self.conflict(start, end)
+        if clash is not None:
+            raise ValueError(f"{item} overlaps {clash[2]}")
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.items.insert(i, item)
+
+
+class RoomAllocator:
+    def __init__(self, rooms):
+        self.rooms = rooms
+        self.by_id = {r["id"]: r for r in rooms}
+        self.by_name = {(r["court_name"], r["room"]): r for r in rooms}
+        self._rooms = {}   # (date, room id) -> SlotIndex
+        self._judges = {}  # (date, judge id) -> SlotIndex
+        self._home = {}    # (date, judge id) -> room id
+
+    def _index(self, table, key):
+        index = table.get(key)
+        if index is None:
+            index = table[key] = SlotIndex()
+        return index
+
+    def room_of(self, entry):
+        room = self.by_id.get(entry.get("court_room_id"))
+        return room or self.by_name.get((entry.get("court_name"), entry.get("court_room")))
+
+    def preload(self, entries):
+        """Book stored entries that stay in place (overlaps among them are left to the audit)."""
+        for entry in entries:
+            try:
+                start, end = scheduling.slot_interval(entry)
+            except (KeyError, ValueError, AttributeError):
+                continue
+            item = entry.get("case_number")
+            try:
+                self._index(self._judges, (entry["date"], entry.get("judge_id"))).add(start, end, item)
+            except ValueError:
+                pass
+            room = self.room_of(entry)
+            if room:
+                try:
+                    self._index(self._rooms, (entry["date"], room["id"])).add(start, end, item)
+                    self._home[(entry["date"], entry.get("judge_id"))] = room["id"]
+                except ValueError:
+                    pass
+
+    def allocate(self, date, judge_id, start, end, item=None, prefer=None):
+        """
+        Book the judge and a free room for [start, end); returns the room,
+        or None if the judge is already busy then or every room is taken.
+        """
+        judge_slots = self._index(self._judges, (date, judge_id))
+        if judge_slots.conflict(start, end) is not None:
+            return None
+        order = [prefer, self._home.get((date, judge_id))]
+        for room_id in [r for r in order if r in self.by_id] + [r["id"] for r in self.rooms]:
+            slots = self._index(self._rooms, (date, room_id))
+            if slots.conflict(start, end) is None:
+                slots.add(start, end, item)
+                judge_slots.add(start, end, item)
+                self._home[(date, judge_id)] = room_id
+                return self.by_id[room_id]
+        return None
+
+
+    def conflicts(self, date, judge_id, start, end):
+        """Why allocate() failed: the judge's clashing booking and each room's, by room id."""
+        judge = self._index(self._judges, (date, judge_id)).conflict(start, end)
+        rooms = {}
+        for room in self.rooms:
+            clash = self._index(self._rooms, (date, room["id"])).conflict(start, end)
+            if clash is not None:
+                rooms[room["id"]] = clash[2]
+        return {"judge": judge[2] if judge else None, "rooms": rooms}
+
+
+def _sweep(entries, kind, resource):
+    """Overlapping pairs within one resource's entries for one day."""
+    conflicts = []
+    latest = None  # (end, entry) with the latest end so far
+    for start, end, entry in sorted(entries, key=lambda x: (x[0], x[1])):
+        if latest and start < latest[0]:
+            conflicts.append({
+                "type": kind,
+                "date": entry["date"],
+                "resource": resource,
+                "first": {k: latest[1].get(k) for k in ("case_number", "judge_id", "start_time", "end_time")},
+                "second": {k: entry.get(k) for k in ("case_number", "judge_id", "start_time", "end_time")},
+                "overlap_minutes": round(min(end, latest[0]) - start, 1)
+            })
+        if latest is None or end > latest[0]:
+            latest = (end, entry)
+    return conflicts
+
+
+def audit_conflicts(entries):
+    """
+    Room and judge double bookings among schedule entries. Entries are
+    grouped per day, so the input may stream in date order.
+    """
+    conflicts = []
+    rooms, judges = {}, {}
+
+    def flush():
+        for (date, name, room), items in rooms.items():
+            conflicts.extend(_sweep(items, "room", f"{name} / {room}"))
+        for (date, judge_id), items in judges.items():
+            conflicts.extend(_sweep(items, "judge", judge_id))
+        rooms.clear()
+        judges.clear()
+
+    current = None
+    for entry in entries:
+        if entry.get("date") != current:
+            flush()
+            current = entry.get("date")
+        try:
+            start, end = scheduling.slot_interval(entry)
+        except (KeyError, ValueError, AttributeError):
+            continue
+        if entry.get("court_room"):
+            rooms.setdefault((current, entry.get("court_name"), entry["court_room"]), []).append((start, end, entry))
+        judges.setdefault((current, entry.get("judge_id")), []).append((start, end, entry))
+    flush()
+    return conflicts
+
+
+def audit_range(date_from, date_to, db=None):
+    """Conflicts in stored schedules between two YYYY-MM-DD dates, inclusive."""
+    db = db if db is not None else get_db()
+    cursor = db["schedules"].find({"date": {"$gte": date_from, "$lte": date_to}}, SLOT_FIELDS).sort("date", 1)
+    return audit_conflicts(cursor)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--audit" in args:
+        i = args.index("--audit")
+        date_from = args[i + 1]
+        date_to = args[i + 2] if len(args) > i + 2 and not args[i + 2].startswith("--") else date_from
+        found = audit_range(date_from, date_to)
+        for c in found:
+            print(f"   {c['date']} {c['type']} {c['resource']}: {c['first']['case_number']} "
+                  f"{c['first']['start_time']}-{c['first']['end_time']} vs {c['second']['case_number']} "
+                  f"{c['second']['start_time']}-{c['second']['end_time']}")
+        print(f"{'⚠️' if found else '✅'} {len(found)} conflicts between {date_from} and {date_to}.")
+    else:
+        print(__doc__)
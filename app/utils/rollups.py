@@ -0,0 +1,305 @@
+"""
+Incremental analytics rollups.
+
+case_rollups - one document per (granularity, period, court, caseType)
+    with `filed`, `disposed` and a `status` map. Granularities are day
+    (YYYY-MM-DD), week (ISO, YYYY-Www) and month (YYYY-MM). Filings are bucketed by
+    filingDate, disposals by closedDate. Each case also counts towards the
+    "*" marginals (court="*" and/or caseType="*"), so unfiltered or
+    single-filter reads touch one document per period.
+
+judge_rollups - one document per (granularity, period, judge_id) with the
+    number of booked hearings and minutes, from `schedules`. Granularity
+    "all" (period "all") holds the running totals.
+
+Write paths call apply_case / apply_status_change / apply_schedules, which
+turn changes into $inc upserts. `backfill` rebuilds both collections from
+source through the same code path, into staging collections that are
+renamed over the live ones, under a Mongo lock so only one process
+rebuilds at a time.
+
+CLI:
+    python -m app.utils.rollups --backfill
+"""
+
+import calendar
+import re
+import sys
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pymongo import UpdateOne
+from app.utils.db import get_db
+from app.utils.indexes import INDEX_SPEC
+from app.utils import jobs
+
+CASE_GRANULARITIES = ("day", "week", "month")
+JUDGE_GRANULARITIES = ("day", "month", "all")
+ALL = "*"
+# Bump when the bucket layout changes; ensure_rollups rebuilds on mismatch.
+ROLLUP_VERSION = 3
+ROLLUP_COLLECTIONS = ("case_rollups", "judge_rollups")
+REBUILD_LOCK = "rollups:rebuild"
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _field_key(name):
+    """Make a value safe to use as a Mongo field name."""
+    return str(name or "Unknown").replace(".", "．").replace("$", "＄")
+
+
+def _day(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str) and _DATE_RE.match(value):
+        try:
+            return datetime.strptime(value[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            return None  # e.g. 2024-13-05
+    return None
+
+
+def period_of(day, granularity):
+    if granularity == "day":
+        return day
+    if granularity == "month":
+        return day[:7]
+    if granularity == "week":
+        try:
+            year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+        except ValueError:
+            return None
+        return f"{year}-W{week:02d}"
+    return "all"
+
+
+class _Batch:
+    """Accumulates $inc deltas per rollup document before one bulk_write."""
+
+    def __init__(self):
+        self.incs = defaultdict(lambda: defaultdict(int))
+        self.dims = {}
+
+    def add(self, col_name, doc_id, dims, field, delta):
+        self.incs[(col_name, doc_id)][field] += delta
+        self.dims[(col_name, doc_id)] = dims
+
+    def flush(self, db, targets=None):
+        """Write the deltas; `targets` maps a rollup collection to the one to write instead."""
+        targets = targets or {}
+        ops = defaultdict(list)
+        for key, incs in self.incs.items():
+            incs = {f: d for f, d in incs.items() if d}
+            if not incs:
+                continue
+            col_name, doc_id = key
+            ops[col_name].append(UpdateOne(
+                {"_id": doc_id},
+                {"$inc": incs, "$setOnInsert": self.dims[key]},
+                upsert=True
+            ))
+        for col_name, col_ops in ops.items():
+            db[targets.get(col_name, col_name)].bulk_write(col_ops, ordered=False)
+        self.incs.clear()
+        self.dims.clear()
+
+
+def _case_cells(case):
+    court = str(case.get("court") or "Unknown")
+    case_type = str(case.get("caseType") or "Unknown")
+    return [(court, case_type), (court, ALL), (ALL, case_type), (ALL, ALL)]
+
+
+def _add_case_field(batch, case, day, field, delta):
+    for granularity in CASE_GRANULARITIES:
+        period = period_of(day, granularity)
+        if period is None:
+            continue
+        for court, case_type in _case_cells(case):
+            doc_id = f"{granularity}|{period}|{court}|{case_type}"
+            dims = {"g": granularity, "period": period, "court": court, "caseType": case_type}
+            batch.add("case_rollups", doc_id, dims, field, delta)
+
+
+def _add_case(batch, case, sign):
+    filed = _day(case.get("filingDate"))
+    if filed:
+        _add_case_field(batch, case, filed, "filed", sign)
+        _add_case_field(batch, case, filed, f"status.{_field_key(case.get('status'))}", sign)
+    closed = _day(case.get("closedDate"))
+    if closed:
+        _add_case_field(batch, case, closed, "disposed", sign)
+
+
+def _add_schedule(batch, sched, sign):
+    day = _day(sched.get("date"))
+    if not day or not sched.get("judge_id"):
+        return
+    for granularity in JUDGE_GRANULARITIES:
+        period = period_of(day, granularity)
+        doc_id = f"{granularity}|{period}|{sched['judge_id']}"
+        dims = {"g": granularity, "period": period, "judge_id": sched["judge_id"],
+                "judge_name": sched.get("judge_name")}
+        batch.add("judge_rollups", doc_id, dims, "hearings", sign)
+        batch.add("judge_rollups", doc_id, dims, "minutes", sign * (sched.get("duration_minutes") or 0))
+
+
+def apply_case(cases, sign=1, db=None):
+    """Count case document(s) in (sign=1) or out of (sign=-1) the rollups."""
+    if isinstance(cases, dict):
+        cases = [cases]
+    batch = _Batch()
+    for case in cases:
+        _add_case(batch, case, sign)
+    batch.flush(db if db is not None else get_db())
+
+
+def apply_status_change(cases, old_status, new_status, db=None):
+    """Move cases between status counters in their filing-period buckets."""
+    batch = _Batch()
+    for case in cases:
+        filed = _day(case.get("filingDate"))
+        if not filed:
+            continue
+        _add_case_field(batch, case, filed, f"status.{_field_key(old_status)}", -1)
+        _add_case_field(batch, case, filed, f"status.{_field_key(new_status)}", 1)
+    batch.flush(db if db is not None else get_db())
+
+
+def apply_schedules(schedules, sign=1, db=None):
+    """Count schedule entries in (sign=1) or out of (sign=-1) judge load."""
+    batch = _Batch()
+    for sched in schedules:
+        _add_schedule(batch, sched, sign)
+    batch.flush(db if db is not None else get_db())
+
+
+CASE_ROLLUP_FIELDS = {"filingDate": 1, "closedDate": 1, "status": 1, "court": 1, "caseType": 1}
+SCHEDULE_ROLLUP_FIELDS = {"date": 1, "judge_id": 1, "judge_name": 1, "duration_minutes": 1}
+
+
+def backfill(db=None, batch_size=5000):
+    """
+    Rebuild both rollup collections from cases and schedules. The new
+    counts are built in staging collections and swapped in with a rename,
+    so readers never see a half-built rollup, and a Mongo lock keeps a
+    second process from rebuilding at the same time (raises jobs.LockBusy).
+    """
+    db = db if db is not None else get_db()
+    owner = f"rollups-{uuid.uuid4().hex[:12]}"
+    jobs.acquire([REBUILD_LOCK], owner, db)
+    try:
+        targets = {name: f"{name}_build" for name in ROLLUP_COLLECTIONS}
+        for name, staging in targets.items():
+            db[staging].drop()
+            for keys, options in INDEX_SPEC.get(name, []):
+                db[staging].create_index(keys, **options)
+
+        counts = {"cases": 0, "schedules": 0}
+        for col_name, fields, add in (
+            ("cases", CASE_ROLLUP_FIELDS, _add_case),
+            ("schedules", SCHEDULE_ROLLUP_FIELDS, _add_schedule),
+        ):
+            batch = _Batch()
+            for i, doc in enumerate(db[col_name].find({}, fields), 1):
+                add(batch, doc, 1)
+                counts[col_name] = i
+                if i % batch_size == 0:
+                    batch.flush(db, targets)
+                    jobs.refresh([REBUILD_LOCK], owner, db)
+            batch.flush(db, targets)
+        db[targets["case_rollups"]].replace_one({"_id": "meta"}, {"version": ROLLUP_VERSION}, upsert=True)
+        for name, staging in targets.items():
+            db[staging].rename(name, dropTarget=True)
+        return counts
+    finally:
+        jobs.release([REBUILD_LOCK], owner, db)
+
+
+def ensure_rollups(db=None):
+    """Build the rollups for databases that predate them or their layout."""
+    db = db if db is not None else get_db()
+    meta = db["case_rollups"].find_one({"_id": "meta"}) or {}
+    if meta.get("version") != ROLLUP_VERSION and db["cases"].find_one({}, {"_id": 1}):
+        try:
+            backfill(db)
+        except jobs.LockBusy:
+            print("ℹ️ Rollups are being rebuilt by another process.")
+
+
+def monthly_filings(db=None, months=12, court=ALL, case_type=ALL):
+    """
+    Most recent `months` month buckets with filings, oldest first. Months
+    after the current one (mistyped filing dates) are ignored.
+    """
+    db = db if db is not None else get_db()
+    current = datetime.now().strftime("%Y-%m")
+    docs = list(db["case_rollups"].find(
+        {"g": "month", "court": court, "caseType": case_type,
+         "period": {"$lte": current}, "filed": {"$gt": 0}},
+        {"_id": 0, "period": 1, "filed": 1}
+    ).sort("period", -1).limit(months))
+    return list(reversed(docs))
+
+
+def recent_periods(granularity, count, end=None):
+    """The `count` consecutive periods ending with the one containing `end`."""
+    end = end or date.today()
+    if granularity == "day":
+        days = [end - timedelta(days=i) for i in range(count)]
+    elif granularity == "week":
+        days = [end - timedelta(weeks=i) for i in range(count)]
+    else:
+        days = []
+        year, month = end.year, end.month
+        for _ in range(count):
+            days.append(date(year, month, 1))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return [period_of(d.strftime("%Y-%m-%d"), granularity) for d in reversed(days)]
+
+
+def period_label(period, granularity):
+    if granularity == "month":
+        year, month = period.split("-")
+        return f"{calendar.month_abbr[int(month)]} {year}"
+    return period
+
+
+def filed_vs_disposed(granularity="month", periods=12, court=None, case_type=None, end=None):
+    """
+    Filed and disposed counts for the last `periods` buckets, read from at
+    most `periods` rollup documents whatever the size of the case history.
+    """
+    if granularity not in CASE_GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(CASE_GRANULARITIES)}")
+    keys = recent_periods(granularity, periods, end)
+    docs = get_db()["case_rollups"].find(
+        {"g": granularity, "court": court or ALL, "caseType": case_type or ALL,
+         "period": {"$gte": keys[0], "$lte": keys[-1]}},
+        {"_id": 0, "period": 1, "filed": 1, "disposed": 1}
+    )
+    by_period = {d["period"]: d for d in docs}
+    return {
+        "labels": [period_label(k, granularity) for k in keys],
+        "filed": [by_period.get(k, {}).get("filed", 0) for k in keys],
+        "disposed": [by_period.get(k, {}).get("disposed", 0) for k in keys],
+        "granularity": granularity
+    }
+
+
+def top_judge_load(db=None, limit=5):
+    """Judges with the most booked hearings overall."""
+    db = db if db is not None else get_db()
+    return list(db["judge_rollups"].find(
+        {"g": "all", "hearings": {"$gt": 0}},
+        {"_id": 0, "judge_id": 1, "judge_name": 1, "hearings": 1, "minutes": 1}
+    ).sort("hearings", -1).limit(limit))
+
+
+if __name__ == "__main__":
+    if "--backfill" in sys.argv[1:]:
+        counts = backfill()
+        print(f"✅ Rollups rebuilt from {counts['cases']} cases and {counts['schedules']} schedules.")
+    else:
+        print(__doc__)
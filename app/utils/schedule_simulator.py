@@ -0,0 +1,178 @@
+"""
+What-if scheduling: run the reschedule engine on an in-memory snapshot of
+pending cases and available judges, writing nothing.
+
+A scenario is a dict of changes applied to the snapshot:
+
+    name               label echoed in the result
+    judges_on_leave    list of judge ids removed from the pool
+    extra_benches      number of extra benches to sit; each is a virtual
+                       judge built from extra_bench (specializations,
+                       daily_capacity_minutes)
+    extra_courtrooms   number of extra rooms added to the courtroom pool
+    buffer_minutes     gap between hearings instead of BUFFER_MINUTES
+    mode, days, time_budget
+                       override the request-wide planning options
+
+Planned hearings are then given rooms as in a real reschedule
+(resources.RoomAllocator), so a hearing with no free room counts as
+unscheduled and a scenario can be limited by rooms as well as judges.
+
+Durations are predicted once per snapshot, and a snapshot is reused for
+SNAPSHOT_TTL seconds, so a scenario costs one greedy or solver pass.
+"""
+
+import time
+from datetime import datetime
+from functools import lru_cache
+from app.utils.db import get_db
+from app.utils.cache import TTLCache
+from app.utils import scheduling, schedule_solver, resources
+
+SNAPSHOT_TTL = 30
+MAX_SCENARIOS = 50
+MAX_EXTRA = 100
+_snapshots = TTLCache(SNAPSHOT_TTL)
+
+
+def load_snapshot(predict, db=None, refresh=False):
+    """
+    Pending cases, available judges and courtrooms, and predicted
+    durations, cached for SNAPSHOT_TTL. `predict(cases)` returns
+    (durations, scoring stats).
+    """
+    def build():
+        database = db if db is not None else get_db()
+        cases = list(database["cases"].find({"status": "Pending"}, scheduling.PENDING_PROJECTION))
+        judges = list(database["judges"].find({"status": "Available"}, {"_id": 0}))
+        rooms = resources.load_rooms(database)
+        durations, scoring = predict(cases)
+        return {"cases": cases, "judges": judges, "rooms": rooms, "durations": durations,
+                "scoring": scoring, "taken_at": time.time()}
+
+    if refresh:
+        _snapshots.invalidate()
+    return _snapshots.get_or_compute("pending", build)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+@lru_cache(maxsize=8192)
+def _date(value):
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _days_between(start, end):
+    start, end = _date(start), _date(end)
+    return (end - start).days if start and end else None
+
+
+def scenario_metrics(rows, unplaced, cases, judges, days, as_of, unplaced_minutes=0):
+    """
+    Plan metrics (schedule_solver.plan_metrics) plus courtroom-day
+    utilization, waiting time from filing to hearing, and overflow.
+    """
+    result = schedule_solver.plan_metrics(rows, cases, judges, days)
+    window = scheduling.DAY_END - scheduling.DAY_START
+    booked = sum(row[-1] for row in rows)
+    result["day_utilization_pct"] = round(100 * booked / (window * len(judges) * len(days)), 1) if judges and days else 0
+
+    waits = sorted(w for w in (_days_between(row[0].get("filingDate"), row[2]) for row in rows) if w is not None)
+    still_waiting = sorted(w for w in (_days_between(c.get("filingDate"), as_of) for c in unplaced) if w is not None)
+    result["waiting_days"] = {
+        "scheduled_mean": round(sum(waits) / len(waits), 1) if waits else None,
+        "scheduled_p50": _percentile(waits, 50),
+        "scheduled_p90": _percentile(waits, 90),
+        "unscheduled_mean": round(sum(still_waiting) / len(still_waiting), 1) if still_waiting else None,
+        "unscheduled_max": still_waiting[-1] if still_waiting else None
+    }
+    result["overflow"] = {
+        "cases": len(unplaced),
+        "minutes": round(unplaced_minutes, 1),
+        "over_capacity_slots": result.pop("over_capacity_slots"),
+        "over_capacity_minutes": result.pop("over_capacity_minutes")
+    }
+    return result
+
+
+def _count(scenario, field):
+    value = int(scenario.get(field) or 0)
+    if not 0 <= value <= MAX_EXTRA:
+        raise ValueError(f"{field} must be 0-{MAX_EXTRA}")
+    return value
+
+
+def apply_scenario(judges, scenario):
+    """The judge pool for a scenario (the snapshot list is not modified)."""
+    on_leave = scenario.get("judges_on_leave") or []
+    if not isinstance(on_leave, list) or not all(isinstance(j, str) for j in on_leave):
+        raise ValueError("judges_on_leave must be a list of judge ids")
+    template = scenario.get("extra_bench") or {}
+    if not isinstance(template, dict):
+        raise ValueError("extra_bench must be an object")
+    on_leave = set(on_leave)
+    pool = [j for j in judges if j.get("id") not in on_leave]
+    for n in range(_count(scenario, "extra_benches")):
+        pool.append({
+            "id": f"extra-{n + 1}",
+            "name": f"Additional Bench {n + 1}",
+            "specializations": template.get("specializations", []),
+            "daily_capacity_minutes": int(template.get("daily_capacity_minutes", schedule_solver.DEFAULT_CAPACITY))
+        })
+    return pool
+
+
+def scenario_rooms(rooms, scenario):
+    """The courtroom pool for a scenario (the snapshot list is not modified)."""
+    return rooms + [
+        {"id": f"extra-room-{n + 1}", "court_name": "Additional Courtroom", "room": str(n + 1)}
+        for n in range(_count(scenario, "extra_courtrooms"))
+    ]
+
+
+def run_scenario(snapshot, scenario, date_str, mode="greedy", days=1, time_budget=0.5):
+    """Plan one scenario in memory and return its metrics."""
+    started = time.perf_counter()
+    mode = scenario.get("mode", mode)
+    if mode not in ("greedy", "solver"):
+        raise ValueError("mode must be greedy or solver")
+    days = min(max(int(scenario.get("days", days)), 1), 30)
+    time_budget = min(max(float(scenario.get("time_budget", time_budget)), 0.05), 5.0)
+    buffer = int(scenario.get("buffer_minutes", scheduling.BUFFER_MINUTES))
+    if not 0 <= buffer <= 120:
+        raise ValueError("buffer_minutes must be 0-120")
+
+    dates = schedule_solver.working_days(date_str, days)
+    judges = apply_scenario(snapshot["judges"], scenario)
+    rooms = scenario_rooms(snapshot["rooms"], scenario)
+    cases, durations = snapshot["cases"], snapshot["durations"]
+    if mode == "solver":
+        rows, _, _ = schedule_solver.solve(cases, durations, judges, dates,
+                                           time_budget=time_budget, compare=False, buffer=buffer)
+    else:
+        rows = schedule_solver.greedy_plan(cases, durations, judges, dates, buffer)
+    allocator = resources.RoomAllocator(rooms)
+    planned = len(rows)
+    rows = [row for row in rows if allocator.allocate(row[2], row[1]["id"], row[3], row[4])]
+    placed = {id(row[0]) for row in rows}
+    left = [k for k, c in enumerate(cases) if id(c) not in placed]
+    metrics = scenario_metrics(rows, [cases[k] for k in left], cases, judges, dates, date_str,
+                               sum(float(durations[k]) for k in left))
+    return {
+        "name": scenario.get("name"),
+        "mode": mode,
+        "dates": dates,
+        "judges": len(judges),
+        "courtrooms": len(rooms),
+        "unroomed": planned - len(rows),
+        "buffer_minutes": buffer,
+        "metrics": metrics,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
@@ -0,0 +1,343 @@
+"""
+Multi-day cause list solver.
+
+The greedy pass in scheduling.assign_day fills one 10:00-17:00 day and
+ignores each judge's daily_capacity_minutes. This module plans a horizon
+of working days as a bin-packing problem: one bin per (judge, day), and a
+bin holds cases while
+
+    booked minutes                        <= the judge's daily_capacity_minutes
+    booked minutes + buffers between them <= the court day (DAY_END - DAY_START)
+
+The cost being minimized, per case:
+    unscheduled                 UNSCHEDULED_COST * priority weight
+    scheduled on day k          DAY_COST * k * priority weight
+    given to a non-specialist   NON_SPECIALIST_COST (if any judge specializes)
+
+Priority weights are 8/4/2/1 for criminal-high, criminal, high, other
+(scheduling.priority_key), so the search never trades a higher-priority
+case for a lower one.
+
+A first-fit construction (priority order, earliest day, specialist then
+emptiest bin) is improved by local search until no move helps or the
+time budget runs out. Moves: insert an unscheduled case; relocate a
+booked case to another bin to make room for one; swap out a booked case
+of lower priority; pull a booked case to an earlier day.
+"""
+
+import heapq
+import time
+from datetime import datetime, timedelta
+from app.utils import scheduling
+
+DEFAULT_CAPACITY = 300
+UNSCHEDULED_COST = 1000
+DAY_COST = 10
+NON_SPECIALIST_COST = 5
+DEFAULT_TIME_BUDGET = 2.0
+
+
+def working_days(start, count):
+    """`count` YYYY-MM-DD dates from `start`, skipping Saturdays and Sundays."""
+    day = datetime.strptime(start, "%Y-%m-%d")
+    days = []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return days
+
+
+def priority_weight(case):
+    criminal, normal = scheduling.priority_key(case)
+    return 2 ** (3 - ((criminal - 1) * 2 + normal))
+
+
+class _Bin:
+    __slots__ = ("judge", "day", "capacity", "used", "cases")
+
+    def __init__(self, judge, day, capacity):
+        self.judge = judge
+        self.day = day
+        self.capacity = capacity
+        self.used = 0
+        self.cases = []
+
+
+class Solver:
+    def __init__(self, cases, durations, judges, days, buffer=scheduling.BUFFER_MINUTES,
+                 window=scheduling.DAY_END - scheduling.DAY_START):
+        self.cases = cases
+        self.durations = durations
+        self.judges = judges
+        self.days = days
+        self.buffer = buffer
+        self.window = window
+        self.weights = [priority_weight(c) for c in cases]
+        self.types = [(c.get("caseType") or "").lower() for c in cases]
+        specs = [frozenset(s.lower() for s in j.get("specializations", []) if s) for j in judges]
+        self._experts = {}
+        for t in set(self.types):
+            self._experts[t] = frozenset(i for i, s in enumerate(specs) if any(x in t for x in s))
+        self.bins = [
+            _Bin(j, d, min(int(judge.get("daily_capacity_minutes", DEFAULT_CAPACITY) or 0), window))
+            for d in range(len(days)) for j, judge in enumerate(judges)
+        ]
+        self.where = [None] * len(cases)  # case index -> bin index
+        self.rooms = [self.room(b) for b in self.bins]
+
+    # -- constraints and cost ------------------------------------------
+
+    def room(self, b, freed=0, freed_count=0):
+        """Longest case bin b could take, after optionally removing cases."""
+        used = b.used - freed
+        count = len(b.cases) - freed_count
+        return min(b.capacity - used, self.window - used - self.buffer * count)
+
+    def place_cost(self, k, b):
+        cost = DAY_COST * b.day * self.weights[k]
+        experts = self._experts[self.types[k]]
+        if experts and b.judge not in experts:
+            cost += NON_SPECIALIST_COST
+        return cost
+
+    def unscheduled_cost(self, k):
+        return UNSCHEDULED_COST * self.weights[k]
+
+    def total_cost(self):
+        return sum(self.place_cost(k, self.bins[w]) if w is not None else self.unscheduled_cost(k)
+                   for k, w in enumerate(self.where))
+
+    def _add(self, k, bi):
+        b = self.bins[bi]
+        b.cases.append(k)
+        b.used += self.durations[k]
+        self.where[k] = bi
+        self.rooms[bi] = self.room(b)
+
+    def _remove(self, k):
+        bi = self.where[k]
+        b = self.bins[bi]
+        b.cases.remove(k)
+        b.used -= self.durations[k]
+        self.where[k] = None
+        self.rooms[bi] = self.room(b)
+
+    # -- construction --------------------------------------------------
+
+    def construct(self):
+        """First fit in priority order: earliest day, specialist, then emptiest bin."""
+        order = sorted(range(len(self.cases)), key=lambda k: (-self.weights[k], self.durations[k]))
+        n_judges = len(self.judges)
+        for d in range(len(self.days)):
+            base = d * n_judges
+            # Max-heaps of room per case type (specialists) and overall, lazily refreshed
+            everyone = [(-self.room(self.bins[base + j]), j) for j in range(n_judges)]
+            heapq.heapify(everyone)
+            by_type = {t: [e for e in everyone if e[1] in experts] for t, experts in self._experts.items()}
+            for heap in by_type.values():
+                heapq.heapify(heap)
+            for k in order:
+                if self.where[k] is not None:
+                    continue
+                for heap in (by_type[self.types[k]], everyone):
+                    j = self._pop_fitting(heap, base, self.durations[k])
+                    if j is not None:
+                        self._add(k, base + j)
+                        break
+
+    def _pop_fitting(self, heap, base, duration):
+        while heap:
+            neg_room, j = heap[0]
+            actual = self.rooms[base + j]
+            if -neg_room != actual:
+                heapq.heapreplace(heap, (-actual, j))
+                continue
+            return j if actual >= duration else None
+        return None
+
+    # -- local search --------------------------------------------------
+
+    def _best_bin(self, k, exclude=None, before=None):
+        """Cheapest bin with room for case k (optionally only bins[:before]), or (None, None)."""
+        best, best_cost = None, None
+        d = self.durations[k]
+        rooms = self.rooms if before is None else self.rooms[:before]
+        for bi, room in enumerate(rooms):
+            if room >= d and bi != exclude:
+                cost = self.place_cost(k, self.bins[bi])
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = bi, cost
+        return best, best_cost
+
+    def _try_insert(self, k):
+        bi, cost = self._best_bin(k)
+        if bi is not None and cost < self.unscheduled_cost(k):
+            self._add(k, bi)
+            return True
+        return False
+
+    def _try_relocate(self, k):
+        """Move one booked case elsewhere so that k fits in its bin."""
+        d = self.durations[k]
+        gain = self.unscheduled_cost(k)
+        max_room = max(self.rooms, default=0)
+        for bi, b in enumerate(self.bins):
+            place = self.place_cost(k, b)
+            if place >= gain:
+                continue
+            for v in list(b.cases):
+                if self.durations[v] > max_room or self.room(b, self.durations[v], 1) < d:
+                    continue
+                ci, cost_v = self._best_bin(v, exclude=bi)
+                if ci is None:
+                    continue
+                if place + cost_v - self.place_cost(v, b) - gain < 0:
+                    self._remove(v)
+                    self._add(v, ci)
+                    self._add(k, bi)
+                    return True
+        return False
+
+    def _try_swap_out(self, k):
+        """Replace a booked case of lower priority with k."""
+        d = self.durations[k]
+        gain = self.unscheduled_cost(k)
+        best = None
+        for bi, b in enumerate(self.bins):
+            place = self.place_cost(k, b)
+            for v in b.cases:
+                if self.weights[v] >= self.weights[k] or self.room(b, self.durations[v], 1) < d:
+                    continue
+                delta = place - gain + self.unscheduled_cost(v) - self.place_cost(v, b)
+                if delta < 0 and (best is None or delta < best[0]):
+                    best = (delta, v, bi)
+        if best is None:
+            return False
+        _, v, bi = best
+        self._remove(v)
+        self._add(k, bi)
+        return True
+
+    def _try_advance(self, k):
+        current = self.bins[self.where[k]]
+        bi, cost = self._best_bin(k, before=current.day * len(self.judges))
+        if bi is not None and cost < self.place_cost(k, current):
+            self._remove(k)
+            self._add(k, bi)
+            return True
+        return False
+
+    def improve(self, deadline):
+        """Local search until a pass makes no change or the deadline passes."""
+        passes = moves = 0
+        changed = True
+        while changed and time.monotonic() < deadline:
+            changed = False
+            passes += 1
+            waiting = sorted((k for k, w in enumerate(self.where) if w is None),
+                             key=lambda k: (-self.weights[k], self.durations[k]))
+            # Every move gets harder as the duration grows, so once a case of
+            # some priority and type cannot be placed, longer ones are skipped
+            stuck = {}
+            for k in waiting:
+                if time.monotonic() >= deadline:
+                    break
+                group = (self.weights[k], self.types[k])
+                if self.durations[k] >= stuck.get(group, float("inf")):
+                    continue
+                if self._try_insert(k) or self._try_relocate(k) or self._try_swap_out(k):
+                    moves += 1
+                    changed = True
+                else:
+                    stuck[group] = self.durations[k]
+            for k in range(len(self.cases)):
+                if time.monotonic() >= deadline:
+                    break
+                if self.where[k] is not None and self.bins[self.where[k]].day and self._try_advance(k):
+                    moves += 1
+                    changed = True
+        return passes, moves
+
+    # -- results -------------------------------------------------------
+
+    def plan(self):
+        """[(case, judge, date, start, end, duration)] with times laid out per bin."""
+        rows = []
+        for b in self.bins:
+            minute = scheduling.DAY_START
+            for k in sorted(b.cases, key=lambda k: scheduling.priority_key(self.cases[k])):
+                d = self.durations[k]
+                rows.append((self.cases[k], self.judges[b.judge], self.days[b.day], minute, minute + d, d))
+                minute += d + self.buffer
+        return rows
+
+    def unplaced(self):
+        return [self.cases[k] for k, w in enumerate(self.where) if w is None]
+
+
+def plan_metrics(rows, cases, judges, days):
+    """Utilization and backlog clearance of a plan of (case, judge, date, ..., duration) rows."""
+    capacity = {j["id"]: int(j.get("daily_capacity_minutes", DEFAULT_CAPACITY) or 0) for j in judges}
+    booked = {}
+    for row in rows:
+        key = (row[1]["id"], row[2])
+        booked[key] = booked.get(key, 0) + row[-1]
+    total_capacity = sum(capacity.values()) * len(days)
+    booked_minutes = sum(min(m, capacity[j]) for (j, _), m in booked.items())
+    over = {key: m - capacity[key[0]] for key, m in booked.items() if m > capacity[key[0]]}
+    scheduled = {id(row[0]) for row in rows}
+    high = [c for c in cases if priority_weight(c) >= 4]
+    return {
+        "scheduled": len(rows),
+        "unscheduled": len(cases) - len(rows),
+        "backlog_cleared_pct": round(100 * len(rows) / len(cases), 1) if cases else 0,
+        "criminal_scheduled": sum(1 for c in high if id(c) in scheduled),
+        "criminal_total": len(high),
+        "utilization_pct": round(100 * booked_minutes / total_capacity, 1) if total_capacity else 0,
+        "over_capacity_slots": len(over),
+        "over_capacity_minutes": round(sum(over.values()), 1)
+    }
+
+
+def greedy_plan(cases, durations, judges, days, buffer=scheduling.BUFFER_MINUTES):
+    """The existing single-day greedy pass, repeated day by day over the horizon."""
+    rows = []
+    remaining = list(range(len(cases)))
+    for day in days:
+        if not remaining:
+            break
+        placed, _ = scheduling.assign_day([cases[k] for k in remaining],
+                                          [durations[k] for k in remaining], judges, buffer=buffer)
+        done = {id(p[0]) for p in placed}
+        rows.extend((case, judge, day, start, end, duration) for case, judge, start, end, duration in placed)
+        remaining = [k for k in remaining if id(cases[k]) not in done]
+    return rows
+
+
+def solve(cases, durations, judges, days, time_budget=DEFAULT_TIME_BUDGET, compare=True,
+          buffer=scheduling.BUFFER_MINUTES):
+    """
+    Plan `cases` over the working `days`. Returns (plan rows, unplaced
+    cases, report), the report including solver stats and, with compare,
+    the greedy pass's metrics on the same input.
+    """
+    started = time.monotonic()
+    solver = Solver(cases, durations, judges, days, buffer=buffer)
+    solver.construct()
+    constructed = solver.total_cost()
+    passes, moves = solver.improve(started + time_budget)
+    rows = solver.plan()
+    report = {
+        "days": days,
+        "elapsed_s": round(time.monotonic() - started, 3),
+        "time_budget_s": time_budget,
+        "search_passes": passes,
+        "search_moves": moves,
+        "cost_after_construction": constructed,
+        "cost": solver.total_cost(),
+        "solver": plan_metrics(rows, cases, judges, days)
+    }
+    if compare:
+        report["greedy"] = plan_metrics(greedy_plan(cases, durations, judges, days, buffer), cases, judges, days)
+    return rows, solver.unplaced(), report
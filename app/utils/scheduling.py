@@ -0,0 +1,202 @@
+"""
+Judge assignment engine for the daily cause list.
+
+Times are minutes since midnight. Every judge has a timeline that starts
+at DAY_START; a case goes to the judge with the lowest
+`next free minute - EXPERT_BONUS (if the judge specializes in the case
+type)` among those who can still finish it by DAY_END, ties going to the
+earlier judge. The rule is the same as the old per-case scan over every
+judge, but the pool keeps one heap of all judges and one heap per case type
+of its specialists, both keyed by next free minute. An assignment
+therefore costs O(log judges) rather than O(judges).
+
+earliest_start/pack/best_slot work on one judge's existing day instead
+(sorted (start, end) intervals), for patching a plan without rebuilding it.
+"""
+
+import heapq
+from bisect import insort
+
+DAY_START = 10 * 60
+DAY_END = 17 * 60
+BUFFER_MINUTES = 15
+EXPERT_BONUS = 60
+
+# Fields reschedule reads from pending cases (everything but bulky text)
+PENDING_PROJECTION = {"_id": 0, "search_grams": 0, "caseNumberNorm": 0, "description": 0}
+
+
+def priority_key(case):
+    """Criminal matters first, then High or Critical priority."""
+    return (
+        1 if case.get("caseType") == "Criminal" else 2,
+        0 if case.get("priority") in ("High", "Critical") else 1
+    )
+
+
+def risk_level(duration):
+    if duration > 90:
+        return "High"
+    if duration > 60:
+        return "Medium"
+    return "Low"
+
+
+def hhmm(minutes):
+    minutes = int(minutes)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minutes_of(value):
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class JudgePool:
+    """Timelines of the available judges for one day."""
+
+    def __init__(self, judges, day_start=DAY_START, day_end=DAY_END, buffer=BUFFER_MINUTES,
+                 next_free=None):
+        self.judges = list(judges)
+        self.day_end = day_end
+        self.buffer = buffer
+        self.specializations = [
+            frozenset(s.lower() for s in j.get("specializations", []) if s) for j in self.judges
+        ]
+        self.index = {j["id"]: i for i, j in enumerate(self.judges)}
+        next_free = next_free or {}
+        self.next_free = [next_free.get(j["id"], day_start) for j in self.judges]
+        self._all = [(t, i) for i, t in enumerate(self.next_free)]
+        heapq.heapify(self._all)
+        self._experts = {}  # lowercased case type -> heap of its specialists
+
+    def _expert_heap(self, case_type):
+        heap = self._experts.get(case_type)
+        if heap is None:
+            heap = [(self.next_free[i], i) for i, specs in enumerate(self.specializations)
+                    if any(s in case_type for s in specs)]
+            heapq.heapify(heap)
+            self._experts[case_type] = heap
+        return heap
+
+    def _top(self, heap):
+        # Entries are (next free, judge); those older than the timeline are stale
+        while heap and heap[0][0] != self.next_free[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def best(self, case_type, duration):
+        """(judge index, start minute) of the best judge for a case, or None."""
+        latest_start = self.day_end - duration
+        candidates = []
+        top = self._top(self._all)
+        if top and top[0] <= latest_start:
+            bonus = EXPERT_BONUS if self.is_expert(top[1], case_type) else 0
+            candidates.append((top[0] - bonus, top[1]))
+        top = self._top(self._expert_heap(case_type))
+        if top and top[0] <= latest_start:
+            candidates.append((top[0] - EXPERT_BONUS, top[1]))
+        if not candidates:
+            return None
+        _, i = min(candidates)
+        return i, self.next_free[i]
+
+    def is_expert(self, i, case_type):
+        return any(s in case_type for s in self.specializations[i])
+
+    def book(self, i, end):
+        """Move judge i's timeline past a hearing ending at `end`."""
+        self.set_next_free(i, end + self.buffer)
+
+    def set_next_free(self, i, minute):
+        self.next_free[i] = minute
+        entry = (minute, i)
+        heapq.heappush(self._all, entry)
+        for case_type, heap in self._experts.items():
+            if self.is_expert(i, case_type):
+                heapq.heappush(heap, entry)
+
+    def assign(self, case, duration):
+        """Book `case` on the best judge; returns (judge, start, end) or None."""
+        found = self.best((case.get("caseType") or "").lower(), duration)
+        if found is None:
+            return None
+        i, start = found
+        end = start + duration
+        self.book(i, end)
+        return self.judges[i], start, end
+
+
+def assign_day(cases, durations, judges, **pool_options):
+    """
+    Greedy plan for one day: cases in priority order, each to its best
+    judge. Returns ([(case, judge, start, end, duration)], unplaced cases).
+    """
+    pool = JudgePool(judges, **pool_options)
+    order = sorted(range(len(cases)), key=lambda k: priority_key(cases[k]))
+    placed, unplaced = [], []
+    for k in order:
+        slot = pool.assign(cases[k], durations[k])
+        if slot:
+            placed.append((cases[k],) + slot + (durations[k],))
+        else:
+            unplaced.append(cases[k])
+    return placed, unplaced
+
+
+def slot_interval(entry):
+    """(start, end) minutes of a stored schedule entry."""
+    start = minutes_of(entry["start_time"])
+    if entry.get("duration_minutes") is None and entry.get("end_time"):
+        return start, minutes_of(entry["end_time"])
+    return start, start + float(entry.get("duration_minutes") or 0)
+
+
+def earliest_start(busy, duration, not_before=DAY_START, day_end=DAY_END, buffer=BUFFER_MINUTES):
+    """
+    Earliest start >= not_before at which a hearing of `duration` fits
+    among the sorted (start, end) intervals in `busy`, keeping `buffer`
+    minutes either side of them; None if it would run past day_end.
+    """
+    start = not_before
+    for s, e in busy:
+        if start + duration + buffer <= s:
+            break
+        start = max(start, e + buffer)
+    return start if start + duration <= day_end else None
+
+
+def pack(durations, fixed=(), day_start=DAY_START, day_end=DAY_END, buffer=BUFFER_MINUTES):
+    """
+    Lay hearings out in the given order from day_start, around the fixed
+    (start, end) intervals. Returns [(start, end)] or None if one overflows.
+    """
+    busy = sorted(fixed)
+    slots = []
+    cursor = day_start
+    for d in durations:
+        start = earliest_start(busy, d, cursor, day_end, buffer)
+        if start is None:
+            return None
+        slots.append((start, start + d))
+        insort(busy, (start, start + d))
+        cursor = start + d + buffer
+    return slots
+
+
+def best_slot(judges, busy_by_judge, case, duration):
+    """
+    (judge, start) for one more case on an existing day: the same rule as
+    JudgePool, with each judge's earliest gap standing in for next free time.
+    """
+    case_type = (case.get("caseType") or "").lower()
+    best = None
+    for i, judge in enumerate(judges):
+        start = earliest_start(busy_by_judge.get(judge["id"], []), duration)
+        if start is None:
+            continue
+        expert = any(s.lower() in case_type for s in judge.get("specializations", []) if s)
+        key = (start - (EXPERT_BONUS if expert else 0), i)
+        if best is None or key < best[0]:
+            best = (key, judge, start)
+    return (best[1], best[2]) if best else None
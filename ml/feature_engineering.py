@@ -1,26 +1,31 @@
 import pandas as pd
 
+CASE_TYPE_MAP = {
+    "Civil": 0,
+    "Criminal": 1,
+    "Family": 2,
+    "Commercial": 3
+}
+
+COMPLEXITY_MAP = {
+    "Low": 0,
+    "Medium": 1,
+    "High": 2
+}
+
+# Case document field for each model column, in training order
+FEATURE_FIELDS = ["caseType", "witnesses", "advocates", "previous_hearings", "complexity"]
+
 def preprocess_data(df: pd.DataFrame):
     """
     Converts raw court case data into ML-ready format
     """
 
     
-    case_type_map = {
-        "Civil": 0,
-        "Criminal": 1,
-        "Family": 2,
-        "Commercial": 3
-    }
-    df["case_type"] = df["case_type"].map(case_type_map)
+    df["case_type"] = df["case_type"].map(CASE_TYPE_MAP)
 
     
-    complexity_map = {
-        "Low": 0,
-        "Medium": 1,
-        "High": 2
-    }
-    df["case_complexity"] = df["case_complexity"].map(complexity_map)
+    df["case_complexity"] = df["case_complexity"].map(COMPLEXITY_MAP)
 
     
     X = df[
@@ -1,12 +1,15 @@
+import os
+import sys
 import pandas as pd
-import pickle
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 
-from feature_engineering import preprocess_data
+from feature_engineering import preprocess_data, CASE_TYPE_MAP, COMPLEXITY_MAP, FEATURE_FIELDS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.model_registry import publish, HEARING_DURATION
 
 DATASET_PATH = "../dataset/court_cases.csv"
-MODEL_PATH = "../app/hearing_model.pkl"
 
 def train():
     print("📥 Loading dataset...")
@@ -25,10 +28,15 @@ def train():
     )
     model.fit(X_train, y_train)
 
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(model, f)
+    version = publish(
+        HEARING_DURATION,
+        model,
+        FEATURE_FIELDS,
+        encoders={"caseType": CASE_TYPE_MAP, "complexity": COMPLEXITY_MAP},
+        metrics={"r2_test": round(float(model.score(X_test, y_test)), 4), "rows": len(df)}
+    )
 
-    print("✅ Model trained & saved as hearing_model.pkl")
+    print(f"✅ Model trained & published as {HEARING_DURATION} {version}")
 
 if __name__ == "__main__":
     train()
@@ -0,0 +1,76 @@
+"""
+Cold-start budget for the app factory.
+
+Times `from app import create_app; create_app()` in a fresh interpreter
+(database bootstrap disabled, so only import and wiring cost is measured),
+lists the slowest imports from `python -X importtime`, and exits non-zero
+if the budget is exceeded or a heavy SDK was imported eagerly.
+
+Usage:
+    python scripts/check_import_time.py [--budget SECONDS] [--top N]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+DEFAULT_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "1.0"))
+# Must only be imported by the handlers that use them
+HEAVY_MODULES = ["ollama", "google.genai", "openai", "bs4", "requests", "numpy", "sklearn", "PyPDF2"]
+
+CHILD = f"""
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app({{"BOOTSTRAP_DB": False, "WARM_MODELS": False}})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "eager": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def slowest_imports(importtime_log, top):
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [p.strip() for p in line.replace("import time:", "").split("|")]
+        rows.append((int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    budget = float(argv[argv.index("--budget") + 1]) if "--budget" in argv else DEFAULT_BUDGET
+    top = int(argv[argv.index("--top") + 1]) if "--top" in argv else 15
+
+    env = dict(os.environ, BOOTSTRAP_DB="0", WARM_MODELS="0")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD],
+                          cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        print("❌ App factory failed to import.")
+        return 1
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"Slowest imports (cumulative):")
+    for cumulative_us, name in slowest_imports(proc.stderr, top):
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"create_app() cold start: {result['elapsed']:.3f}s (budget {budget:.3f}s)")
+
+    ok = True
+    if result["eager"]:
+        print(f"❌ Heavy modules imported at startup: {', '.join(result['eager'])}")
+        ok = False
+    if result["elapsed"] > budget:
+        print("❌ Import-time budget exceeded.")
+        ok = False
+    if ok:
+        print("✅ Within budget.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,39 @@
+"""
+Import the High Court metadata corpus (datasets/high_court_metadata/json).
+
+Files are discovered with a streaming directory walk and parsed in a
+process pool, each worker handling chunks of paths. Extraction uses
+precompiled regexes on the raw HTML instead of building a BeautifulSoup
+tree per file.
+
+Every parsed file is recorded in a manifest (dataset/import_manifest.sqlite3)
+with its size, mtime, content hash and extracted case. A re-run only reads
+files whose size or mtime changed, only re-parses those whose hash changed,
+and upserts just those cases into MongoDB (--mongo). app/cases.json (one
+case per line inside the array), dataset/court_cases.csv and the optional
+NDJSON file are then regenerated from the manifest without parsing, and
+left alone when nothing changed. Files that disappeared are dropped from
+the manifest and the output files; their MongoDB cases are kept.
+
+Usage:
+    python scripts/import_real_data.py [--workers N] [--limit N]
+                                       [--ndjson FILE] [--mongo] [--full]
+
+--full ignores the manifest and re-parses the whole corpus.
+"""
+
 import os
+import sys
 import json
 import csv
-import glob
 import re
+import html
+import hashlib
 import random
+import sqlite3
+import time
 from datetime import datetime
-from bs4 import BeautifulSoup
+from multiprocessing import Pool
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,80 +41,103 @@ PROJECT_ROOT = os.path.join(BASE_DIR, "..")
 DATA_SOURCE_DIR = os.path.join(PROJECT_ROOT, "datasets", "high_court_metadata", "json")
 CSV_OUTPUT_PATH = os.path.join(PROJECT_ROOT, "dataset", "court_cases.csv")
 JSON_OUTPUT_PATH = os.path.join(PROJECT_ROOT, "app", "cases.json")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "dataset", "import_manifest.sqlite3")
+CSV_HEADERS = ["case_type", "number_of_witnesses", "advocate_count", "previous_hearings", "case_complexity", "hearing_duration_minutes"]
+
+CHUNK_SIZE = 256
+MONGO_BATCH_SIZE = 1000
+MANIFEST_BATCH_SIZE = 10000
+
+BUTTON_RE = re.compile(r'<button\b[^>]*>(.*?)</button>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+PDF_SUFFIX_RE = re.compile(r'\s*pdf$', re.IGNORECASE)
+JUDGE_RE = re.compile(r'Judge\s*:\s*([^<]+)')
+REG_DATE_RE = re.compile(r'Date of registration\s*:\s*([\d-]+)')
+DEC_DATE_RE = re.compile(r'Decision Date\s*:\s*([\d-]+)')
+DISPOSAL_RE = re.compile(r'Disposal Nature\s*:\s*([^|`<]+)')
 
 
 def parse_date(date_str):
     try:
         return datetime.strptime(date_str.strip(), "%d-%m-%Y")
-    except:
+    except ValueError:
         return None
 
 def clean_text(text):
-    return re.sub(r'\s+', ' ', text).strip()
+    return SPACE_RE.sub(' ', text).strip()
+
+def html_text(fragment):
+    """Visible text of an HTML fragment, whitespace collapsed."""
+    return clean_text(html.unescape(TAG_RE.sub(' ', fragment)))
+
+def iter_json_files(root):
+    """Yield (path, size, mtime) for every *.json under root, lazily."""
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    st = entry.stat()
+                    yield entry.path, st.st_size, st.st_mtime
 
 def extract_case_details(json_path):
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            
+    except Exception:
+        return None
+    return extract_from_data(data)
+
+def extract_from_data(data):
+    try:
         raw_html = data.get('raw_html', '')
         court_name = data.get('court_name', 'High Court')
-        
-        soup = BeautifulSoup(raw_html, 'html.parser')
-        text_content = soup.get_text(" ", strip=True)
-        
-        
-        
-        
+        text_content = html_text(raw_html)
+
         case_number = "UNKNOWN"
         title = "Unknown vs Unknown"
         judge = "Unknown Judge"
         status = "Pending"
         reg_date = None
         dec_date = None
-        
-        
-        
-        
-        button = soup.find('button')
+
+        button = BUTTON_RE.search(raw_html)
         if button:
-            btn_text = button.get_text(strip=True)
+            btn_text = html_text(button.group(1))
             if " of " in btn_text:
                 parts = btn_text.split(" of ", 1)
                 case_number = parts[0].strip()
-                title = parts[1].strip()
-                
-                title = re.sub(r'\s*pdf$', '', title, flags=re.IGNORECASE)
+                title = PDF_SUFFIX_RE.sub('', parts[1].strip())
             else:
                 title = btn_text
-                
-        
-        
-        judge_match = re.search(r'Judge\s*:\s*([^<]+)', raw_html)
+
+        judge_match = JUDGE_RE.search(raw_html)
         if judge_match:
-            
-            j_raw = judge_match.group(1)
-            judge = j_raw.split('<')[0].strip()
-            
-        
-        
-        
-        reg_match = re.search(r'Date of registration\s*:\s*([\d-]+)', text_content)
+            judge = judge_match.group(1).strip()
+
+        reg_match = REG_DATE_RE.search(text_content)
         if reg_match:
             reg_date = parse_date(reg_match.group(1))
-            
-        dec_match = re.search(r'Decision Date\s*:\s*([\d-]+)', text_content)
+
+        dec_match = DEC_DATE_RE.search(text_content)
         if dec_match:
             dec_date = parse_date(dec_match.group(1))
-            
-        stat_match = re.search(r'Disposal Nature\s*:\s*([^|`<]+)', text_content)
+
+        stat_match = DISPOSAL_RE.search(text_content)
         if stat_match:
             status_text = stat_match.group(1).strip().lower()
             if "disposed" in status_text:
                 status = "Closed"
             else:
                 status = "Hearing Scheduled"
-        
+
         return {
             "caseNumber": case_number,
             "title": title,
@@ -94,86 +145,269 @@ def extract_case_details(json_path):
             "court": court_name,
             "status": status,
             "reg_date": reg_date,
-            "dec_date": dec_date,
-            "raw_text": text_content
+            "dec_date": dec_date
         }
-    except Exception as e:
-        
+    except Exception:
         return None
 
-def main():
+def build_case(details):
+    """Turn extracted details into a (cases.json entry, CSV row) pair."""
+    json_entry = {
+        "caseNumber": details['caseNumber'],
+        "title": details['title'],
+        "caseType": "Civil",
+        "status": details['status'],
+        "filingDate": details['reg_date'].strftime("%Y-%m-%d") if details['reg_date'] else datetime.now().strftime("%Y-%m-%d"),
+        "hearingDate": details['dec_date'].strftime("%Y-%m-%d") if details['dec_date'] else None,
+        "closedDate": details['dec_date'].strftime("%Y-%m-%d") if details['status'] == "Closed" and details['dec_date'] else None,
+        "court": details['court'],
+        "judge": details['judge'],
+        "description": f"Real case record from {details['court']}",
+
+        "advocates": random.randint(1, 5),
+        "witnesses": random.randint(0, 10),
+        "previous_hearings": random.randint(0, 20),
+        "complexity": random.choice(["Low", "Medium", "High"])
+    }
+    duration = random.randint(15, 120)
+    csv_row = [
+        json_entry['caseType'],
+        json_entry['witnesses'],
+        json_entry['advocates'],
+        json_entry['previous_hearings'],
+        json_entry['complexity'],
+        duration
+    ]
+    return json_entry, csv_row
+
+def process_file(task):
+    """
+    Worker entry point for (path, size, mtime, known hash). Returns
+    (path, size, mtime, hash, parsed, case) where parsed is False when the
+    content hash matched the manifest, and case is a (cases.json entry,
+    CSV row) pair or None for files that yield no case.
+    """
+    json_path, size, mtime, known_hash = task
+    try:
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return json_path, size, mtime, None, True, None
+    digest = hashlib.sha1(raw).hexdigest()
+    if digest == known_hash:
+        return json_path, size, mtime, digest, False, None
+    try:
+        details = extract_from_data(json.loads(raw))
+    except ValueError:
+        details = None
+    if not details or details['caseNumber'] == "UNKNOWN" or not details['title']:
+        return json_path, size, mtime, digest, True, None
+    return json_path, size, mtime, digest, True, build_case(details)
+
+
+class Manifest:
+    """sqlite3 record of every imported file and the case it produced."""
+
+    def __init__(self, path=MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT, "
+            "case_json TEXT, csv_row TEXT, seen INTEGER)"
+        )
+        self.run = int(time.time() * 1000)
+        self.pending = []
+
+    def clear(self):
+        self.conn.execute("DELETE FROM files")
+
+    def lookup(self, path):
+        return self.conn.execute("SELECT size, mtime, hash FROM files WHERE path = ?", (path,)).fetchone()
+
+    def mark_seen(self, paths):
+        self.conn.executemany("UPDATE files SET seen = ? WHERE path = ?", [(self.run, p) for p in paths])
+
+    def record(self, path, size, mtime, digest, case=None, parsed=True):
+        if parsed:
+            json_entry, csv_row = case or (None, None)
+            self.pending.append((
+                path, size, mtime, digest,
+                json.dumps(json_entry, ensure_ascii=False) if json_entry else None,
+                json.dumps(csv_row) if csv_row else None,
+                self.run
+            ))
+        else:
+            # Touched but identical: keep the stored case, refresh the stat
+            self.conn.execute("UPDATE files SET size = ?, mtime = ?, seen = ? WHERE path = ?",
+                              (size, mtime, self.run, path))
+        if len(self.pending) >= MANIFEST_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+        self.conn.commit()
+
+    def drop_unseen(self):
+        """Forget files that no longer exist; returns how many."""
+        removed = self.conn.execute("DELETE FROM files WHERE seen != ?", (self.run,)).rowcount
+        self.conn.commit()
+        return removed
+
+    def iter_cases(self):
+        rows = self.conn.execute(
+            "SELECT case_json, csv_row FROM files WHERE case_json IS NOT NULL ORDER BY path")
+        for case_json, csv_row in rows:
+            yield json.loads(case_json), json.loads(csv_row)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class CaseWriter:
+    """Streams cases to cases.json, the training CSV and an optional NDJSON file."""
+
+    def __init__(self, ndjson_path=None):
+        os.makedirs(os.path.dirname(CSV_OUTPUT_PATH), exist_ok=True)
+        self.json_file = open(JSON_OUTPUT_PATH, 'w', encoding='utf-8')
+        self.json_file.write("[\n")
+        self.csv_file = open(CSV_OUTPUT_PATH, 'w', newline='', encoding='utf-8')
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(CSV_HEADERS)
+        self.ndjson_file = open(ndjson_path, 'w', encoding='utf-8') if ndjson_path else None
+        self.count = 0
+
+    def write(self, json_entry, csv_row):
+        line = json.dumps(json_entry, ensure_ascii=False)
+        self.json_file.write((",\n  " if self.count else "  ") + line)
+        self.csv_writer.writerow(csv_row)
+        if self.ndjson_file:
+            self.ndjson_file.write(line + "\n")
+        self.count += 1
+
+    def close(self):
+        self.json_file.write("\n]\n")
+        self.json_file.close()
+        self.csv_file.close()
+        if self.ndjson_file:
+            self.ndjson_file.close()
+
+
+class MongoSink:
+    """Upserts new and changed cases in batches through case_import."""
+
+    def __init__(self):
+        sys.path.insert(0, os.path.abspath(PROJECT_ROOT))
+        # Same validated upsert path as bulk registration, so counters and
+        # rollups stay in step with the cases collection.
+        from app.utils.case_import import import_cases
+        self.import_cases = import_cases
+        self.batch = []
+        self.totals = {"inserted": 0, "updated": 0, "failed": 0}
+
+    def write(self, json_entry):
+        self.batch.append((len(self.batch) + 1, json_entry))
+        if len(self.batch) >= MONGO_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        report = self.import_cases(self.batch, batch_size=MONGO_BATCH_SIZE)
+        for field in self.totals:
+            self.totals[field] += getattr(report, field)
+        self.batch = []
+
+
+def parse_args(argv):
+    def value(flag, default=None):
+        return argv[argv.index(flag) + 1] if flag in argv else default
+
+    return {
+        "workers": int(value("--workers", os.cpu_count() or 1)),
+        "limit": int(value("--limit")) if "--limit" in argv else None,
+        "ndjson": value("--ndjson"),
+        "mongo": "--mongo" in argv,
+        "full": "--full" in argv,
+    }
+
+def plan(manifest, root):
+    """
+    Walk the corpus and return the (path, size, mtime, known hash) tasks
+    for files that are new or whose size/mtime changed, plus the number
+    of unchanged files. Every file still present is marked as seen.
+    """
+    tasks, seen, unchanged = [], [], 0
+    for path, size, mtime in iter_json_files(root):
+        known = manifest.lookup(path)
+        if known:
+            seen.append(path)
+            if len(seen) >= MANIFEST_BATCH_SIZE:
+                manifest.mark_seen(seen)
+                seen = []
+        if known and known[0] == size and known[1] == mtime:
+            unchanged += 1
+        else:
+            tasks.append((path, size, mtime, known[2] if known else None))
+    manifest.mark_seen(seen)
+    return tasks, unchanged
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    started = time.monotonic()
+    manifest = Manifest()
+    if args["full"]:
+        manifest.clear()
+
     print(f"Scanning {DATA_SOURCE_DIR}...")
-    files = glob.glob(os.path.join(DATA_SOURCE_DIR, "**", "*.json"), recursive=True)
-    print(f"Found {len(files)} JSON files.")
-    
-    cases_json = []
-    csv_rows = []
-    
-    
-    processed_count = 0
-    for file_path in files:
-        if processed_count >= 2000:
-            break
-            
-        details = extract_case_details(file_path)
-        if not details:
-            continue
-            
-        
-        if details['caseNumber'] == "UNKNOWN" or not details['title']:
-            continue
-            
-        processed_count += 1
-        
-        
-        json_entry = {
-            "caseNumber": details['caseNumber'],
-            "title": details['title'],
-            "caseType": "Civil", 
-            "status": details['status'],
-            "filingDate": details['reg_date'].strftime("%Y-%m-%d") if details['reg_date'] else datetime.now().strftime("%Y-%m-%d"),
-            "hearingDate": details['dec_date'].strftime("%Y-%m-%d") if details['dec_date'] else None,
-            "closedDate": details['dec_date'].strftime("%Y-%m-%d") if details['status'] == "Closed" and details['dec_date'] else None,
-            "court": details['court'],
-            "judge": details['judge'],
-            "description": f"Real case record from {details['court']}",
-            
-            "advocates": random.randint(1, 5),
-            "witnesses": random.randint(0, 10),
-            "previous_hearings": random.randint(0, 20),
-            "complexity": random.choice(["Low", "Medium", "High"])
-        }
-        cases_json.append(json_entry)
-        
-        
-        
-        
-        
-        
-        duration = random.randint(15, 120)
-        
-        csv_rows.append([
-            json_entry['caseType'],
-            json_entry['witnesses'],
-            json_entry['advocates'],
-            json_entry['previous_hearings'],
-            json_entry['complexity'],
-            duration
-        ])
-
-    
-    print(f"Saving {len(cases_json)} cases to cases.json...")
-    with open(JSON_OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(cases_json, f, indent=2)
-        
-    
-    print(f"Saving {len(csv_rows)} rows to court_cases.csv...")
-    headers = ["case_type", "number_of_witnesses", "advocate_count", "previous_hearings", "case_complexity", "hearing_duration_minutes"]
-    with open(CSV_OUTPUT_PATH, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(csv_rows)
-        
+    tasks, unchanged = plan(manifest, DATA_SOURCE_DIR)
+    print(f"{unchanged} files unchanged, {len(tasks)} new or modified. Parsing with {args['workers']} workers...")
+
+    mongo = MongoSink() if args["mongo"] else None
+    parsed = changed = 0
+    try:
+        if tasks:
+            with Pool(args["workers"]) as pool:
+                for path, size, mtime, digest, was_parsed, case in pool.imap_unordered(process_file, tasks, CHUNK_SIZE):
+                    manifest.record(path, size, mtime, digest, case, was_parsed)
+                    if not was_parsed:
+                        continue
+                    parsed += 1
+                    if case:
+                        changed += 1
+                        if mongo:
+                            mongo.write(case[0])
+                        if args["limit"] and changed >= args["limit"]:
+                            pool.terminate()
+                            break
+                    if parsed % 50000 == 0:
+                        elapsed = time.monotonic() - started
+                        print(f"   {parsed} files parsed, {changed} cases ({parsed / elapsed:,.0f} files/s)")
+        if mongo:
+            mongo.flush()
+    finally:
+        manifest.flush()
+    removed = manifest.drop_unseen()
+
+    if parsed or removed or not os.path.exists(JSON_OUTPUT_PATH):
+        writer = CaseWriter(args["ndjson"])
+        try:
+            for json_entry, csv_row in manifest.iter_cases():
+                writer.write(json_entry, csv_row)
+        finally:
+            writer.close()
+        print(f"Saved {writer.count} cases to cases.json and court_cases.csv.")
+    else:
+        print("No changes; cases.json and court_cases.csv left as they are.")
+    manifest.close()
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    print(f"Parsed {parsed} files ({changed} cases), dropped {removed} deleted files in {elapsed:.1f}s.")
+    if mongo:
+        t = mongo.totals
+        print(f"MongoDB: {t['inserted']} inserted, {t['updated']} updated, {t['failed']} failed.")
     print("✅ Real data import complete.")
 
 if __name__ == "__main__":
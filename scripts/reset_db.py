@@ -25,8 +25,10 @@ def reset_db():
             print("✅ Collection dropped successfully.")
         else:
             print("ℹ️ Collection is already empty.")
-            
-        print("Ready for re-migration on next app startup.")
+
+        # Forget the cases.json checkpoint so the next migration starts over
+        db["migrations"].delete_one({"_id": "cases_json"})
+        print("Ready for re-migration: python -m app.utils.migrate_cases")
         
     except Exception as e:
         print(f"❌ Error resetting DB: {e}")